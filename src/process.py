@@ -1,25 +1,140 @@
+import json
 import os
+import sys
+import threading
 import time
 
+import cv2
+import numpy as np
+
+# 检测器代码与配置文件都在 src/test 下
+TEST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test')
+CONFIG_PATH = os.path.join(TEST_DIR, 'config.json')
+if TEST_DIR not in sys.path:
+    sys.path.insert(0, TEST_DIR)
+
+# 配置中相对于 src/test 的路径，加载时转换为绝对路径，使调用方的工作目录不影响模型加载
+_YOLOV5_PATH_KEYS = ('model_path', 'onnx_path', 'repo_dir', 'engine_cache_dir')
+
+
+def _load_config(config_path=CONFIG_PATH):
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+    config_dir = os.path.dirname(os.path.abspath(config_path))
+    for key in _YOLOV5_PATH_KEYS:
+        path = config["yolov5"].get(key)
+        if path and not os.path.isabs(path):
+            config["yolov5"][key] = os.path.normpath(os.path.join(config_dir, path))
+    # 作为模块被调用时不显示任何窗口
+    config["test"]["headless"] = True
+    config["debug"]["show_video"] = False
+    return config
+
+
+class DetectorEngine:
+    """进程内唯一的检测引擎：模型只加载一次，warmup()后每次调用只包含稳态推理
+
+    前处理的输入数组由TennisBallDetector按 (batch大小, 输入尺寸) 预分配并复用。
+    """
+
+    def __init__(self, config_path=CONFIG_PATH):
+        from tennis_ball_detector import TennisBallDetector
+
+        start = time.perf_counter()
+        self.config = _load_config(config_path)
+        self.detector = TennisBallDetector(self.config)
+        self.load_time = time.perf_counter() - start
+        self.warmup_time = 0.0
+        self.warmed_up = False
+
+    def warmup(self, iterations=None, frame_size=None):
+        """用空白帧跑几次完整检测流程（前处理缓冲区分配、后端首次推理的图优化等都在这里完成）"""
+        engine_config = self.config.get("process_img", {})
+        iterations = engine_config.get("warmup_iterations", 3) if iterations is None else iterations
+        height, width = frame_size or engine_config.get("warmup_frame_size", [360, 640])
+        frame = np.zeros((height, width, 3), dtype=np.uint8)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            self.detector.detect_tennis_balls(frame)
+        self.warmup_time = time.perf_counter() - start
+        self.warmed_up = True
+
+    def count_balls(self, img):
+        """img为图像路径或已解码的BGR图像，返回识别到的网球数量"""
+        frame = cv2.imread(img) if isinstance(img, str) else img
+        if frame is None:
+            return 0
+        return len(self.detector.detect_tennis_balls(frame))
+
+    def cold_start_stats(self):
+        return {
+            "load_time": self.load_time,
+            "warmup_time": self.warmup_time,
+            "detector_mode": self.detector.detector_mode,
+            "model": self.detector.model_info,
+        }
+
+
+_engine = None
+_engine_lock = threading.Lock()
+_preload_thread = None
+
+
+def get_engine():
+    """返回已预热的进程内检测引擎，首次调用时创建（后台预加载未完成时等待其完成）"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = DetectorEngine()
+                engine.warmup()
+                _engine = engine
+    return _engine
+
+
+def warmup():
+    """显式完成模型加载和预热，返回冷启动耗时统计（供测试脚本在计时前调用）"""
+    return get_engine().cold_start_stats()
+
+
+def preload():
+    """在后台线程中加载并预热引擎，不阻塞调用方；之后的process_img调用会等待其完成"""
+    global _preload_thread
+    if _preload_thread is None:
+        _preload_thread = threading.Thread(target=get_engine, name="DetectorPreload")
+        _preload_thread.daemon = True
+        _preload_thread.start()
+    return _preload_thread
+
+
+def cold_start_stats():
+    """引擎尚未创建时返回None"""
+    return _engine.cold_start_stats() if _engine is not None else None
+
+
 #
 # 模块说明：
 #   本文件作为图像识别模块，用于被其他程序调用（非主程序运行）。
 #   核心功能：处理单张图像，返回识别到的网球数量，并统计单张图像的处理时间。
 #   统计逻辑与 test 项目中要求的一致：支持批量图像测试，最终输出每张图像的识别数量、处理时间及所有图像的平均时间。
+#   模型在第一次调用（或warmup()/preload()）时加载一次，之后每次调用只包含读图和稳态推理；
+#   config.json 中 process_img.preload_on_import 为 true 时，导入本模块即在后台开始加载。
 #
 # 参数:
-#   img_path: 要识别的图片的路径（绝对或相对路径）
+#   img_path: 要识别的图片的路径（绝对或相对路径），或已解码的BGR图像（numpy数组，
+#             src-3/main.py 使用 --frame-cache 预解码缓存时传入）
 #
 # 返回:
 #   int: 识别到的网球数量（与 test 项目中“图片对应输出结果.txt”格式一致）
 #
 def process_img(img_path):
-    # 实际实现逻辑（示例）：
-    # 1. 读取图像（如使用 OpenCV）
-    # 2. 调用 YOLOv5 等模型进行网球检测
-    # 3. 统计检测到的网球数量（返回值）
-    # 4. 记录处理时间（通过 time 模块计时）
-    pass
+    return get_engine().count_balls(img_path)
+
+
+if os.path.exists(CONFIG_PATH):
+    with open(CONFIG_PATH, 'r') as _f:
+        if json.load(_f).get("process_img", {}).get("preload_on_import", False):
+            preload()
 
 #
 # 以下代码仅作为本地测试时使用（非提交版本），用于验证模块功能：
@@ -31,7 +146,11 @@ def process_img(img_path):
 if __name__ == '__main__':
     imgs_folder = './test_imgs/'  # 测试图像目录（与 test 项目路径一致）
     img_paths = [f for f in os.listdir(imgs_folder) if f.endswith(('.jpg', '.png'))]
-    
+
+    # 冷启动（模型加载 + 预热）单独计时，不计入单张处理时间
+    stats = warmup()
+    print(f"冷启动: 加载 {stats['load_time'] * 1000:.2f}ms, 预热 {stats['warmup_time'] * 1000:.2f}ms")
+
     total_time = 0  # 总处理时间（与 test 项目统计逻辑一致）
     results = []    # 存储每张图像的结果（识别数量、处理时间）
 
@@ -59,4 +178,4 @@ if __name__ == '__main__':
 
     # 可选：将结果保存为文件（与 test 项目输出格式兼容）
     # with open('test_results.json', 'w') as f:
-    #     json.dump({"avg_time_ms": avg_time, "details": results}, f, indent=2)
\ No newline at end of file
+    #     json.dump({"avg_time_ms": avg_time, "details": results}, f, indent=2)
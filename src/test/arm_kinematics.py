@@ -0,0 +1,43 @@
+# arm_kinematics.py
+# 3自由度机械臂（底座旋转 + 肩 + 肘）的正/逆运动学（解析解）
+#
+# 坐标约定（与ArmVisualizer一致）：
+#   竖直平面内，肩关节位于底座上方BASE_HEIGHT处；第一连杆方向角为 shoulder - 90°，第二连杆为 shoulder + elbow - 90°
+#   夹爪与前臂共线，末端点在肘关节外 ELBOW_LENGTH + GRIPPER_LENGTH 处
+#   地面坐标：x为右侧偏移、y为正前方距离（cm），底座舵机90°朝正前方，向右为正
+import math
+
+BASE_HEIGHT = 5
+SHOULDER_LENGTH = 20
+ELBOW_LENGTH = 20
+GRIPPER_LENGTH = 10
+FOREARM_LENGTH = ELBOW_LENGTH + GRIPPER_LENGTH  # 肘关节到夹爪末端
+SERVO_RANGE = (0.0, 180.0)
+
+
+def forward_kinematics(shoulder_angle, elbow_angle):
+    """竖直平面内的关节位置：返回 (肩, 肘, 腕, 夹爪末端) 四个 (水平距离, 高度) 点"""
+    a1 = math.radians(shoulder_angle - 90)
+    a2 = math.radians(shoulder_angle + elbow_angle - 90)
+    shoulder = (0.0, float(BASE_HEIGHT))
+    elbow = (shoulder[0] + SHOULDER_LENGTH * math.cos(a1), shoulder[1] + SHOULDER_LENGTH * math.sin(a1))
+    wrist = (elbow[0] + ELBOW_LENGTH * math.cos(a2), elbow[1] + ELBOW_LENGTH * math.sin(a2))
+    tip = (elbow[0] + FOREARM_LENGTH * math.cos(a2), elbow[1] + FOREARM_LENGTH * math.sin(a2))
+    return shoulder, elbow, wrist, tip
+
+
+def solve(x, y, height=0.0):
+    """解析逆解：目标点 (x, y, 高度) -> (base, shoulder, elbow)，不可达时返回None（含关节限位检查）"""
+    low, high = SERVO_RANGE
+    base = 90 + math.degrees(math.atan2(x, y))
+    reach, dz = math.hypot(x, y), height - BASE_HEIGHT
+    cos_q2 = (reach ** 2 + dz ** 2 - SHOULDER_LENGTH ** 2 - FOREARM_LENGTH ** 2) / (2 * SHOULDER_LENGTH * FOREARM_LENGTH)
+    if abs(cos_q2) > 1.0 or not low <= base <= high:
+        return None
+    q2 = math.acos(cos_q2)
+    q1 = math.atan2(dz, reach) - math.atan2(FOREARM_LENGTH * math.sin(q2), SHOULDER_LENGTH + FOREARM_LENGTH * math.cos(q2))
+    shoulder, elbow = math.degrees(q1) + 90, math.degrees(q2)
+    if not (low <= shoulder <= high and low <= elbow <= high):
+        return None
+    return base, shoulder, elbow
+
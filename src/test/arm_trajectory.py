@@ -0,0 +1,117 @@
+# arm_trajectory.py
+# 机械臂多关节同步轨迹：所有舵机同时运动，按速度/加速度上限做梯形插值，到位等待时间随转角大小变化
+import time
+
+import numpy as np
+
+JOINTS = ("base", "shoulder", "elbow", "gripper")
+
+
+def angle_to_duty(angle):
+    """舵机角度 -> PWM占空比 (2.5%-12.5%)"""
+    return 2.5 + (angle / 180) * 10
+
+
+def duty_to_angle(duty):
+    """PWM占空比 -> 舵机角度（angle_to_duty的逆变换）"""
+    return (duty - 2.5) / 10 * 180
+
+
+def trapezoid_duration(distance, max_velocity, max_acceleration):
+    """走完distance（>=0）所需的最短时间（梯形速度曲线，距离太短时退化为三角形）"""
+    if distance <= 0:
+        return 0.0
+    ramp_distance = max_velocity ** 2 / max_acceleration
+    if distance < ramp_distance:
+        return 2 * np.sqrt(distance / max_acceleration)
+    return distance / max_velocity + max_velocity / max_acceleration
+
+
+def trapezoid_position(t, distance, max_velocity, max_acceleration):
+    """梯形速度曲线在t时刻走过的距离（t超过总时长时为distance）"""
+    total = trapezoid_duration(distance, max_velocity, max_acceleration)
+    if t >= total:
+        return distance
+    ramp_time = min(max_velocity / max_acceleration, total / 2)
+    peak_velocity = max_acceleration * ramp_time
+    if t < ramp_time:
+        return 0.5 * max_acceleration * t ** 2
+    if t < total - ramp_time:
+        return 0.5 * peak_velocity * ramp_time + peak_velocity * (t - ramp_time)
+    remaining = total - t
+    return distance - 0.5 * max_acceleration * remaining ** 2
+
+
+class JointTrajectory:
+    """从start到target的同步轨迹：各关节沿关节空间直线同时出发、同时到达
+
+    把所有关节折算到同一个归一化进度s∈[0,1]上：s的速度/加速度上限取各关节上限除以各自转角中最严格的一个，
+    因此任何关节都不会超过自己的速度和加速度限制。
+    """
+
+    def __init__(self, start, target, max_velocity, max_acceleration):
+        self.start = np.asarray(start, dtype=np.float64)
+        self.target = np.asarray(target, dtype=np.float64)
+        self.delta = self.target - self.start
+        distance = np.abs(self.delta)
+        moving = distance > 1e-9
+        if moving.any():
+            self.s_velocity = float(np.min(np.asarray(max_velocity, dtype=np.float64)[moving] / distance[moving]))
+            self.s_acceleration = float(np.min(np.asarray(max_acceleration, dtype=np.float64)[moving] / distance[moving]))
+            self.duration = trapezoid_duration(1.0, self.s_velocity, self.s_acceleration)
+        else:
+            self.s_velocity = self.s_acceleration = 1.0
+            self.duration = 0.0
+
+    def sample(self, t):
+        """t时刻各关节的角度"""
+        if self.duration == 0.0:
+            return self.target.copy()
+        s = trapezoid_position(t, 1.0, self.s_velocity, self.s_acceleration)
+        return self.start + self.delta * s
+
+
+class ArmTrajectoryEngine:
+    """按固定频率向所有舵机同时下发插值后的角度
+
+    servos: {关节名: PWM对象}，PWM对象为None时不输出（模拟模式）；真实/模拟PWM只需支持ChangeDutyCycle
+    clock / sleep: 时间源，默认使用真实时间
+    """
+
+    def __init__(self, servos, arm_config, clock=time.monotonic, sleep=time.sleep):
+        self.servos = servos
+        self.clock = clock
+        self.sleep = sleep
+        self.update_interval = 1.0 / arm_config.get("update_rate", 50)
+        self.max_velocity = np.array([arm_config.get("max_velocity", 180)] * 3
+                                     + [arm_config.get("gripper_max_velocity", 360)], dtype=np.float64)
+        self.max_acceleration = np.array([arm_config.get("max_acceleration", 720)] * 3
+                                         + [arm_config.get("gripper_max_acceleration", 1440)], dtype=np.float64)
+        self.settle_time = arm_config.get("settle_time", 0.05)
+        self.settle_per_degree = arm_config.get("settle_per_degree", 0.002)
+        # 舵机没有位置反馈，初始位置按配置的初始姿态计
+        self.pose = np.asarray(arm_config.get("home_pose", [90, 90, 0, 90]), dtype=np.float64)
+        self.last_move_time = 0.0
+
+    def _write(self, angles):
+        for joint, angle in zip(JOINTS, angles):
+            pwm = self.servos.get(joint)
+            if pwm is not None:
+                pwm.ChangeDutyCycle(angle_to_duty(angle))
+
+    def move_to(self, target):
+        """所有关节同时运动到target (base, shoulder, elbow, gripper)，阻塞到到位，返回姿态切换总耗时（秒）"""
+        start_time = self.clock()
+        trajectory = JointTrajectory(self.pose, target, self.max_velocity, self.max_acceleration)
+        elapsed = 0.0
+        while elapsed < trajectory.duration:
+            self._write(trajectory.sample(elapsed))
+            self.sleep(min(self.update_interval, trajectory.duration - elapsed))
+            elapsed = self.clock() - start_time
+        self._write(trajectory.target)
+        self.pose = trajectory.target.copy()
+
+        # 舵机跟随指令有滞后，到位等待时间随最大转角线性增加
+        self.sleep(self.settle_time + self.settle_per_degree * float(np.max(np.abs(trajectory.delta))))
+        self.last_move_time = self.clock() - start_time
+        return self.last_move_time
@@ -1,68 +1,111 @@
-import matplotlib.pyplot as plt
+import os
+import threading
+import time
+
+import cv2
+import matplotlib
+import matplotlib.patches
 import numpy as np
 
-class ArmVisualizer:
-    def __init__(self):
-        # 尝试使用系统中可能存在的中文字体
-        plt.rcParams["font.family"] = ["SimHei"]  # 可根据系统情况修改字体名称
+import arm_kinematics
 
-        self.fig, self.ax = plt.subplots(figsize=(8, 6))
-        self.ax.set_xlim(-50, 50)
-        self.ax.set_ylim(0, 60)
-        self.ax.set_aspect('equal')
-        self.ax.set_title("机械臂动作模拟")
 
-        # 机械臂参数（单位：cm）
-        self.base_height = 5
-        self.shoulder_length = 20
-        self.elbow_length = 20
-        self.gripper_length = 10
+class ArmVisualizer:
+    """机械臂动作模拟显示
+
+    update_arm()可在任意线程调用，只记录最新姿态；show()所在线程按max_fps合并更新并绘制。
+    弹窗显示（pyplot）时show()必须在主线程中调用；只有offscreen模式可以放到后台线程。
+    绘制采用blit：静态背景（坐标轴、底座）只渲染一次并缓存，每帧只重画连杆、关节、夹爪、网球和距离文字。
+    offscreen为True时使用Agg离屏渲染，不弹窗口，每次姿态变化输出一帧到output：
+    以.mp4/.avi结尾时写视频，否则视为目录写PNG序列。
+    """
+
+    def __init__(self, max_fps=20, offscreen=False, output=None):
+        # 机械臂参数（单位：cm，与逆运动学共用）
+        self.base_height = arm_kinematics.BASE_HEIGHT
+        self.shoulder_length = arm_kinematics.SHOULDER_LENGTH
+        self.elbow_length = arm_kinematics.ELBOW_LENGTH
+        self.gripper_length = arm_kinematics.GRIPPER_LENGTH
 
         # 初始化关节角度
         self.shoulder_angle = 90  # 肩部角度（垂直）
         self.elbow_angle = 0      # 肘部角度
         self.gripper_open = True  # 夹爪状态
+        self.ball_pos = None      # 网球位置
+
+        self.min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.offscreen = offscreen
+        self.output = output
+        self.lock = threading.Lock()
+        self.pending_pose = None  # 尚未绘制的最新姿态
+        self.stopped = threading.Event()
+        self.rendered_frames = 0
+        self.written_frames = 0
+        self.video_writer = None
 
-        # 绘制元素
-        self.base = plt.Circle((0, 0), 3, color='blue')
-        self.shoulder = plt.Circle((0, self.base_height), 2, color='red')
-        self.elbow = plt.Circle((0, 0), 2, color='red')
-        self.gripper = plt.Circle((0, 0), 2, color='green')
-
-        # 机械臂连杆
-        self.arm1, = self.ax.plot([], [], 'b-', lw=5)
-        self.arm2, = self.ax.plot([], [], 'b-', lw=5)
-        self.gripper_arms, = self.ax.plot([], [], 'g-', lw=3)
+    def update_arm(self, shoulder_angle, elbow_angle, gripper_open, ball_pos=None):
+        """更新机械臂姿态（线程安全，不绘制；绘制前的多次更新只保留最后一次）"""
+        with self.lock:
+            self.pending_pose = (shoulder_angle, elbow_angle, gripper_open, ball_pos)
 
-        self.ax.add_patch(self.base)
-        self.ax.add_patch(self.shoulder)
-        self.ax.add_patch(self.elbow)
-        self.ax.add_patch(self.gripper)
+    def _setup_figure(self):
+        # 尝试使用系统中可能存在的中文字体
+        matplotlib.rcParams["font.family"] = ["SimHei"]  # 可根据系统情况修改字体名称
+        if self.offscreen:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+            self.fig = Figure(figsize=(8, 6))
+            FigureCanvasAgg(self.fig)
+            self.ax = self.fig.add_subplot()
+        else:
+            import matplotlib.pyplot as plt
+            self.fig, self.ax = plt.subplots(figsize=(8, 6))
+        self.ax.set_xlim(-50, 50)
+        self.ax.set_ylim(0, 60)
+        self.ax.set_aspect('equal')
+        self.ax.set_title("机械臂动作模拟")
 
-        # 网球位置（初始为None）
-        self.tennis_ball = None
-        self.ball_pos = None
+        # 静态元素：底座
+        self.ax.add_patch(matplotlib.patches.Circle((0, 0), 3, color='blue'))
+
+        # 动态元素（animated=True：不参与整图重绘，只在blit时单独绘制）
+        self.shoulder = matplotlib.patches.Circle((0, self.base_height), 2, color='red', animated=True)
+        self.elbow = matplotlib.patches.Circle((0, 0), 2, color='red', animated=True)
+        self.gripper = matplotlib.patches.Circle((0, 0), 2, color='green', animated=True)
+        self.tennis_ball = matplotlib.patches.Circle((0, 0), 3, color='yellow', animated=True, visible=False)
+        for patch in (self.shoulder, self.elbow, self.gripper, self.tennis_ball):
+            self.ax.add_patch(patch)
+        self.arm1, = self.ax.plot([], [], 'b-', lw=5, animated=True)
+        self.arm2, = self.ax.plot([], [], 'b-', lw=5, animated=True)
+        self.gripper_arms, = self.ax.plot([], [], 'g-', lw=3, animated=True)
+        self.distance_text = self.ax.text(0.5, 0.95, "", transform=self.ax.transAxes, ha='center', animated=True)
+        self.animated_artists = [self.arm1, self.arm2, self.gripper_arms, self.shoulder, self.elbow,
+                                 self.gripper, self.tennis_ball, self.distance_text]
+
+        # 渲染一次静态背景并缓存；窗口大小变化时（draw_event）重新缓存
+        self.background = None
+        self.fig.canvas.mpl_connect('draw_event', self._on_draw)
+        if self.offscreen:
+            self.fig.canvas.draw()
+        else:
+            import matplotlib.pyplot as plt
+            plt.show(block=False)
+            self.fig.canvas.draw()
+            self.fig.canvas.flush_events()
 
-        # 设置非阻塞显示
-        plt.ion()
-        self.fig.show()
+    def _on_draw(self, event):
+        self.background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
 
-    def update_arm(self, shoulder_angle, elbow_angle, gripper_open, ball_pos=None):
-        """更新机械臂姿态"""
+    def _apply_pose(self, shoulder_angle, elbow_angle, gripper_open, ball_pos):
+        """根据姿态更新动态元素的几何数据"""
         self.shoulder_angle = shoulder_angle
         self.elbow_angle = elbow_angle
         self.gripper_open = gripper_open
         self.ball_pos = ball_pos
 
-        # 计算关节位置
-        shoulder_x = 0
-        shoulder_y = self.base_height
-
-        elbow_x = shoulder_x + self.shoulder_length * np.cos(np.radians(shoulder_angle - 90))
-        elbow_y = shoulder_y + self.shoulder_length * np.sin(np.radians(shoulder_angle - 90))
-
-        gripper_x = elbow_x + self.elbow_length * np.cos(np.radians(shoulder_angle + elbow_angle - 90))
-        gripper_y = elbow_y + self.elbow_length * np.sin(np.radians(shoulder_angle + elbow_angle - 90))
+        # 计算关节位置（夹爪画在末端点，与逆解的目标点一致）
+        (shoulder_x, shoulder_y), (elbow_x, elbow_y), _, (gripper_x, gripper_y) = \
+            arm_kinematics.forward_kinematics(shoulder_angle, elbow_angle)
 
         # 更新关节位置
         self.shoulder.center = (shoulder_x, shoulder_y)
@@ -73,45 +116,66 @@ class ArmVisualizer:
         self.arm1.set_data([shoulder_x, elbow_x], [shoulder_y, elbow_y])
         self.arm2.set_data([elbow_x, gripper_x], [elbow_y, gripper_y])
 
-        # 更新夹爪
-        if self.gripper_open:
-            # 张开状态
-            gripper_arm1_x = [gripper_x - 5, gripper_x]
-            gripper_arm1_y = [gripper_y - 3, gripper_y]
-            gripper_arm2_x = [gripper_x + 5, gripper_x]
-            gripper_arm2_y = [gripper_y - 3, gripper_y]
+        # 更新夹爪（张开 / 闭合）
+        spread, drop = (5, 3) if gripper_open else (2, 1)
+        self.gripper_arms.set_data([gripper_x - spread, gripper_x, None, gripper_x + spread, gripper_x],
+                                   [gripper_y - drop, gripper_y, None, gripper_y - drop, gripper_y])
+
+        # 更新网球位置和距离
+        if ball_pos:
+            self.tennis_ball.center = ball_pos
+            self.tennis_ball.set_visible(True)
+            ball_dist = np.sqrt(ball_pos[0]**2 + (ball_pos[1] - self.base_height)**2)
+            self.distance_text.set_text(f"网球距离: {ball_dist:.1f}cm")
         else:
-            # 闭合状态
-            gripper_arm1_x = [gripper_x - 2, gripper_x]
-            gripper_arm1_y = [gripper_y - 1, gripper_y]
-            gripper_arm2_x = [gripper_x + 2, gripper_x]
-            gripper_arm2_y = [gripper_y - 1, gripper_y]
-
-        self.gripper_arms.set_data(gripper_arm1_x + [None] + gripper_arm2_x,
-                                   gripper_arm1_y + [None] + gripper_arm2_y)
-
-        # 更新网球位置
-        if self.tennis_ball and self.ball_pos:
-            self.tennis_ball.center = self.ball_pos
-        elif self.ball_pos:
-            self.tennis_ball = plt.Circle(self.ball_pos, 3, color='yellow')
-            self.ax.add_patch(self.tennis_ball)
-
-        # 更新标题
-        if self.ball_pos:
-            ball_dist = np.sqrt(self.ball_pos[0]**2 + (self.ball_pos[1] - self.base_height)**2)
-            self.ax.set_title(f"机械臂动作模拟 - 网球距离: {ball_dist:.1f}cm")
+            self.tennis_ball.set_visible(False)
+            self.distance_text.set_text("")
+
+    def _render(self):
+        """恢复缓存的背景，只重画动态元素"""
+        canvas = self.fig.canvas
+        if self.background is None:
+            canvas.draw()
+        canvas.restore_region(self.background)
+        for artist in self.animated_artists:
+            self.ax.draw_artist(artist)
+        if self.offscreen:
+            self._write_frame()
         else:
-            self.ax.set_title("机械臂动作模拟")
-
-        # 更新图形
-        self.fig.canvas.draw_idle()
-        self.fig.canvas.flush_events()
-
-        return [self.base, self.shoulder, self.elbow, self.gripper,
-                self.arm1, self.arm2, self.gripper_arms] + ([self.tennis_ball] if self.tennis_ball else [])
+            canvas.blit(self.fig.bbox)
+        self.rendered_frames += 1
+
+    def _write_frame(self):
+        if not self.output:
+            return
+        frame = cv2.cvtColor(np.asarray(self.fig.canvas.buffer_rgba()), cv2.COLOR_RGBA2BGR)
+        if self.output.lower().endswith(('.mp4', '.avi')):
+            if self.video_writer is None:
+                fourcc = cv2.VideoWriter_fourcc(*('mp4v' if self.output.lower().endswith('.mp4') else 'MJPG'))
+                fps = 1.0 / self.min_interval if self.min_interval else 20
+                self.video_writer = cv2.VideoWriter(self.output, fourcc, fps, (frame.shape[1], frame.shape[0]))
+            self.video_writer.write(frame)
+        else:
+            os.makedirs(self.output, exist_ok=True)
+            cv2.imwrite(os.path.join(self.output, f"frame_{self.written_frames:06d}.png"), frame)
+        self.written_frames += 1
 
     def show(self):
-        """保持窗口打开"""
-        plt.ioff()  # 关闭交互模式
-        plt.show()
\ No newline at end of file
+        """绘制循环（直到stop()）：按max_fps取最新姿态绘制；非offscreen时须在主线程调用"""
+        self._setup_figure()
+        while not self.stopped.is_set():
+            tick = time.monotonic()
+            with self.lock:
+                pose, self.pending_pose = self.pending_pose, None
+            if pose is not None:
+                self._apply_pose(*pose)
+                self._render()
+            if not self.offscreen:
+                self.fig.canvas.flush_events()
+            # 限制绘制帧率
+            self.stopped.wait(max(0.0, self.min_interval - (time.monotonic() - tick)) or 0.005)
+        if self.video_writer is not None:
+            self.video_writer.release()
+
+    def stop(self):
+        self.stopped.set()
@@ -0,0 +1,152 @@
+# ball_tracker.py
+# 卡尔曼滤波跟踪 + ROI裁剪重检测：接近网球阶段只在预测位置附近做检测，定期整帧刷新
+import cv2
+import numpy as np
+
+
+class BallTrack:
+    """单个网球的匀速卡尔曼跟踪，状态 [x, y, r, vx, vy, vr]，观测 [x, y, r]（单位: 像素，时间步: 帧）"""
+
+    def __init__(self, track_id, ball):
+        self.track_id = track_id
+        self.kalman = cv2.KalmanFilter(6, 3)
+        self.kalman.transitionMatrix = np.array([
+            [1, 0, 0, 1, 0, 0],
+            [0, 1, 0, 0, 1, 0],
+            [0, 0, 1, 0, 0, 1],
+            [0, 0, 0, 1, 0, 0],
+            [0, 0, 0, 0, 1, 0],
+            [0, 0, 0, 0, 0, 1],
+        ], dtype=np.float32)
+        self.kalman.measurementMatrix = np.eye(3, 6, dtype=np.float32)
+        self.kalman.processNoiseCov = np.diag([1, 1, 0.5, 4, 4, 1]).astype(np.float32)
+        self.kalman.measurementNoiseCov = np.diag([4, 4, 2]).astype(np.float32)
+        self.kalman.errorCovPost = np.diag([10, 10, 10, 100, 100, 25]).astype(np.float32)
+
+        (x, y), radius, _, _ = ball
+        self.kalman.statePost = np.array([[x], [y], [radius], [0], [0], [0]], dtype=np.float32)
+        self.ball = ball     # 最近一次匹配到的检测结果
+        self.misses = 0      # 连续未匹配帧数
+        self.matched = True  # 当前帧是否匹配到检测
+
+    def predict(self):
+        """预测下一帧的 (x, y, r)"""
+        state = self.kalman.predict()
+        return float(state[0, 0]), float(state[1, 0]), max(float(state[2, 0]), 1.0)
+
+    def correct(self, ball):
+        (x, y), radius, _, _ = ball
+        self.kalman.correct(np.array([[x], [y], [radius]], dtype=np.float32))
+        self.ball = ball
+        self.misses = 0
+        self.matched = True
+
+    def mark_missed(self):
+        self.misses += 1
+        self.matched = False
+
+
+class BallTracker:
+    """在TennisBallDetector之上做跟踪：已有轨迹时只检测预测位置周围的裁剪区域
+
+    以下情况做整帧检测：没有轨迹、距上次整帧检测已满full_frame_interval帧、上一帧有轨迹丢失。
+    """
+
+    def __init__(self, detector, tracking_config):
+        self.detector = detector
+        self.full_frame_interval = tracking_config.get("full_frame_interval", 10)
+        self.roi_padding = tracking_config.get("roi_padding", 2.5)     # ROI半边长 = 预测半径 * roi_padding
+        self.min_roi_size = tracking_config.get("min_roi_size", 96)    # ROI最小边长（像素）
+        self.max_misses = tracking_config.get("max_misses", 2)         # 连续未匹配超过该帧数即删除轨迹
+        self.match_distance = tracking_config.get("match_distance", 60)  # 整帧检测时的最大关联距离（像素）
+        self.reset()
+
+    def reset(self):
+        """清空所有轨迹（离开接近阶段时调用）"""
+        self.tracks = []
+        self.next_track_id = 0
+        self.frames_since_full = 0
+        self.track_lost = False
+        self.stats = {"frames": 0, "full_frames": 0, "roi_frames": 0, "roi_pixels": 0, "full_pixels": 0}
+
+    def update(self, frame):
+        """处理一帧，返回与detect_tennis_balls相同格式的balls列表（仅本帧匹配到的球）"""
+        self.stats["frames"] += 1
+        predictions = [track.predict() for track in self.tracks]
+
+        if not self.tracks or self.track_lost or self.frames_since_full >= self.full_frame_interval:
+            balls = self.detector.detect_batch([frame])[0]
+            self._associate(balls, predictions)
+            self.frames_since_full = 0
+            self.track_lost = False
+            self.stats["full_frames"] += 1
+            self.stats["full_pixels"] += frame.shape[0] * frame.shape[1]
+        else:
+            regions = [self._roi(prediction, frame.shape) for prediction in predictions]
+            region_balls = self.detector.detect_regions(frame, regions)
+            for track, prediction, balls in zip(self.tracks, predictions, region_balls):
+                if balls:
+                    track.correct(min(balls, key=lambda b: self._distance(b, prediction)))
+                else:
+                    track.mark_missed()
+            self.frames_since_full += 1
+            self.stats["roi_frames"] += 1
+            self.stats["roi_pixels"] += sum((x2 - x1) * (y2 - y1) for x1, y1, x2, y2 in regions)
+
+        # 删除丢失的轨迹，下一帧回到整帧检测重新捕获
+        alive = [track for track in self.tracks if track.misses <= self.max_misses]
+        if len(alive) < len(self.tracks) or any(not track.matched for track in alive):
+            self.track_lost = True
+        self.tracks = self._merge_duplicates(alive)
+
+        return [track.ball for track in self.tracks if track.matched]
+
+    def _roi(self, prediction, shape):
+        """以预测位置为中心的正方形裁剪区域，裁剪到图像范围内"""
+        x, y, r = prediction
+        half = max(r * self.roi_padding, self.min_roi_size / 2)
+        height, width = shape[:2]
+        x1, y1 = int(max(x - half, 0)), int(max(y - half, 0))
+        x2, y2 = int(min(x + half, width)), int(min(y + half, height))
+        # 预测跑出画面时仍保证一个最小区域，由丢失逻辑触发整帧检测
+        if x2 - x1 < 2 or y2 - y1 < 2:
+            x1, y1, x2, y2 = 0, 0, min(width, self.min_roi_size), min(height, self.min_roi_size)
+        return x1, y1, x2, y2
+
+    @staticmethod
+    def _distance(ball, prediction):
+        (x, y), _, _, _ = ball
+        return np.hypot(x - prediction[0], y - prediction[1])
+
+    def _associate(self, balls, predictions):
+        """整帧检测结果与已有轨迹按距离贪心关联，未关联的检测新建轨迹"""
+        unmatched = list(range(len(balls)))
+        matched_tracks = set()
+        if self.tracks and balls:
+            dist = np.array([[self._distance(ball, p) for ball in balls] for p in predictions])
+            for _ in range(min(len(self.tracks), len(balls))):
+                t, b = np.unravel_index(np.argmin(dist), dist.shape)
+                if dist[t, b] > self.match_distance:
+                    break
+                self.tracks[t].correct(balls[b])
+                matched_tracks.add(t)
+                unmatched.remove(b)
+                dist[t, :] = np.inf
+                dist[:, b] = np.inf
+        for t, track in enumerate(self.tracks):
+            if t not in matched_tracks:
+                track.mark_missed()
+        for b in unmatched:
+            self.tracks.append(BallTrack(self.next_track_id, balls[b]))
+            self.next_track_id += 1
+
+    def _merge_duplicates(self, tracks):
+        """ROI重叠时两条轨迹可能锁定同一个球，保留较早建立的那条"""
+        merged = []
+        for track in tracks:
+            (x, y), r, _, _ = track.ball
+            if any(np.hypot(x - other.ball[0][0], y - other.ball[0][1]) < max(r, other.ball[1])
+                   for other in merged):
+                continue
+            merged.append(track)
+        return merged
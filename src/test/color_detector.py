@@ -0,0 +1,69 @@
+# color_detector.py
+# 基于HSV颜色阈值的经典网球检测（不依赖模型，CPU上几毫秒内完成）
+import cv2
+import numpy as np
+
+
+class ColorBallDetector:
+    """HSV阈值 + 形态学 + 连通域分析 + 圆拟合
+
+    输出格式与YOLOv5的NMS结果一致: (K, 6) [x1, y1, x2, y2, conf, cls]，
+    其中conf为连通域对拟合圆的填充率，便于TennisBallDetector复用同一套后处理。
+    """
+
+    def __init__(self, image_processing_config):
+        self.lower_yellow = np.array(image_processing_config["lower_yellow"], dtype=np.uint8)
+        self.upper_yellow = np.array(image_processing_config["upper_yellow"], dtype=np.uint8)
+        self.min_ball_radius = image_processing_config["min_ball_radius"]
+        self.max_ball_radius = image_processing_config["max_ball_radius"]
+        self.min_fill_ratio = image_processing_config.get("min_fill_ratio", 0.5)  # 连通域面积 / 拟合圆面积
+        self.max_aspect_ratio = image_processing_config.get("max_aspect_ratio", 1.8)  # 外接矩形长宽比上限
+        kernel_size = image_processing_config.get("morph_kernel_size", 5)
+        self.kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (kernel_size, kernel_size))
+
+    def color_mask(self, frame):
+        """HSV阈值分割 + 开闭运算，返回二值掩码"""
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        mask = cv2.inRange(hsv, self.lower_yellow, self.upper_yellow)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self.kernel)   # 去除小噪点
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, self.kernel)  # 填补球面上的反光空洞
+        return mask
+
+    def has_candidates(self, frame, scale=0.25, min_pixels=20):
+        """级联预筛：在缩小的图像上做HSV阈值，黄色像素数达到min_pixels即认为可能有球
+
+        只做阈值计数，不做形态学和连通域分析，开销远小于一次完整检测。
+        """
+        if scale != 1.0:
+            frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        return cv2.countNonZero(cv2.inRange(hsv, self.lower_yellow, self.upper_yellow)) >= min_pixels
+
+    def detect_boxes(self, frame):
+        """检测网球，返回 (K, 6) [x1, y1, x2, y2, fill_ratio, 0]"""
+        mask = self.color_mask(frame)
+        num_labels, _, stats, centroids = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        if num_labels <= 1:
+            return np.zeros((0, 6), dtype=np.float32)
+
+        # 跳过背景（标签0），所有连通域一次性向量化筛选
+        stats = stats[1:].astype(np.float32)
+        centroids = centroids[1:].astype(np.float32)
+        w = stats[:, cv2.CC_STAT_WIDTH]
+        h = stats[:, cv2.CC_STAT_HEIGHT]
+        area = stats[:, cv2.CC_STAT_AREA]
+
+        # 圆拟合：圆心取连通域质心，半径取外接矩形与面积等效圆两者中较大者（部分遮挡时更稳）
+        radius = np.maximum((w + h) / 4, np.sqrt(area / np.pi))
+        fill_ratio = area / (np.pi * radius ** 2)
+        aspect_ratio = np.maximum(w, h) / np.maximum(np.minimum(w, h), 1)
+
+        keep = ((radius > self.min_ball_radius) & (radius < self.max_ball_radius)
+                & (fill_ratio >= self.min_fill_ratio) & (aspect_ratio <= self.max_aspect_ratio))
+        if not keep.any():
+            return np.zeros((0, 6), dtype=np.float32)
+
+        cx, cy, r = centroids[keep, 0], centroids[keep, 1], radius[keep]
+        det = np.stack([cx - r, cy - r, cx + r, cy + r, np.minimum(fill_ratio[keep], 1.0),
+                        np.zeros_like(r)], axis=1)
+        return det[np.argsort(-det[:, 4])]
@@ -0,0 +1,106 @@
+# compare_backends.py
+# 在test_images上并排比较各推理后端（torch / onnxruntime / opencv）的延迟与精度
+#
+# 用法：
+#   python compare_backends.py --export            # 先把best.pt导出为ONNX
+#   python compare_backends.py                     # 比较全部后端
+#   python compare_backends.py --backends torch opencv
+import argparse
+import copy
+import json
+from datetime import datetime
+
+from inference_backends import BACKENDS, sized_onnx_path
+from tennis_ball_detector import TennisBallDetector
+
+
+def compare_backends(config, backend_names):
+    """逐个后端运行无界面基准测试，返回 {后端名: 汇总指标}"""
+    results = {}
+    reference = None  # 第一个成功运行的后端的逐图检测数量，作为一致性参考
+
+    for name in backend_names:
+        backend_config = copy.deepcopy(config)
+        backend_config["yolov5"]["backend"] = name
+        backend_config["test"]["headless"] = True
+        try:
+            detector = TennisBallDetector(backend_config)
+        except (ImportError, FileNotFoundError, ValueError) as e:
+            print(f"跳过后端 {name}: {e}")
+            continue
+
+        print(f"\n>>> 后端: {name}")
+        report = detector.run_benchmark()
+        if not report:
+            continue
+
+        if reference is None:
+            reference = report
+        results[name] = summarize_report(report, reference)
+    return results
+
+
+def summarize_report(report, reference):
+    """从run_benchmark的报告中提取对比用的汇总指标（与参考报告比较逐图检测数量）"""
+    reference_counts = {d["image_name"]: d["detections"] for d in reference["details"]}
+    counts = {d["image_name"]: d["detections"] for d in report["details"]}
+    agreement = sum(counts.get(image) == n for image, n in reference_counts.items()) / max(len(reference_counts), 1)
+
+    total = report["latency"]["detect_total"]
+    return {
+        "load_time": report["startup"]["load_time"],
+        "p50_ms": total["p50_ms"],
+        "p95_ms": total["p95_ms"],
+        "p99_ms": total["p99_ms"],
+        "fps": report["metrics"]["fps"],
+        "precision": report["metrics"]["precision"],
+        "recall": report["metrics"]["recall"],
+        "f1_score": report["metrics"]["f1_score"],
+        "agreement_with_reference": agreement,
+    }
+
+
+def export_sizes(config):
+    """需要导出ONNX的全部输入尺寸：默认尺寸、跟踪ROI尺寸及各状态调度配置中用到的尺寸"""
+    sizes = {config["yolov5"].get("imgsz", 640)}
+    if config["yolov5"].get("roi_imgsz"):
+        sizes.add(config["yolov5"]["roi_imgsz"])
+    for profile in config.get("scheduler", {}).get("states", {}).values():
+        if profile.get("imgsz"):
+            sizes.add(profile["imgsz"])
+    return sorted(sizes)
+
+
+def print_comparison(results):
+    print("\n=== 推理后端对比 ===")
+    print(f"{'后端':<12}{'加载(s)':>9}{'p50(ms)':>10}{'p95(ms)':>10}{'FPS':>8}{'F1':>7}{'一致率':>8}")
+    for name, r in results.items():
+        print(f"{name:<12}{r['load_time']:>9.2f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+              f"{r['fps']:>8.1f}{r['f1_score']:>7.2f}{r['agreement_with_reference']:>8.0%}")
+    if results:
+        fastest = min(results, key=lambda name: results[name]["p50_ms"])
+        print(f"最快后端: {fastest}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="推理后端延迟/精度对比")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--export", action="store_true", help="先把yolov5.model_path导出为ONNX")
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as f:
+        config = json.load(f)
+
+    if args.export:
+        from model_loader import export_onnx
+        for imgsz in export_sizes(config):
+            export_onnx(dict(config["yolov5"], imgsz=imgsz), sized_onnx_path(config["yolov5"], imgsz))
+
+    results = compare_backends(config, args.backends)
+    print_comparison(results)
+
+    output_path = f"backend_comparison_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"对比结果已保存至: {output_path}")
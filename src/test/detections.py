@@ -0,0 +1,89 @@
+# detections.py
+# 一帧检测结果的紧凑表示：结构化NumPy数组 + __slots__包装类
+import numpy as np
+
+DETECTION_DTYPE = np.dtype([
+    ("x", np.float64),         # 中心点x坐标（像素）
+    ("y", np.float64),         # 中心点y坐标（像素）
+    ("radius", np.float64),    # 近似半径（像素）
+    ("distance", np.float64),  # 估计距离（cm）
+    ("offset", np.float64),    # 水平偏移（%，画面中心为0，左负右正）
+    ("conf", np.float32),      # 置信度
+    ("width", np.float32),     # 检测框宽（像素）
+    ("height", np.float32),    # 检测框高（像素）
+])
+
+
+class Detections:
+    """一帧内所有网球的检测结果，按列存放，避免逐个球创建Python对象
+
+    兼容旧接口：迭代、下标访问得到的仍是 ((x, y), radius, distance, horizontal_offset) 元组，
+    len() / 真值判断 / sorted() 等用法与原来的balls列表一致。
+    """
+    __slots__ = ("data",)
+
+    def __init__(self, data=None):
+        self.data = np.zeros(0, dtype=DETECTION_DTYPE) if data is None else data
+
+    @classmethod
+    def from_arrays(cls, x, y, radius, distance, offset, conf, width, height):
+        data = np.empty(len(x), dtype=DETECTION_DTYPE)
+        data["x"], data["y"], data["radius"] = x, y, radius
+        data["distance"], data["offset"] = distance, offset
+        data["conf"], data["width"], data["height"] = conf, width, height
+        return cls(data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        d = self.data
+        columns = (d["x"].tolist(), d["y"].tolist(), d["radius"].tolist(), d["distance"].tolist(), d["offset"].tolist())
+        for x, y, radius, distance, offset in zip(*columns):
+            yield (x, y), radius, distance, offset
+
+    def __getitem__(self, index):
+        if isinstance(index, (slice, np.ndarray, list)):
+            return Detections(self.data[index])
+        row = self.data[index]
+        return ((float(row["x"]), float(row["y"])), float(row["radius"]),
+                float(row["distance"]), float(row["offset"]))
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return f"Detections({list(self)!r})"
+
+    # 按列访问（向量化计算用）
+    @property
+    def x(self):
+        return self.data["x"]
+
+    @property
+    def y(self):
+        return self.data["y"]
+
+    @property
+    def radius(self):
+        return self.data["radius"]
+
+    @property
+    def distance(self):
+        return self.data["distance"]
+
+    @property
+    def offset(self):
+        return self.data["offset"]
+
+    @property
+    def conf(self):
+        return self.data["conf"]
+
+    @property
+    def width(self):
+        return self.data["width"]
+
+    @property
+    def height(self):
+        return self.data["height"]
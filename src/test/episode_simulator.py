@@ -0,0 +1,280 @@
+# episode_simulator.py
+# 端到端捡球仿真（无界面、离散事件）：虚拟球场上随机摆放网球，按相机模型合成检测结果（带噪声和漏检），
+# 驱动TennisBallCollector的状态机和RobotController（记录型模拟GPIO + 虚拟时钟），
+# 底盘按电机占空比运动、夹爪闭合时按舵机角度判断是否抓到球；多进程并行跑大量回合，统计每分钟捡球数和行驶路程
+import argparse
+import contextlib
+import copy
+import itertools
+import json
+import logging
+import math
+import multiprocessing
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+from arm_kinematics import forward_kinematics
+from arm_trajectory import angle_to_duty, duty_to_angle
+from mock_hardware import RecordingGPIO, VirtualClock
+from servo_simulation import DifferentialDrivePlant
+
+DEFAULT_SIM_CONFIG = {
+    "duration": 300.0,          # 每回合最长仿真时间（秒）
+    "dt": 0.01,                 # 底盘积分步长（秒）
+    "detect_fps": 15,           # 检测帧率
+    "court_size": [1000, 600],  # 球场 宽（x）× 长（y），cm；机器人从中心出发、车头朝+y
+    "balls": 10,
+    "frame_size": [1280, 720],
+    "camera_height": 15,        # 相机离地高度（cm），只用于合成检测框的y坐标
+    "distance_noise": 0.03,     # 距离的相对噪声（标准差）
+    "offset_noise": 1.0,        # 水平偏移噪声（%，标准差）
+    "miss_rate": 0.1,           # 每个球每帧的漏检概率
+    "grasp_tolerance": 2.5,     # 夹爪闭合时末端与球心的水平距离容差（cm）
+    "full_speed": 20 / 0.7,     # 底盘参数同servo_simulation
+    "track": 20.0,
+    "motor_tau": 0.1,
+}
+
+
+class CourtWorld:
+    """球场 + 差速底盘 + 前置相机 + 机械臂
+
+    底盘位姿由DifferentialDrivePlant积分（车头朝heading方向），网球为世界坐标系下的地面点；
+    相机与机械臂底座都在底盘原点，机械臂底座再按arm.mount_offset偏移。
+    """
+
+    def __init__(self, config, sim_config, rng):
+        self.rng = rng
+        self.sim_config = sim_config
+        width, length = sim_config["court_size"]
+        self.balls = [np.array([x, y]) for x, y in zip(rng.uniform(0, width, sim_config["balls"]),
+                                                         rng.uniform(0, length, sim_config["balls"]))]
+        self.plant = DifferentialDrivePlant(0, 0, {**sim_config, "fov": 180})
+        self.plant.x, self.plant.y, self.plant.heading = width / 2, length / 2, math.pi / 2
+        self.path_length = 0.0
+
+        image_config = config["image_processing"]
+        self.focal_length = image_config["focal_length"]
+        self.known_ball_diameter = image_config["known_ball_diameter"]
+        self.min_ball_radius = image_config["min_ball_radius"]
+        self.max_ball_radius = image_config["max_ball_radius"]
+        self.frame_width, self.frame_height = sim_config["frame_size"]
+        arm_config = config.get("arm", {})
+        self.mount_offset = arm_config.get("mount_offset", [0, 0])
+        self.grasp_height = arm_config.get("grasp_height", 3.3)
+        self.closed_duty = angle_to_duty(arm_config.get("gripper_closed", 30))
+
+    def relative(self, ball):
+        """世界坐标 -> 机器人坐标系 (x右, y前)"""
+        dx, dy = ball[0] - self.plant.x, ball[1] - self.plant.y
+        cos_h, sin_h = math.cos(self.plant.heading), math.sin(self.plant.heading)
+        return dx * sin_h - dy * cos_h, dx * cos_h + dy * sin_h
+
+    def observe(self):
+        """合成一帧检测结果：((x, y), radius, distance, horizontal_offset) 列表，与检测器的半径过滤一致"""
+        half_width = self.frame_width / 2
+        detections = []
+        for ball in self.balls:
+            right, forward = self.relative(ball)
+            if forward <= 0 or self.rng.random() < self.sim_config["miss_rate"]:
+                continue
+            offset = right / forward * self.focal_length / half_width * 100 + self.rng.normal(0, self.sim_config["offset_noise"])
+            if abs(offset) > 100:
+                continue
+            distance = math.hypot(right, forward) * (1 + self.rng.normal(0, self.sim_config["distance_noise"]))
+            radius = self.known_ball_diameter * self.focal_length / (2 * distance)
+            if not self.min_ball_radius < radius < self.max_ball_radius:
+                continue
+            x = half_width * (1 + offset / 100)
+            y = self.frame_height / 2 + self.focal_length * self.sim_config["camera_height"] / distance
+            detections.append(((x, y), radius, distance, offset))
+        return detections
+
+    def drive(self, command, duration):
+        """按电机占空比 (左, 右) 积分duration秒，累计行驶路程"""
+        self.plant.command = command
+        dt = self.sim_config["dt"]
+        steps = max(1, int(round(duration / dt)))
+        for _ in range(steps):
+            x, y = self.plant.x, self.plant.y
+            self.plant.step(duration / steps)
+            self.path_length += math.hypot(self.plant.x - x, self.plant.y - y)
+
+    def try_grasp(self, base_duty, shoulder_duty, elbow_duty):
+        """夹爪闭合时的舵机占空比 -> 末端地面位置；末端在某个球上时移除该球并返回True"""
+        base, shoulder, elbow = [duty_to_angle(duty) for duty in (base_duty, shoulder_duty, elbow_duty)]
+        reach, height = forward_kinematics(shoulder, elbow)[3]
+        tip = (self.mount_offset[0] + reach * math.sin(math.radians(base - 90)),
+               self.mount_offset[1] + reach * math.cos(math.radians(base - 90)))
+        if abs(height - self.grasp_height) > self.sim_config["grasp_tolerance"]:
+            return False
+        for i, ball in enumerate(self.balls):
+            right, forward = self.relative(ball)
+            if math.hypot(right - tip[0], forward - tip[1]) <= self.sim_config["grasp_tolerance"]:
+                self.balls.pop(i)
+                return True
+        return False
+
+
+def _motor_command(gpio, controller):
+    """从模拟GPIO读回 (左, 右) 带方向的占空比"""
+    levels = gpio.levels
+    left = 1 if levels.get(controller.LEFT_MOTOR_FORWARD) else -1 if levels.get(controller.LEFT_MOTOR_BACKWARD) else 0
+    right = 1 if levels.get(controller.RIGHT_MOTOR_FORWARD) else -1 if levels.get(controller.RIGHT_MOTOR_BACKWARD) else 0
+    return left * controller.left_motor_pwm.duty_cycle, right * controller.right_motor_pwm.duty_cycle
+
+
+def run_episode(config, sim_config, seed):
+    """跑一个回合，返回统计结果（所有时间为虚拟时间）"""
+    from main import TennisBallCollector
+    from robot_controller import RobotController
+
+    rng = np.random.default_rng(seed)
+    hardware_config = copy.deepcopy(config)
+    hardware_config["test"]["test_mode"] = False
+    world = CourtWorld(hardware_config, sim_config, rng)
+    clock = VirtualClock()
+    gpio = RecordingGPIO(clock)
+    wall_start = time.perf_counter()
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):  # 状态机每帧都会打印
+        controller = RobotController(hardware_config, clock=clock, gpio=gpio)
+        collector = TennisBallCollector.for_simulation(hardware_config, controller)
+        gripper_pin = controller.GRIPPER_SERVO
+        arm_pins = (controller.ARM_BASE_SERVO, controller.ARM_SHOULDER_SERVO, controller.ARM_ELBOW_SERVO)
+        frame_interval = 1.0 / sim_config["detect_fps"]
+        frames, grasps, state_time = 0, 0, {}
+        try:
+            while world.balls and clock.now() < sim_config["duration"]:
+                frame_time = clock.now()
+                seen = len(gpio.events)
+                collector._process_detection_results(world.observe())
+                state = collector.current_state
+                frames += 1
+
+                # 夹爪闭合到位的时刻按当时的舵机角度判断是否抓到球（捡球动作期间底盘已停车）
+                if state == collector.STATE_COLLECTING:
+                    for t, kind, pin, value in itertools.islice(gpio.events, seen, None):
+                        if pin == gripper_pin and kind == "pwm" and math.isclose(value, world.closed_duty):
+                            grasps += 1
+                            world.try_grasp(*(gpio.value_at(arm_pin, t, "pwm") for arm_pin in arm_pins))
+
+                # 动作（捡球时的机械臂运动）占用的时间内底盘按当前指令运动，之后等到下一帧
+                busy = clock.now() - frame_time
+                if busy > 0:
+                    world.drive(_motor_command(gpio, controller), busy)
+                next_frame = max(frame_time + frame_interval, clock.now())
+                while clock.now() < next_frame - 1e-9:
+                    step = min(sim_config["dt"], next_frame - clock.now())
+                    world.drive(_motor_command(gpio, controller), step)
+                    clock.sleep(step)
+                state_time[state] = state_time.get(state, 0.0) + clock.now() - frame_time
+        finally:
+            controller.cleanup()
+
+    collected = sim_config["balls"] - len(world.balls)
+    elapsed = clock.now()
+    return {
+        "seed": seed,
+        "collected": collected,
+        "total_balls": sim_config["balls"],
+        "sim_time": elapsed,
+        "balls_per_minute": collected / elapsed * 60 if elapsed else 0.0,
+        "distance_m": world.path_length / 100,
+        "grasp_attempts": grasps,
+        "grasp_misses": grasps - collected,
+        "frames": frames,
+        "state_time": state_time,
+        "wall_time": time.perf_counter() - wall_start,
+    }
+
+
+_worker_args = None  # 工作进程内的 (config, sim_config)
+
+
+def _init_worker(config, sim_config):
+    global _worker_args
+    logging.getLogger("robot_controller").setLevel(logging.ERROR)
+    _worker_args = (config, sim_config)
+
+
+def _run_worker_episode(seed):
+    return run_episode(*_worker_args, seed)
+
+
+def run_episodes(config, episodes=100, workers=0, seed=0, overrides=None):
+    """并行跑episodes个回合（回合i的随机种子为seed+i），按种子顺序返回结果
+
+    workers为0时使用全部CPU核；为1时在当前进程内串行运行。与parallel_evaluation一样用spawn方式创建进程。
+    """
+    sim_config = dict(DEFAULT_SIM_CONFIG, **config.get("episode_simulation", {}), **(overrides or {}))
+    seeds = list(range(seed, seed + episodes))
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or episodes <= 1:
+        _init_worker(config, sim_config)
+        return [_run_worker_episode(s) for s in seeds]
+    context = multiprocessing.get_context("spawn")
+    chunksize = max(1, episodes // (workers * 4))
+    with context.Pool(min(workers, episodes), initializer=_init_worker, initargs=(config, sim_config)) as pool:
+        results = list(pool.imap_unordered(_run_worker_episode, seeds, chunksize=chunksize))
+    return sorted(results, key=lambda r: r["seed"])
+
+
+def summarize(results):
+    rates = np.array([r["balls_per_minute"] for r in results])
+    collected = sum(r["collected"] for r in results)
+    grasps = sum(r["grasp_attempts"] for r in results)
+    distance = sum(r["distance_m"] for r in results)
+    sim_time = sum(r["sim_time"] for r in results)
+    return {
+        "episodes": len(results),
+        "collected": collected,
+        "total_balls": sum(r["total_balls"] for r in results),
+        "completed_episodes": sum(r["collected"] == r["total_balls"] for r in results),
+        "balls_per_minute": collected / sim_time * 60 if sim_time else 0.0,
+        "balls_per_minute_p10": float(np.percentile(rates, 10)),
+        "balls_per_minute_p50": float(np.percentile(rates, 50)),
+        "balls_per_minute_p90": float(np.percentile(rates, 90)),
+        "distance_m": distance,
+        "distance_per_ball_m": distance / collected if collected else None,
+        "grasp_success_rate": collected / grasps if grasps else None,
+        "sim_time": sim_time,
+        "wall_time": sum(r["wall_time"] for r in results),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="端到端捡球仿真：虚拟球场 + 合成检测 + 状态机/控制器，多进程并行")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--episodes", type=int, default=100, help="回合数")
+    parser.add_argument("--workers", type=int, default=0, help="进程数（0为全部CPU核）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--balls", type=int, help="每回合网球数（覆盖episode_simulation.balls）")
+    parser.add_argument("--duration", type=float, help="每回合最长仿真时间（秒）")
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as f:
+        config = json.load(f)
+    overrides = {key: value for key, value in (("balls", args.balls), ("duration", args.duration)) if value is not None}
+
+    start = time.perf_counter()
+    results = run_episodes(config, args.episodes, args.workers, args.seed, overrides)
+    elapsed = time.perf_counter() - start
+    summary = summarize(results)
+    summary["elapsed"] = elapsed
+    print(f"{summary['episodes']} 个回合: 捡到 {summary['collected']}/{summary['total_balls']}，"
+          f"全部捡完 {summary['completed_episodes']} 回合")
+    print(f"每分钟捡球: {summary['balls_per_minute']:.2f}（P10 {summary['balls_per_minute_p10']:.2f} / "
+          f"P50 {summary['balls_per_minute_p50']:.2f} / P90 {summary['balls_per_minute_p90']:.2f}）")
+    if summary["collected"]:
+        print(f"行驶路程: {summary['distance_m']:.1f}m，每球 {summary['distance_per_ball_m']:.2f}m，"
+              f"抓取成功率 {summary['grasp_success_rate'] * 100:.1f}%")
+    print(f"仿真 {summary['sim_time'] / 3600:.1f} 小时，用时 {elapsed:.1f}s（{summary['sim_time'] / elapsed:.0f}× 实时）")
+
+    output_path = f"episode_simulation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_path, 'w') as f:
+        json.dump({"summary": summary, "episodes": results}, f, indent=2)
+    print(f"仿真结果已保存至: {output_path}")
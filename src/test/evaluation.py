@@ -0,0 +1,180 @@
+# evaluation.py
+# 检测结果评估：标注索引（两种标注格式）、代价矩阵 + 匈牙利匹配、COCO风格AP/mAP与PR曲线
+import json
+import os
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from detections import Detections
+
+# COCO风格的IoU阈值 0.50:0.05:0.95
+COCO_IOU_THRESHOLDS = np.round(np.arange(0.5, 0.96, 0.05), 2)
+# 101点插值的召回率采样点
+RECALL_POINTS = np.linspace(0, 1, 101)
+
+
+class GroundTruthIndex:
+    """一次性加载全部标注到内存，按图像名查询
+
+    支持两种格式：
+      - ground_truth/<图像名>.json: {"balls": [{"x": 中心x, "y": 中心y, "radius": 半径}, ...]}
+      - annotations.json: {"<图像名>.jpg": [{"x": 左上x, "y": 左上y, "w": 宽, "h": 高}, ...], ...}
+    同一图像两种标注都存在时以逐图json为准。内部统一存为 (K, 4) 的 [x1, y1, x2, y2] 框。
+    """
+
+    def __init__(self, ground_truth_dir=None, annotations_path=None):
+        self.boxes = {}
+        if annotations_path and os.path.exists(annotations_path):
+            with open(annotations_path, 'r') as f:
+                for image_name, objects in json.load(f).items():
+                    self.boxes[image_name] = np.array(
+                        [[o["x"], o["y"], o["x"] + o["w"], o["y"] + o["h"]] for o in objects],
+                        dtype=np.float64).reshape(-1, 4)
+        if ground_truth_dir and os.path.isdir(ground_truth_dir):
+            for file_name in os.listdir(ground_truth_dir):
+                if not file_name.endswith('.json'):
+                    continue
+                try:
+                    with open(os.path.join(ground_truth_dir, file_name), 'r') as f:
+                        balls = json.load(f).get('balls', [])
+                except (OSError, ValueError) as e:
+                    print(f"无法加载标注数据: {e}")
+                    continue
+                image_name = file_name[:-len('.json')] + '.jpg'
+                self.boxes[image_name] = np.array(
+                    [[b["x"] - b["radius"], b["y"] - b["radius"], b["x"] + b["radius"], b["y"] + b["radius"]]
+                     for b in balls], dtype=np.float64).reshape(-1, 4)
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def __contains__(self, image_name):
+        return image_name in self.boxes
+
+    def get_boxes(self, image_name):
+        """返回 (K, 4) [x1, y1, x2, y2]，没有标注时为空数组"""
+        return self.boxes.get(image_name, np.zeros((0, 4)))
+
+    def get_circles(self, image_name):
+        """返回 [{"x", "y", "radius"}, ...]，即逐图json的格式，供中心点/半径评估使用"""
+        boxes = self.get_boxes(image_name)
+        centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+        radii = ((boxes[:, 2] - boxes[:, 0]) + (boxes[:, 3] - boxes[:, 1])) / 4
+        return [{"x": float(x), "y": float(y), "radius": float(r)} for (x, y), r in zip(centers, radii)]
+
+
+def detection_arrays(balls):
+    """检测结果 -> (框 (N, 4) [x1, y1, x2, y2], 置信度 (N,))；元组列表没有置信度时记为1"""
+    if isinstance(balls, Detections):
+        half_w, half_h = balls.width / 2, balls.height / 2
+        boxes = np.stack([balls.x - half_w, balls.y - half_h, balls.x + half_w, balls.y + half_h], axis=1)
+        return boxes.astype(np.float64), balls.conf.astype(np.float64)
+    boxes = np.array([[x - r, y - r, x + r, y + r] for (x, y), r, _, _ in balls], dtype=np.float64).reshape(-1, 4)
+    return boxes, np.ones(len(boxes))
+
+
+def box_iou(boxes_a, boxes_b):
+    """两组框两两之间的IoU矩阵 (N, M)"""
+    lt = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    rb = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    inter = np.prod(np.clip(rb - lt, 0, None), axis=2)
+    area_a = np.prod(boxes_a[:, 2:] - boxes_a[:, :2], axis=1)
+    area_b = np.prod(boxes_b[:, 2:] - boxes_b[:, :2], axis=1)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+def optimal_matches(cost, valid):
+    """在valid为True的候选对中求代价最小的一一匹配，返回匹配上的 (检测索引, 标注索引)"""
+    if not valid.any():
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+    # 不合法的配对给一个足够大的代价，求解后再剔除
+    big = cost[valid].max() + 1.0 if valid.any() else 1.0
+    rows, cols = linear_sum_assignment(np.where(valid, cost, big * (1 + valid.size)))
+    keep = valid[rows, cols]
+    return rows[keep], cols[keep]
+
+
+def match_by_center(balls, ground_truth, max_distance=30, max_radius_diff=15):
+    """按中心距离 + 半径差匹配（原_evaluate_detection的判定条件），代价矩阵上做最优指派
+
+    ground_truth: [{"x", "y", "radius"}, ...]
+    返回: (TP, FP, FN)
+    """
+    num_det, num_gt = len(balls), len(ground_truth)
+    if num_det == 0 or num_gt == 0:
+        return 0, num_det, num_gt
+    if isinstance(balls, Detections):
+        det = np.stack([balls.x, balls.y, balls.radius], axis=1)
+    else:
+        det = np.array([(x, y, r) for (x, y), r, _, _ in balls], dtype=np.float64)
+    gt = np.array([(g['x'], g['y'], g['radius']) for g in ground_truth], dtype=np.float64)
+
+    center_dist = np.hypot(det[:, None, 0] - gt[None, :, 0], det[:, None, 1] - gt[None, :, 1])
+    radius_diff = np.abs(det[:, None, 2] - gt[None, :, 2])
+    valid = (center_dist < max_distance) & (radius_diff < max_radius_diff)
+    rows, _ = optimal_matches(center_dist, valid)
+    true_positives = len(rows)
+    return true_positives, num_det - true_positives, num_gt - true_positives
+
+
+class DetectionEvaluator:
+    """逐图累积检测结果，计算COCO风格的AP（多个IoU阈值）和PR曲线
+
+    每张图在每个IoU阈值下用匈牙利算法（代价为1-IoU）做一一匹配，再把全部检测按置信度排序累计PR。
+    """
+
+    def __init__(self, iou_thresholds=COCO_IOU_THRESHOLDS):
+        self.iou_thresholds = np.asarray(iou_thresholds, dtype=np.float64)
+        self.scores = []
+        self.tp_flags = []  # 每张图 (N, T) 布尔数组：第n个检测在第t个阈值下是否为TP
+        self.num_gt = 0
+
+    def add(self, balls, gt_boxes):
+        det_boxes, scores = detection_arrays(balls)
+        flags = np.zeros((len(det_boxes), len(self.iou_thresholds)), dtype=bool)
+        if len(det_boxes) and len(gt_boxes):
+            iou = box_iou(det_boxes, gt_boxes)
+            for t, threshold in enumerate(self.iou_thresholds):
+                rows, _ = optimal_matches(1 - iou, iou >= threshold)
+                flags[rows, t] = True
+        self.scores.append(scores)
+        self.tp_flags.append(flags)
+        self.num_gt += len(gt_boxes)
+
+    def compute(self):
+        """返回 {"mAP", "AP50", "AP75", "ap_per_threshold", "pr_curve"}，pr_curve为IoU=0.5时的101点曲线"""
+        if not self.scores or self.num_gt == 0:
+            return {"mAP": 0.0, "AP50": 0.0, "AP75": 0.0, "ap_per_threshold": {}, "pr_curve": {}}
+        scores = np.concatenate(self.scores)
+        flags = np.concatenate(self.tp_flags)
+        order = np.argsort(-scores, kind="mergesort")
+        flags = flags[order]
+
+        tp_cum = np.cumsum(flags, axis=0)
+        fp_cum = np.cumsum(~flags, axis=0)
+        recall = tp_cum / self.num_gt
+        precision = tp_cum / np.maximum(tp_cum + fp_cum, 1)
+
+        ap = np.zeros(len(self.iou_thresholds))
+        curves = np.zeros((len(self.iou_thresholds), len(RECALL_POINTS)))
+        for t in range(len(self.iou_thresholds)):
+            # 精度包络（从右向左取最大值），再在101个召回率点上插值
+            envelope = np.maximum.accumulate(precision[::-1, t])[::-1] if len(precision) else precision[:, t]
+            idx = np.searchsorted(recall[:, t], RECALL_POINTS, side="left")
+            valid = idx < len(envelope)
+            curves[t, valid] = envelope[idx[valid]]
+            ap[t] = curves[t].mean()
+
+        ap_per_threshold = {f"{thr:.2f}": float(v) for thr, v in zip(self.iou_thresholds, ap)}
+        t50 = int(np.argmin(np.abs(self.iou_thresholds - 0.5)))
+        t75 = int(np.argmin(np.abs(self.iou_thresholds - 0.75)))
+        return {
+            "mAP": float(ap.mean()),
+            "AP50": float(ap[t50]),
+            "AP75": float(ap[t75]),
+            "ap_per_threshold": ap_per_threshold,
+            "pr_curve": {"iou": float(self.iou_thresholds[t50]),
+                         "recall": RECALL_POINTS.tolist(),
+                         "precision": curves[t50].tolist()},
+        }
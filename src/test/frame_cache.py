@@ -0,0 +1,145 @@
+# frame_cache.py
+# 预解码图像缓存：把测试目录中的图像一次性解码为原始BGR像素，存入单个内存映射文件 + 索引文件
+# 基准测试重复运行时直接从映射文件零拷贝取帧，不再重复JPEG解码
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+
+import cv2
+import numpy as np
+
+INDEX_FILE = "index.json"
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+def _source_signature(images_dir, image_name):
+    stat = os.stat(os.path.join(images_dir, image_name))
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _is_fresh(images_dir, cache_dir):
+    """缓存索引与图像目录一致（文件名、大小、修改时间都相同）时返回True"""
+    index_path = os.path.join(cache_dir, INDEX_FILE)
+    if not os.path.exists(index_path):
+        return False
+    with open(index_path, 'r') as f:
+        index = json.load(f)
+    if "frames_file" not in index or not os.path.exists(os.path.join(cache_dir, index["frames_file"])):
+        return False
+    image_names = sorted(f for f in os.listdir(images_dir) if f.endswith(IMAGE_EXTENSIONS))
+    cached = {entry["name"]: entry["source"] for entry in index["frames"]}
+    cached.update({name: None for name in index.get("unreadable", [])})
+    if sorted(cached) != image_names:
+        return False
+    return all(source is None or source == _source_signature(images_dir, name) for name, source in cached.items())
+
+
+def _write_atomic(path, write):
+    """写入同目录下唯一的临时文件后原子替换path（多个进程同时写也不会互相覆盖或留下半个文件）"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def build_frame_cache(images_dir, cache_dir, force=False):
+    """解码images_dir下的全部图像，顺序写入cache_dir/frames_<签名>.bin，并写索引cache_dir/index.json
+
+    索引中每帧记录偏移、形状和源文件签名；缓存已是最新时直接返回（force为True时强制重建）。
+    数据文件名取自源图像签名的哈希，先写数据文件、最后原子替换索引：读取方先读索引再打开它指向的数据文件，
+    任何时刻看到的索引和数据都是一致的；多个进程同时构建时写出的内容相同，谁最后替换都一样。
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    if not force and _is_fresh(images_dir, cache_dir):
+        return False
+
+    image_names = sorted(f for f in os.listdir(images_dir) if f.endswith(IMAGE_EXTENSIONS))
+    sources = {name: _source_signature(images_dir, name) for name in image_names}
+    digest = hashlib.sha256(json.dumps(sources, sort_keys=True).encode()).hexdigest()[:16]
+    frames_file = f"frames_{digest}.bin"
+    entries = []
+    unreadable = []
+    offset = 0
+
+    def write_frames(f):
+        nonlocal offset
+        for image_name in image_names:
+            frame = cv2.imread(os.path.join(images_dir, image_name))
+            if frame is None:
+                print(f"无法读取图像: {image_name}")
+                unreadable.append(image_name)
+                continue
+            frame = np.ascontiguousarray(frame)
+            f.write(frame.tobytes())
+            entries.append({"name": image_name, "offset": offset, "shape": list(frame.shape),
+                            "source": sources[image_name]})
+            offset += frame.nbytes
+
+    _write_atomic(os.path.join(cache_dir, frames_file), write_frames)
+    index = {"images_dir": os.path.abspath(images_dir), "dtype": "uint8", "total_bytes": offset,
+             "frames_file": frames_file, "frames": entries, "unreadable": unreadable}
+    _write_atomic(os.path.join(cache_dir, INDEX_FILE), lambda f: f.write(json.dumps(index, indent=2).encode()))
+
+    # 清理旧版本的数据文件（已打开的内存映射在Linux上不受影响，其他系统上删除失败则留到下次）
+    for name in os.listdir(cache_dir):
+        if name.startswith("frames") and name.endswith(".bin") and name != frames_file:
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
+    print(f"已生成预解码缓存: {len(entries)} 帧, {offset / 1024 / 1024:.1f} MB -> {cache_dir}")
+    return True
+
+
+class FrameCache:
+    """只读的预解码帧存储：get()返回指向内存映射文件的ndarray视图（零拷贝、只读）"""
+
+    def __init__(self, cache_dir):
+        with open(os.path.join(cache_dir, INDEX_FILE), 'r') as f:
+            index = json.load(f)
+        self.entries = {entry["name"]: entry for entry in index["frames"]}
+        self.buffer = None
+        if index["total_bytes"] > 0:
+            self.buffer = np.memmap(os.path.join(cache_dir, index["frames_file"]), dtype=np.uint8, mode='r',
+                                    shape=(index["total_bytes"],))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, image_name):
+        return image_name in self.entries
+
+    def names(self):
+        return sorted(self.entries)
+
+    def get(self, image_name):
+        """返回 (H, W, 3) BGR帧；不在缓存中时返回None（与cv2.imread一致）"""
+        entry = self.entries.get(image_name)
+        if entry is None:
+            return None
+        shape = tuple(entry["shape"])
+        size = int(np.prod(shape))
+        return self.buffer[entry["offset"]:entry["offset"] + size].reshape(shape)
+
+
+def open_frame_cache(images_dir, cache_dir):
+    """缓存不存在或已过期时先重建，再打开"""
+    build_frame_cache(images_dir, cache_dir)
+    return FrameCache(cache_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="把测试图像目录预解码为内存映射帧缓存")
+    parser.add_argument("--images", default="./test_images", help="图像目录")
+    parser.add_argument("--out", default="./frame_cache", help="缓存目录")
+    parser.add_argument("--force", action="store_true", help="即使缓存是最新的也重建")
+    args = parser.parse_args()
+    if not build_frame_cache(args.images, args.out, force=args.force):
+        print(f"缓存已是最新: {args.out}")
@@ -0,0 +1,78 @@
+# frame_grabber.py
+# 摄像头采集线程：采集与推理并行，检测循环始终拿到最新一帧
+import threading
+import time
+from collections import deque
+
+import cv2
+
+
+class FrameGrabber:
+    """后台线程持续读取摄像头，只在小环形缓冲中保留最新的几帧
+
+    每帧记录采集时间戳（time.monotonic）；未被检测循环取走就被新帧覆盖的帧计为丢帧。
+    """
+
+    def __init__(self, cap, buffer_size=2):
+        self.cap = cap
+        # 尽量缩小驱动侧队列，避免积压旧帧（部分后端不支持，忽略返回值）
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+        self.buffer = deque(maxlen=buffer_size)  # 元素: (帧序号, 采集时间戳, 帧)
+        self.condition = threading.Condition()
+        self.frame_id = 0          # 已采集的帧序号
+        self.last_read_id = 0      # 检测循环最后取走的帧序号
+        self.captured_frames = 0
+        self.dropped_frames = 0
+        self.stopped = False
+        self.thread = None
+
+    def start(self):
+        """启动采集线程"""
+        self.stopped = False
+        self.thread = threading.Thread(target=self._capture_loop, name="FrameGrabber")
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def _capture_loop(self):
+        while not self.stopped:
+            ret, frame = self.cap.read()
+            capture_time = time.monotonic()
+            if not ret:
+                with self.condition:
+                    self.stopped = True
+                    self.condition.notify_all()
+                break
+
+            with self.condition:
+                self.frame_id += 1
+                self.captured_frames += 1
+                # 上一帧还没被取走就被覆盖，计为丢帧
+                if self.buffer and self.buffer[-1][0] > self.last_read_id:
+                    self.dropped_frames += 1
+                self.buffer.append((self.frame_id, capture_time, frame))
+                self.condition.notify_all()
+
+    def read(self, timeout=1.0):
+        """阻塞等待一帧尚未处理过的最新图像
+
+        返回: (ret, frame, capture_time)，采集结束或超时时ret为False，两者用stopped区分（超时时为False）
+        """
+        with self.condition:
+            has_new = self.condition.wait_for(
+                lambda: self.stopped or (self.buffer and self.buffer[-1][0] > self.last_read_id),
+                timeout)
+            if not has_new or not self.buffer or self.buffer[-1][0] <= self.last_read_id:
+                return False, None, None
+            frame_id, capture_time, frame = self.buffer[-1]
+            self.last_read_id = frame_id
+        return True, frame, capture_time
+
+    def stop(self):
+        """停止采集线程"""
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
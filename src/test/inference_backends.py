@@ -0,0 +1,152 @@
+# inference_backends.py
+# 可插拔推理后端：PyTorch(TorchScript) / ONNX Runtime / OpenCV DNN
+# 各后端输入输出一致，前后处理（letterbox、NMS）由TennisBallDetector统一完成
+import os
+import time
+import logging
+from abc import ABC, abstractmethod
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceBackend(ABC):
+    """推理后端接口
+
+    forward输入: (N, 3, imgsz, imgsz) float32 NumPy数组（RGB，0~1）
+    forward输出: (N, num_boxes, 5 + num_classes) float32 NumPy数组
+    """
+    name = "base"
+
+    def __init__(self, yolo_config):
+        self.yolo_config = yolo_config
+        self.info = {"backend": self.name, "model_variant": yolo_config.get("model_variant", "fp32")}
+
+    @abstractmethod
+    def forward(self, batch):
+        """一次前向推理（子类必须实现，缺少时创建后端即报错）"""
+
+
+class TorchBackend(InferenceBackend):
+    """PyTorch后端：加载按权重哈希缓存的TorchScript引擎"""
+    name = "torch"
+
+    def __init__(self, yolo_config):
+        super().__init__(yolo_config)
+        import torch
+        from model_loader import load_torchscript_engine
+
+        if yolo_config.get("model_variant", "fp32") != "fp32":
+            raise ValueError("torch后端只支持fp32模型，量化模型请使用onnxruntime或opencv后端")
+        self.torch = torch
+        num_threads = yolo_config.get("num_threads", 0)
+        if num_threads > 0:
+            torch.set_num_threads(num_threads)
+        self.model, info = load_torchscript_engine(yolo_config)
+        self.info.update(info)
+
+    def forward(self, batch):
+        with self.torch.no_grad():
+            return self.model(self.torch.from_numpy(batch)).numpy()
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    """ONNX Runtime CPU后端"""
+    name = "onnxruntime"
+
+    def __init__(self, yolo_config):
+        super().__init__(yolo_config)
+        import onnxruntime as ort
+
+        onnx_path = _require_onnx(yolo_config)
+        start_time = time.perf_counter()
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        num_threads = yolo_config.get("num_threads", 0)
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self.info.update({"engine_path": onnx_path, "cold_start": False,
+                          "load_time": time.perf_counter() - start_time})
+
+    def forward(self, batch):
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+class OpenCVDnnBackend(InferenceBackend):
+    """OpenCV DNN CPU后端（不依赖torch和onnxruntime）"""
+    name = "opencv"
+
+    def __init__(self, yolo_config):
+        super().__init__(yolo_config)
+        onnx_path = _require_onnx(yolo_config)
+        start_time = time.perf_counter()
+        num_threads = yolo_config.get("num_threads", 0)
+        if num_threads > 0:
+            cv2.setNumThreads(num_threads)
+        self.net = cv2.dnn.readNetFromONNX(onnx_path)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        self.info.update({"engine_path": onnx_path, "cold_start": False,
+                          "load_time": time.perf_counter() - start_time})
+
+    def forward(self, batch):
+        self.net.setInput(batch)
+        return np.asarray(self.net.forward())
+
+
+BACKENDS = {
+    TorchBackend.name: TorchBackend,
+    OnnxRuntimeBackend.name: OnnxRuntimeBackend,
+    OpenCVDnnBackend.name: OpenCVDnnBackend,
+}
+
+
+MODEL_VARIANTS = ("fp32", "fp16", "int8")
+
+
+def sized_onnx_path(yolo_config, imgsz):
+    """其他输入尺寸的ONNX路径：与yolov5.imgsz相同时为onnx_path本身，否则为 <名称>_<尺寸>.onnx
+
+    再经variant_onnx_path得到该尺寸的量化模型 <名称>_<尺寸>_<精度>.onnx（由quantize_model.py逐尺寸生成）。
+    """
+    onnx_path = yolo_config.get("onnx_path", "./model_cache/best.onnx")
+    if imgsz == yolo_config.get("imgsz", 640):
+        return onnx_path
+    root, ext = os.path.splitext(onnx_path)
+    return f"{root}_{imgsz}{ext}"
+
+
+def variant_onnx_path(yolo_config, variant=None):
+    """按模型精度返回ONNX路径：fp32为onnx_path本身，其余为 <名称>_<精度>.onnx"""
+    onnx_path = yolo_config.get("onnx_path", "./model_cache/best.onnx")
+    variant = variant or yolo_config.get("model_variant", "fp32")
+    if variant not in MODEL_VARIANTS:
+        raise ValueError(f"未知的模型精度: {variant}（可选: {', '.join(MODEL_VARIANTS)}）")
+    if variant == "fp32":
+        return onnx_path
+    root, ext = os.path.splitext(onnx_path)
+    return f"{root}_{variant}{ext}"
+
+
+def _require_onnx(yolo_config):
+    """返回当前精度对应的ONNX模型路径，不存在时提示先导出"""
+    onnx_path = variant_onnx_path(yolo_config)
+    if not os.path.exists(onnx_path):
+        if yolo_config.get("model_variant", "fp32") == "fp32":
+            hint = "python compare_backends.py --export"
+        else:
+            hint = "python quantize_model.py"
+        raise FileNotFoundError(f"ONNX模型不存在: {onnx_path}（请先运行 {hint}）")
+    return onnx_path
+
+
+def create_backend(yolo_config):
+    """根据config.json中yolov5.backend创建推理后端"""
+    name = yolo_config.get("backend", TorchBackend.name)
+    if name not in BACKENDS:
+        raise ValueError(f"未知的推理后端: {name}（可选: {', '.join(BACKENDS)}）")
+    return BACKENDS[name](yolo_config)
@@ -0,0 +1,70 @@
+# inference_scheduler.py
+# 按收集器状态调度检测：每个状态独立配置检测频率、输入尺寸和模型精度，并统计各状态的FPS与CPU占用
+import time
+
+
+class StateAwareScheduler:
+    """根据TennisBallCollector的状态机决定本帧是否检测，以及用什么输入尺寸/模型精度检测
+
+    每个状态的配置项（均可省略）:
+        max_fps:       检测频率上限，0表示每帧都检测
+        imgsz:         整帧检测的模型输入尺寸，省略时使用yolov5.imgsz
+        model_variant: 模型精度 fp32 / fp16 / int8，省略时使用yolov5.model_variant
+    """
+
+    def __init__(self, detector, scheduler_config):
+        self.detector = detector
+        self.profiles = scheduler_config.get("states", {})
+        self.stats = {}
+        self.last_detect_time = {}
+        self.active_profile = None
+        self.last_wall = time.perf_counter()
+        self.last_cpu = time.process_time()
+        # 启动时预热各状态用到的后端，避免状态切换时在控制循环中加载模型
+        detector.preload_profiles((profile.get("imgsz"), profile.get("model_variant")) for profile in self.profiles.values())
+
+    def _state_stats(self, state):
+        if state not in self.stats:
+            self.stats[state] = {"frames": 0, "detections": 0, "wall_time": 0.0, "cpu_time": 0.0}
+        return self.stats[state]
+
+    def should_detect(self, state):
+        """本帧是否需要检测；需要时同时把检测器切换到该状态的输入尺寸/模型精度"""
+        profile = self.profiles.get(state, {})
+        stats = self._state_stats(state)
+        stats["frames"] += 1
+
+        max_fps = profile.get("max_fps", 0)
+        now = time.perf_counter()
+        if max_fps > 0 and now - self.last_detect_time.get(state, float("-inf")) < 1.0 / max_fps:
+            return False
+        self.last_detect_time[state] = now
+
+        key = (profile.get("imgsz"), profile.get("model_variant"))
+        if key != self.active_profile:
+            self.detector.use_profile(*key)
+            self.active_profile = key
+        stats["detections"] += 1
+        return True
+
+    def account(self, state):
+        """把上次调用以来的墙钟时间和进程CPU时间记到state名下（每次主循环结束时调用）"""
+        now_wall, now_cpu = time.perf_counter(), time.process_time()
+        stats = self._state_stats(state)
+        stats["wall_time"] += now_wall - self.last_wall
+        stats["cpu_time"] += now_cpu - self.last_cpu
+        self.last_wall, self.last_cpu = now_wall, now_cpu
+
+    def report(self):
+        """各状态的检测FPS与CPU占用（CPU占用按单核100%计，多线程时可能超过100%）"""
+        summary = {}
+        for state, stats in self.stats.items():
+            wall_time = max(stats["wall_time"], 1e-9)
+            summary[state] = {
+                "frames": stats["frames"],
+                "detections": stats["detections"],
+                "detect_fps": stats["detections"] / wall_time,
+                "cpu_percent": stats["cpu_time"] / wall_time * 100,
+                "wall_time": stats["wall_time"],
+            }
+        return summary
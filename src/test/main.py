@@ -1,8 +1,15 @@
 import json
+import threading
 import cv2
 import time
 from tennis_ball_detector import TennisBallDetector
 from robot_controller import RobotController
+from frame_grabber import FrameGrabber
+from ball_tracker import BallTracker
+from inference_scheduler import StateAwareScheduler
+from overlay_renderer import OverlayRenderer
+from route_planner import RoutePlanner
+from telemetry import Telemetry
 
 class TennisBallCollector:
     def __init__(self, config_path="config.json"):
@@ -13,10 +20,31 @@ class TennisBallCollector:
         # 初始化检测器
         self.detector = TennisBallDetector(self.config)
 
+        # 分阶段延迟统计（检测器的前处理/推理/后处理、决策、执行、显示）
+        telemetry_config = self.config.get("telemetry", {})
+        self.telemetry = Telemetry(telemetry_config) if telemetry_config.get("enabled", False) else None
+        self.detector.telemetry = self.telemetry
+
+        # 接近阶段（MOVING）的跟踪器：只在预测位置附近做ROI检测
+        tracking_config = self.config["image_processing"].get("tracking", {})
+        self.tracker = BallTracker(self.detector, tracking_config) if tracking_config.get("enabled", False) else None
+
+        # 按状态调度检测频率/输入尺寸/模型精度
+        scheduler_config = self.config.get("scheduler", {})
+        self.scheduler = StateAwareScheduler(self.detector, scheduler_config) if scheduler_config.get("enabled", False) else None
+
+        # 状态机和多球捡球路线规划
+        self._init_state_machine()
+
         # 初始化控制器（在测试模式下不使用）
         if not self.config["test"]["test_mode"]:
             self.controller = RobotController(self.config)
 
+        # 叠加显示（debug.show_video为false时不绘制、不显示）
+        self.renderer = None
+        if self.config["debug"].get("show_video", True):
+            self.renderer = OverlayRenderer(max_fps=self.config["debug"].get("display_fps", 15), telemetry=self.telemetry)
+
         # 初始化摄像头
         if not self.config["test"]["test_mode"]:
             camera_type = self.config["hardware"]["camera_type"]
@@ -33,64 +61,151 @@ class TennisBallCollector:
             if not self.cap.isOpened():
                 raise Exception("无法打开摄像头")
 
+            # 采集线程（与推理并行，只保留最新帧）
+            self.grabber = FrameGrabber(self.cap, self.config["hardware"].get("capture_buffer_size", 2))
+
+        # 性能统计
+        self.frame_count = 0
+        self.start_time = time.time()
+        self.frame_age_sum = 0.0  # 帧龄（采集到开始检测的时间）统计
+        self.frame_age_max = 0.0
+
+    @classmethod
+    def for_simulation(cls, config, controller):
+        """仿真用实例：只有状态机、路线规划和传入的控制器（不加载模型、不打开摄像头），见episode_simulator.py"""
+        collector = cls.__new__(cls)
+        collector.config = config
+        collector.controller = controller
+        collector.telemetry = None
+        collector._init_state_machine()
+        return collector
+
+    def _init_state_machine(self):
+        # 多球捡球路线规划（未启用时总是去最近的球）
+        planner_config = self.config.get("route_planner", {})
+        self.route_planner = RoutePlanner(planner_config) if planner_config.get("enabled", False) else None
+
         # 状态机
         self.STATE_SEARCHING = "SEARCHING"
         self.STATE_MOVING = "MOVING"
         self.STATE_COLLECTING = "COLLECTING"
         self.current_state = self.STATE_SEARCHING
+        self.actuation_ns = 0  # 本帧控制器动作的耗时（计入actuation阶段，不计入decision）
 
-        # 性能统计
-        self.frame_count = 0
-        self.start_time = time.time()
+    def _actuate(self, action, *args):
+        """执行控制器动作并记录耗时"""
+        t0 = time.perf_counter_ns()
+        result = action(*args)
+        elapsed = time.perf_counter_ns() - t0
+        self.actuation_ns += elapsed
+        if self.telemetry is not None:
+            self.telemetry.record("actuation", elapsed)
+        return result
 
     def run(self):
         if self.config["test"]["test_mode"]:
             print("运行测试模式...")
+            if self.config["test"].get("benchmark", {}).get("enabled", False):
+                # 无界面基准测试，不模拟机器人动作
+                self.detector.run_benchmark()
+                return
             self.detector.run_image_tests()
 
             # 模拟机器人动作
             self._simulate_robot_actions()
 
             # 等待用户关闭窗口
-            input("按Enter键退出...")
+            if not self.config["test"].get("headless", False):
+                input("按Enter键退出...")
             return
 
         print("启动自动捡网球机器人...")
+        self.grabber.start()
+        if self.renderer is not None:
+            self.renderer.start()
+        if self.telemetry is not None:
+            self.telemetry.start()
+        balls = []
 
         try:
             while True:
-                # 读取一帧图像
-                ret, frame = self.cap.read()
+                # 从采集线程取最新一帧图像
+                ret, frame, capture_time = self.grabber.read()
                 if not ret:
-                    print("无法获取图像，退出...")
-                    break
+                    if self.grabber.stopped:
+                        print("无法获取图像，退出...")
+                        break
+                    # 只是超时（摄像头短暂卡顿），继续等待
+                    print("等待图像超时，继续等待...")
+                    continue
+                frame_start = time.perf_counter_ns()
+                frame_age = time.monotonic() - capture_time
+                self.frame_age_sum += frame_age
+                self.frame_age_max = max(self.frame_age_max, frame_age)
+                if self.telemetry is not None:
+                    self.telemetry.record("capture", int(frame_age * 1e9))
 
-                # 检测网球
-                balls, processed_frame = self.detector.detect_tennis_balls(frame)
+                state = self.current_state
+                # 未到该状态的检测周期时本帧只显示不检测
+                if self.scheduler is None or self.scheduler.should_detect(state):
+                    # 检测网球（接近阶段使用跟踪 + ROI重检测）
+                    if self.tracker is not None and state == self.STATE_MOVING:
+                        balls = self.tracker.update(frame)
+                    else:
+                        if self.tracker is not None and self.tracker.tracks:
+                            self.tracker.reset()
+                        balls = self.detector.detect_tennis_balls(frame)
 
-                # 根据检测结果执行相应动作
-                self._process_detection_results(balls)
+                    # 根据检测结果执行相应动作（控制器调用的耗时计入actuation，其余计入decision）
+                    decision_start = time.perf_counter_ns()
+                    self.actuation_ns = 0
+                    self._process_detection_results(balls)
+                    if self.telemetry is not None:
+                        self.telemetry.record("decision", time.perf_counter_ns() - decision_start - self.actuation_ns)
 
-                # 显示处理后的图像
-                cv2.imshow("Tennis Ball Collector", processed_frame)
+                # 提交给绘制线程（按上限帧率绘制，无界面部署时不创建），并在主线程显示已绘制好的画面
+                if self.renderer is not None:
+                    self.renderer.submit(frame, balls, (f"State: {state}",))
+                    self.renderer.present()
+                    # 在窗口中按ESC键退出
+                    if self.renderer.quit_requested:
+                        break
 
-                # 按ESC键退出
-                key = cv2.waitKey(1)
-                if key == 27:
-                    break
+                if self.scheduler is not None:
+                    self.scheduler.account(state)
+                if self.telemetry is not None:
+                    self.telemetry.record("frame", time.perf_counter_ns() - frame_start)
 
                 # 更新性能统计
                 self.frame_count += 1
                 if self.frame_count % 100 == 0:
                     fps = self.frame_count / (time.time() - self.start_time)
-                    print(f"处理速度: {fps:.1f} FPS")
+                    print(f"处理速度: {fps:.1f} FPS, "
+                          f"帧龄: 平均 {self.frame_age_sum / 100 * 1000:.1f}ms / 最大 {self.frame_age_max * 1000:.1f}ms, "
+                          f"丢帧: {self.grabber.dropped_frames}/{self.grabber.captured_frames}")
+                    self.frame_age_sum = 0.0
+                    self.frame_age_max = 0.0
+                    if self.telemetry is not None:
+                        self.telemetry.set_gauge("fps", round(fps, 2))
+                        print(self.telemetry.format_summary())
+                    if self.tracker is not None and self.tracker.stats["frames"]:
+                        stats = self.tracker.stats
+                        print(f"跟踪: ROI检测 {stats['roi_frames']}/{stats['frames']} 帧")
+                    if self.scheduler is not None:
+                        for state_name, stats in self.scheduler.report().items():
+                            print(f"  [{state_name}] 检测 {stats['detect_fps']:.1f} FPS, CPU {stats['cpu_percent']:.0f}%")
 
         except KeyboardInterrupt:
             print("用户中断，退出...")
         finally:
             # 释放资源
             if not self.config["test"]["test_mode"]:
+                self.grabber.stop()
                 self.cap.release()
+            if self.renderer is not None:
+                self.renderer.stop()
+            if self.telemetry is not None:
+                self.telemetry.stop()
             cv2.destroyAllWindows()
             if not self.config["test"]["test_mode"]:
                 self.controller.cleanup()
@@ -101,31 +216,49 @@ class TennisBallCollector:
             # 无球，进入搜索状态（保留原逻辑）
             self.current_state = self.STATE_SEARCHING
             if not self.config["test"]["test_mode"]:
-                self.controller.search_for_balls()
+                self._actuate(self.controller.search_for_balls)
             return
         
-        # 按半径从大到小排序（半径越大，距离越近）
-        sorted_balls = sorted(balls, key=lambda b: b[1], reverse=True)
-        largest_ball = sorted_balls[0]  # 选择最近的球
-        (x, y), radius, distance, horizontal_offset = largest_ball
+        if self.route_planner is not None:
+            # 按规划的捡球顺序选择目标（场景变化较大时才重新规划）
+            target_ball = balls[self.route_planner.update(balls)]
+        else:
+            # 按半径从大到小排序（半径越大，距离越近）
+            sorted_balls = sorted(balls, key=lambda b: b[1], reverse=True)
+            target_ball = sorted_balls[0]  # 选择最近的球
+        (x, y), radius, distance, horizontal_offset = target_ball
         
-        # 保留原动作逻辑（向最近的球移动/收集）
+        # 保留原动作逻辑（向目标球移动/收集）
         if distance > self.config["robot_control"]["collect_distance"]:
             self.current_state = self.STATE_MOVING
             if not self.config["test"]["test_mode"]:
-                self.controller.move_towards_ball(horizontal_offset, distance)
+                self._actuate(self.controller.move_towards_ball, horizontal_offset, distance)
         else:
             self.current_state = self.STATE_COLLECTING
             if not self.config["test"]["test_mode"]:
-                self.controller.collect_ball()
+                self._actuate(self.controller.collect_ball, horizontal_offset, distance)
         
-        print(f"状态: {self.current_state}, 检测到{len(balls)}个球, 最近距离: {distance:.1f}cm")
+        print(f"状态: {self.current_state}, 检测到{len(balls)}个球, 目标距离: {distance:.1f}cm")
 
     def _simulate_robot_actions(self):
         # 模拟机器人动作，这里可以根据需要添加具体的模拟逻辑
         controller = RobotController(self.config)
-        controller.move_towards_ball(10, 50)
-        controller.collect_ball()
+
+        def actions():
+            try:
+                controller.move_towards_ball(10, 50)
+                controller.collect_ball(10, self.config["robot_control"]["collect_distance"])
+            finally:
+                controller.cleanup()
+
+        if controller.visualizer.offscreen:
+            actions()
+            return
+        # matplotlib窗口只能在主线程中绘制：动作放到工作线程，主线程运行绘制循环直到cleanup()
+        worker = threading.Thread(target=actions, name="SimulatedActions")
+        worker.start()
+        controller.visualizer.show()
+        worker.join()
 
 if __name__ == "__main__":
     collector = TennisBallCollector()
@@ -0,0 +1,169 @@
+# mock_hardware.py
+# 无硬件时的GPIO/PWM替身和可替换的时间源：
+#   RecordingGPIO 只在内存中记录引脚电平/占空比的变化时间线（不打印），可对动作时序做精确断言
+#   VirtualClock  离散事件时钟，sleep()直接推进虚拟时间并按顺序触发到期的定时回调，仿真不必真实等待
+import heapq
+import itertools
+import math
+import time
+from collections import deque
+
+
+class RealClock:
+    """真实时间源（默认）"""
+    virtual = False
+
+    @staticmethod
+    def now():
+        return time.monotonic()
+
+    @staticmethod
+    def sleep(seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class TimerHandle:
+    __slots__ = ("when", "callback", "cancelled")
+
+    def __init__(self, when, callback):
+        self.when = when
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class VirtualClock:
+    """虚拟时间源（单线程使用）
+
+    now()返回虚拟时间；sleep()/advance_to()推进时间，途中按时间顺序执行call_at()登记的回调，
+    执行回调时now()恰好等于其登记的时刻，回调中可以再登记新的回调。
+    """
+    virtual = True
+
+    def __init__(self, start=0.0):
+        self.time = float(start)
+        self.timers = []
+        self.sequence = itertools.count()  # 同一时刻的回调按登记顺序执行
+
+    def now(self):
+        return self.time
+
+    def call_at(self, when, callback):
+        handle = TimerHandle(max(float(when), self.time), callback)
+        heapq.heappush(self.timers, (handle.when, next(self.sequence), handle))
+        return handle
+
+    def call_later(self, delay, callback):
+        return self.call_at(self.time + delay, callback)
+
+    def advance_to(self, target):
+        while self.timers and self.timers[0][0] <= target:
+            when, _, handle = heapq.heappop(self.timers)
+            if handle.cancelled:
+                continue
+            self.time = when
+            handle.callback()
+        self.time = max(self.time, float(target))
+
+    def sleep(self, seconds):
+        target = self.time + max(0.0, seconds)
+        if seconds > 0 and target == self.time:
+            # 极小的等待在浮点上加不动：至少前进一个ULP，保证“等到剩余时间<=0”的循环能结束
+            target = math.nextafter(self.time, math.inf)
+        self.advance_to(target)
+
+    def pending(self):
+        """尚未执行的回调数量"""
+        return sum(1 for _, _, handle in self.timers if not handle.cancelled)
+
+
+class RecordingPWM:
+    def __init__(self, gpio, pin, frequency):
+        self.gpio = gpio
+        self.pin = pin
+        self.frequency = frequency
+        self.duty_cycle = 0
+        self.running = False
+
+    def start(self, duty_cycle):
+        self.running = True
+        self.duty_cycle = duty_cycle
+        self.gpio._record("pwm", self.pin, duty_cycle)
+
+    def ChangeDutyCycle(self, duty_cycle):
+        if duty_cycle != self.duty_cycle:
+            self.duty_cycle = duty_cycle
+            self.gpio._record("pwm", self.pin, duty_cycle)
+
+    def stop(self):
+        self.running = False
+        if self.duty_cycle != 0:
+            self.duty_cycle = 0
+            self.gpio._record("pwm", self.pin, 0)
+
+
+class RecordingGPIO:
+    """与orangepi.gpio接口一致的模拟GPIO
+
+    events为按时间排序的 (时间, 类型, 引脚, 值) 列表，类型为"gpio"（电平）或"pwm"（占空比%）；
+    只记录值发生变化的写入（看门狗重复停车等不产生事件）。max_events限制保留的事件数（长时间运行时只留最近的），
+    verbose为True时同时打印，便于人工调试。
+    """
+    BOARD = 1
+    OUT = 2
+    HIGH = 1
+    LOW = 0
+
+    def __init__(self, clock=RealClock, verbose=False, max_events=None):
+        self.clock = clock
+        self.verbose = verbose
+        self.mode = None
+        self.levels = {}  # 引脚 -> 当前电平
+        self.pwms = {}    # 引脚 -> RecordingPWM
+        self.events = deque(maxlen=max_events)
+
+    def _record(self, kind, pin, value):
+        self.events.append((self.clock.now(), kind, pin, value))
+        if self.verbose:
+            print(f"[模拟GPIO] {self.clock.now():.3f}s 引脚 {pin} {'占空比' if kind == 'pwm' else '输出'}: {value}")
+
+    def setmode(self, mode):
+        self.mode = mode
+
+    def setup(self, pin, direction, initial=None):
+        if initial is not None:
+            self.output(pin, initial)
+
+    def output(self, pin, value):
+        if self.levels.get(pin) != value:
+            self.levels[pin] = value
+            self._record("gpio", pin, value)
+
+    def PWM(self, pin, frequency):
+        pwm = RecordingPWM(self, pin, frequency)
+        self.pwms[pin] = pwm
+        return pwm
+
+    def cleanup(self):
+        for pin in [pin for pin, level in self.levels.items() if level != self.LOW]:
+            self.output(pin, self.LOW)
+
+    def changes(self, pin, kind=None):
+        """某个引脚的 (时间, 值) 变化序列"""
+        return [(t, value) for t, k, p, value in self.events if p == pin and (kind is None or k == kind)]
+
+    def value_at(self, pin, when, kind="gpio"):
+        """when时刻引脚的电平/占空比（之前从未写入时返回None）"""
+        value = None
+        for t, k, p, v in self.events:
+            if t > when:
+                break
+            if p == pin and k == kind:
+                value = v
+        return value
+
+    def clear(self):
+        self.events.clear()
@@ -0,0 +1,135 @@
+# model_loader.py
+# YOLOv5模型的本地加载与TorchScript引擎缓存（无需联网）
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+import logging
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """计算权重文件的SHA256，用作引擎缓存的键"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class _RawOutput(torch.nn.Module):
+    """只保留检测头拼接后的输出 (N, num_boxes, 5 + num_classes)，去掉训练用的特征图"""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, x):
+        y = self.model(x)
+        return y[0] if isinstance(y, (list, tuple)) else y
+
+
+def load_from_weights(model_path, repo_dir):
+    """从本地yolov5仓库和.pt权重构建模型（冷启动路径）"""
+    if not os.path.isdir(repo_dir):
+        raise FileNotFoundError(f"本地yolov5仓库不存在: {repo_dir}（请先 git clone https://github.com/ultralytics/yolov5）")
+
+    # .pt权重中序列化了yolov5的models模块，需要本地仓库在搜索路径中
+    repo_dir = os.path.abspath(repo_dir)
+    if repo_dir not in sys.path:
+        sys.path.insert(0, repo_dir)
+    from models.experimental import attempt_load
+
+    model = attempt_load(model_path, device=torch.device('cpu'), fuse=True)
+    model.eval()
+    meta = {
+        "stride": int(model.stride.max()),
+        "names": model.names if isinstance(model.names, list) else list(model.names.values()),
+    }
+    return model, meta
+
+
+def load_torchscript_engine(yolo_config):
+    """加载检测引擎：优先使用按权重哈希命名的TorchScript缓存，否则从权重构建并写入缓存
+
+    返回: (engine, info)，info中记录了冷/热启动及各阶段耗时
+    """
+    model_path = yolo_config["model_path"]
+    repo_dir = yolo_config.get("repo_dir", "./yolov5")
+    cache_dir = yolo_config.get("engine_cache_dir", "./model_cache")
+    imgsz = yolo_config.get("imgsz", 640)
+
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"模型权重不存在: {model_path}")
+
+    start_time = time.perf_counter()
+    weights_hash = file_sha256(model_path)
+    hash_time = time.perf_counter() - start_time
+
+    cache_path = os.path.join(cache_dir, f"{weights_hash[:16]}_{imgsz}.torchscript")
+    info = {
+        "weights_sha256": weights_hash,
+        "engine_path": cache_path,
+        "hash_time": hash_time,
+    }
+
+    if os.path.exists(cache_path):
+        # 热启动：直接反序列化已追踪好的计算图
+        extra_files = {"meta.json": ""}
+        engine = torch.jit.load(cache_path, map_location='cpu', _extra_files=extra_files)
+        engine.eval()
+        info.update(json.loads(extra_files["meta.json"]))
+        info["cold_start"] = False
+    else:
+        # 冷启动：构建模型并追踪为TorchScript
+        model, meta = load_from_weights(model_path, repo_dir)
+        example = torch.zeros(1, 3, imgsz, imgsz)
+        with torch.no_grad():
+            engine = torch.jit.trace(_RawOutput(model), example, strict=False)
+        engine.eval()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        # 多个进程可能同时冷启动：各自写入同目录下唯一的临时文件，再原子替换，
+        # 不会互相覆盖或把写了一半的文件换进缓存（最后替换的一份生效，内容相同）
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                torch.jit.save(engine, f, _extra_files={"meta.json": json.dumps(meta)})
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        info.update(meta)
+        info["cold_start"] = True
+
+    info["load_time"] = time.perf_counter() - start_time
+    logger.info(f"模型加载完成（{'冷启动' if info['cold_start'] else '热启动'}），"
+                f"耗时 {info['load_time']:.2f}s，引擎: {cache_path}")
+    return engine, info
+
+
+def export_onnx(yolo_config, onnx_path=None, opset=12):
+    """把.pt权重导出为ONNX（batch维度可变），供onnxruntime / cv2.dnn后端使用"""
+    model_path = yolo_config["model_path"]
+    onnx_path = onnx_path or yolo_config.get("onnx_path", "./model_cache/best.onnx")
+    imgsz = yolo_config.get("imgsz", 640)
+
+    model, meta = load_from_weights(model_path, yolo_config.get("repo_dir", "./yolov5"))
+    os.makedirs(os.path.dirname(os.path.abspath(onnx_path)), exist_ok=True)
+    example = torch.zeros(1, 3, imgsz, imgsz)
+    with torch.no_grad():
+        torch.onnx.export(
+            _RawOutput(model), example, onnx_path,
+            opset_version=opset,
+            input_names=["images"],
+            output_names=["output"],
+            dynamic_axes={"images": {0: "batch"}, "output": {0: "batch"}},
+        )
+    logger.info(f"ONNX模型已导出: {onnx_path}")
+    return onnx_path
@@ -0,0 +1,241 @@
+# motion_executor.py
+# 底盘运动执行线程：运动指令排队由独立线程执行，调用方立即拿到Future，新目标可抢占正在执行的运动
+# ScheduledMotionExecutor为虚拟时钟下的等价实现（仿真用）
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MotionCommand:
+    """一条运动指令
+
+    apply:    开始执行时调用一次（设置电机引脚/占空比），可为None
+    duration: 持续时间（秒）；None表示一直保持，直到被抢占或超过看门狗超时没有刷新
+    """
+    __slots__ = ("name", "apply", "duration", "future")
+
+    def __init__(self, name, apply, duration):
+        self.name = name
+        self.apply = apply
+        self.duration = duration
+        self.future = Future()
+
+
+class MotionExecutor:
+    """运动执行线程：指令队列 + 抢占 + 看门狗
+
+    - submit()立即返回Future：运动正常结束时结果为True，被抢占时为False；尚未开始就被丢弃的指令Future被取消
+    - preempt=True时丢弃排队中的指令，并打断正在执行的运动（不先停车，直接切换到新指令）
+    - 每条指令结束后调用stop_fn停车；空闲时每隔watchdog_interval再发一次停车，防止电机失控
+    - 持续型指令（duration=None）超过watchdog_timeout没有新指令刷新时自动停车
+    """
+
+    def __init__(self, stop_fn, watchdog_interval=0.2, watchdog_timeout=0.5):
+        self.stop_fn = stop_fn
+        self.watchdog_interval = watchdog_interval
+        self.watchdog_timeout = watchdog_timeout
+        self.condition = threading.Condition()
+        self.queue = []
+        self.current = None
+        self.preempted = False
+        self.stopped = False
+        self.stats = {"completed": 0, "preempted": 0, "cancelled": 0, "watchdog_stops": 0}
+        self.thread = threading.Thread(target=self._run, name="MotionExecutor")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def submit(self, name, apply, duration=None, preempt=True):
+        command = MotionCommand(name, apply, duration)
+        with self.condition:
+            if self.stopped:
+                command.future.cancel()
+                return command.future
+            if preempt:
+                self._drop_queued()
+                if self.current is not None:
+                    self.preempted = True
+            self.queue.append(command)
+            self.condition.notify()
+        return command.future
+
+    def cancel(self):
+        """取消全部排队指令并停下正在执行的运动"""
+        with self.condition:
+            self._drop_queued()
+            if self.current is not None:
+                self.preempted = True
+            self.condition.notify()
+
+    def busy(self):
+        with self.condition:
+            return self.current is not None or bool(self.queue)
+
+    def active(self):
+        """正在执行的指令名（空闲时为None）"""
+        with self.condition:
+            return self.current.name if self.current is not None else None
+
+    def _drop_queued(self):
+        for command in self.queue:
+            if command.future.cancel():
+                self.stats["cancelled"] += 1
+        self.queue.clear()
+
+    def _next_command(self):
+        """等待下一条指令；空闲期间按watchdog_interval发送停车"""
+        with self.condition:
+            while True:
+                while self.queue:
+                    command = self.queue.pop(0)
+                    if command.future.set_running_or_notify_cancel():
+                        self.current = command
+                        self.preempted = False
+                        return command
+                if self.stopped:
+                    return None
+                if not self.condition.wait(self.watchdog_interval):
+                    self.stats["watchdog_stops"] += 1
+                    self.stop_fn()
+
+    def _run(self):
+        while True:
+            command = self._next_command()
+            if command is None:
+                break
+            try:
+                if command.apply is not None:
+                    command.apply()
+            except Exception as e:
+                self.stop_fn()
+                with self.condition:
+                    self.current = None
+                command.future.set_exception(e)
+                continue
+
+            duration = command.duration if command.duration is not None else self.watchdog_timeout
+            deadline = time.monotonic() + duration
+            with self.condition:
+                while not (self.preempted or self.stopped):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                preempted = self.preempted
+                self.current = None
+                # 被新指令抢占时直接切换，不在两条指令之间停车
+                if not (preempted and self.queue):
+                    self.stop_fn()
+                self.stats["preempted" if preempted else "completed"] += 1
+            command.future.set_result(not preempted)
+
+    def shutdown(self, timeout=1.0):
+        """停止执行线程（取消排队指令、打断当前运动并停车）"""
+        with self.condition:
+            self.stopped = True
+            self._drop_queued()
+            self.condition.notify()
+        self.thread.join(timeout=timeout)
+        self.stop_fn()
+
+
+class ScheduledMotionExecutor:
+    """与MotionExecutor语义相同的事件驱动版本：不开线程，指令的结束和看门狗都登记为clock的定时回调
+
+    配合mock_hardware.VirtualClock使用：仿真推进虚拟时间时，停车等动作恰好发生在预定时刻。
+    """
+
+    def __init__(self, stop_fn, clock, watchdog_interval=0.2, watchdog_timeout=0.5):
+        self.stop_fn = stop_fn
+        self.clock = clock
+        self.watchdog_interval = watchdog_interval
+        self.watchdog_timeout = watchdog_timeout
+        self.queue = []
+        self.current = None
+        self.current_timer = None
+        self.watchdog_timer = None
+        self.stopped = False
+        self.stats = {"completed": 0, "preempted": 0, "cancelled": 0, "watchdog_stops": 0}
+        self._arm_watchdog()
+
+    def submit(self, name, apply, duration=None, preempt=True):
+        command = MotionCommand(name, apply, duration)
+        if self.stopped:
+            command.future.cancel()
+            return command.future
+        if preempt:
+            self._drop_queued()
+        self.queue.append(command)
+        if preempt and self.current is not None:
+            self._finish(preempted=True)
+        elif self.current is None:
+            self._start_next()
+        return command.future
+
+    def cancel(self):
+        """取消全部排队指令并停下正在执行的运动"""
+        self._drop_queued()
+        if self.current is not None:
+            self._finish(preempted=True)
+
+    def busy(self):
+        return self.current is not None or bool(self.queue)
+
+    def active(self):
+        """正在执行的指令名（空闲时为None）"""
+        return self.current.name if self.current is not None else None
+
+    def _drop_queued(self):
+        for command in self.queue:
+            if command.future.cancel():
+                self.stats["cancelled"] += 1
+        self.queue.clear()
+
+    def _arm_watchdog(self):
+        """空闲期间每隔watchdog_interval发送一次停车"""
+        def fire():
+            self.stats["watchdog_stops"] += 1
+            self.stop_fn()
+            self._arm_watchdog()
+        self.watchdog_timer = self.clock.call_later(self.watchdog_interval, fire)
+
+    def _start_next(self):
+        self.watchdog_timer.cancel()
+        while self.queue:
+            command = self.queue.pop(0)
+            if not command.future.set_running_or_notify_cancel():
+                continue
+            try:
+                if command.apply is not None:
+                    command.apply()
+            except Exception as e:
+                self.stop_fn()
+                command.future.set_exception(e)
+                continue
+            self.current = command
+            duration = command.duration if command.duration is not None else self.watchdog_timeout
+            self.current_timer = self.clock.call_later(duration, lambda: self._finish(preempted=False))
+            if duration <= 0:
+                # 零时长指令（如停车）立即结束，调用方拿到的Future已完成，不必等虚拟时间推进
+                self._finish(preempted=False)
+            return
+        if not self.stopped:
+            self._arm_watchdog()
+
+    def _finish(self, preempted):
+        command, self.current = self.current, None
+        self.current_timer.cancel()
+        # 被新指令抢占时直接切换，不在两条指令之间停车
+        if not (preempted and self.queue):
+            self.stop_fn()
+        self.stats["preempted" if preempted else "completed"] += 1
+        command.future.set_result(not preempted)
+        self._start_next()
+
+    def shutdown(self, timeout=None):
+        """取消排队指令、打断当前运动并停车"""
+        self.stopped = True
+        self._drop_queued()
+        if self.current is not None:
+            self._finish(preempted=True)
+        self.watchdog_timer.cancel()
+        self.stop_fn()
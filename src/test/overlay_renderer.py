@@ -0,0 +1,109 @@
+# overlay_renderer.py
+# 检测结果叠加显示：与检测解耦，在独立线程中按上限帧率绘制，主线程显示（debug.show_video为false时不创建）
+import threading
+import time
+
+import cv2
+
+from detections import Detections
+
+
+def draw_detections(frame, balls, lines=()):
+    """在图像副本上绘制检测框和距离；balls为Detections时按检测框宽高绘制并显示置信度
+
+    lines: 额外显示在左上角的文字行
+    """
+    canvas = frame.copy()
+    if isinstance(balls, Detections):
+        for x, y, width, height, distance, conf in zip(balls.x.tolist(), balls.y.tolist(), balls.width.tolist(),
+                                                       balls.height.tolist(), balls.distance.tolist(), balls.conf.tolist()):
+            x1, y1 = int(x - width / 2), int(y - height / 2)
+            cv2.rectangle(canvas, (x1, y1), (int(x + width / 2), int(y + height / 2)), (0, 255, 0), 2)
+            cv2.putText(canvas, f"Ball: {distance:.1f}cm (conf:{conf:.2f})", (x1, y1 - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+    else:
+        for (x, y), radius, distance, _ in balls:
+            x1, y1, x2, y2 = int(x - radius), int(y - radius), int(x + radius), int(y + radius)
+            cv2.rectangle(canvas, (x1, y1), (x2, y2), (0, 255, 0), 2)
+            cv2.putText(canvas, f"Ball: {distance:.1f}cm", (x1, y1 - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+    for i, line in enumerate(lines):
+        cv2.putText(canvas, line, (10, 30 + 30 * i), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+    return canvas
+
+
+class OverlayRenderer:
+    """绘制线程：主循环只提交最新的 (帧, 检测结果)，叠加绘制在本线程中以不超过max_fps的频率进行
+
+    HighGUI（imshow/waitKey/destroyWindow）只能在主线程中调用：主循环每帧调用present()，
+    有新绘制好的画面时显示并处理按键。未来得及绘制的帧直接被新帧覆盖，不会拖慢检测循环。
+    在窗口中按ESC后quit_requested置为True。
+    """
+
+    def __init__(self, window_name="Tennis Ball Collector", max_fps=15, telemetry=None):
+        self.window_name = window_name
+        self.telemetry = telemetry  # 不为None时记录display阶段（绘制 + imshow）的耗时，只在主线程中写入
+        self.min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.condition = threading.Condition()
+        self.pending = None  # 待绘制的 (帧, balls, 文字行)
+        self.composed = None  # 已绘制、待显示的 (画面, 绘制耗时ns)
+        self.stopped = False
+        self.quit_requested = False
+        self.rendered_frames = 0
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._render_loop, name="OverlayRenderer")
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def submit(self, frame, balls, lines=()):
+        """提交一帧待显示（不复制、不绘制，立即返回）"""
+        with self.condition:
+            self.pending = (frame, balls, lines)
+            self.condition.notify()
+
+    def _render_loop(self):
+        last_render = 0.0
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.stopped or self.pending is not None)
+                if self.stopped:
+                    break
+                frame, balls, lines = self.pending
+                self.pending = None
+
+            t0 = time.perf_counter_ns()
+            canvas = draw_detections(frame, balls, lines)
+            with self.condition:
+                self.composed = (canvas, time.perf_counter_ns() - t0)
+
+            # 限制绘制帧率
+            elapsed = time.monotonic() - last_render
+            if elapsed < self.min_interval:
+                time.sleep(self.min_interval - elapsed)
+            last_render = time.monotonic()
+
+    def present(self):
+        """在主线程中显示最新绘制好的画面并处理按键（没有新画面时立即返回）"""
+        with self.condition:
+            composed, self.composed = self.composed, None
+        if composed is None:
+            return
+        canvas, compose_ns = composed
+        t0 = time.perf_counter_ns()
+        cv2.imshow(self.window_name, canvas)
+        self.rendered_frames += 1
+        if cv2.waitKey(1) == 27:  # ESC键退出
+            self.quit_requested = True
+        if self.telemetry is not None:
+            self.telemetry.record("display", compose_ns + time.perf_counter_ns() - t0)
+
+    def stop(self):
+        """停止绘制线程（窗口由主线程的cv2.destroyAllWindows关闭）"""
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
@@ -0,0 +1,59 @@
+# parallel_evaluation.py
+# 多进程并行跑图像测试集：每个工作进程只加载一次模型并限制算子内线程数，结果按原顺序返回给主进程汇总
+import copy
+import multiprocessing
+import os
+
+import cv2
+
+_worker_detector = None  # 工作进程内的检测器（进程初始化时创建一次）
+
+
+def default_threads_per_worker(workers):
+    """未配置时按核数平分，避免各进程的算子内线程互相抢占"""
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+def _init_worker(config, threads):
+    global _worker_detector
+    from frame_cache import FrameCache
+    from tennis_ball_detector import TennisBallDetector
+
+    config = copy.deepcopy(config)
+    config["yolov5"]["num_threads"] = threads
+    config["test"]["headless"] = True
+    cv2.setNumThreads(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _worker_detector = TennisBallDetector(config)
+    frame_cache_config = config["test"].get("frame_cache", {})
+    if frame_cache_config.get("enabled", False):
+        # 帧缓存已由主进程构建，工作进程只读打开，不再各自检查/重建
+        _worker_detector.frame_cache = FrameCache(frame_cache_config.get("cache_dir", "./frame_cache"))
+
+
+def _detect_chunk(image_names):
+    """工作进程：检测一批图像，只返回检测结果（不回传图像本身）"""
+    return [(names, None, balls, processing_time, decode_time)
+            for names, _, balls, processing_time, decode_time in _worker_detector.detect_image_batches(image_names)]
+
+
+def detect_images_parallel(config, test_images, batch_size, workers, threads_per_worker=0):
+    """把测试图像按batch_size分块分发到进程池，按原顺序逐块产出 (图像名列表, None, 检测结果列表, 单张耗时, 单张解码耗时)
+
+    使用spawn方式创建进程，避免fork已加载模型/已启动线程的父进程。
+    启用帧缓存时由主进程在创建进程池前构建一次，各工作进程只读打开。
+    """
+    frame_cache_config = config["test"].get("frame_cache", {})
+    if frame_cache_config.get("enabled", False):
+        from frame_cache import build_frame_cache
+        build_frame_cache(config["test"]["test_images_dir"], frame_cache_config.get("cache_dir", "./frame_cache"))
+    threads = threads_per_worker or default_threads_per_worker(workers)
+    chunks = [test_images[i:i + batch_size] for i in range(0, len(test_images), batch_size)]
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers, initializer=_init_worker, initargs=(config, threads)) as pool:
+        for chunk_results in pool.imap(_detect_chunk, chunks):
+            yield from chunk_results
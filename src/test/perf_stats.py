@@ -0,0 +1,27 @@
+# perf_stats.py
+# 延迟统计工具（基准测试报告使用）
+import numpy as np
+
+
+def summarize_latency(samples_ns):
+    """把纳秒级耗时样本汇总为毫秒统计: mean/p50/p95/p99/max"""
+    if not samples_ns:
+        return {"count": 0}
+    samples_ms = np.asarray(samples_ns, dtype=np.float64) / 1e6
+    p50, p95, p99 = np.percentile(samples_ms, [50, 95, 99])
+    return {
+        "count": int(samples_ms.size),
+        "mean_ms": float(samples_ms.mean()),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(samples_ms.max()),
+    }
+
+
+def format_latency(name, stats):
+    """单行文本形式的延迟统计，用于终端输出"""
+    if not stats.get("count"):
+        return f"{name:<12} 无数据"
+    return (f"{name:<12} p50 {stats['p50_ms']:8.2f}ms  p95 {stats['p95_ms']:8.2f}ms  "
+            f"p99 {stats['p99_ms']:8.2f}ms  max {stats['max_ms']:8.2f}ms")
@@ -0,0 +1,175 @@
+# quantize_model.py
+# 检测模型量化：INT8静态校准 / FP16转换，并在测试集上对比各精度的F1与延迟
+#
+# 用法（需先运行 python compare_backends.py --export 得到各输入尺寸的fp32 ONNX）：
+#   python quantize_model.py                       # 为每个输入尺寸生成int8、fp16模型并输出对比报告
+#   python quantize_model.py --variants int8       # 只处理int8
+#   python quantize_model.py --skip-build          # 只对比已有的模型
+import argparse
+import copy
+import json
+import os
+import re
+from datetime import datetime
+
+import cv2
+
+from compare_backends import export_sizes
+from inference_backends import MODEL_VARIANTS, sized_onnx_path, variant_onnx_path
+from yolo_utils import preprocess
+
+
+class ImageCalibrationReader:
+    """INT8校准数据：把测试图像按推理时相同的前处理逐张送入onnxruntime"""
+
+    def __init__(self, images_dir, input_name, imgsz, max_images=100):
+        image_names = sorted(f for f in os.listdir(images_dir) if f.endswith(('.jpg', '.jpeg', '.png')))
+        self.image_paths = [os.path.join(images_dir, f) for f in image_names[:max_images]]
+        self.input_name = input_name
+        self.imgsz = imgsz
+        self.index = 0
+
+    def get_next(self):
+        while self.index < len(self.image_paths):
+            frame = cv2.imread(self.image_paths[self.index])
+            self.index += 1
+            if frame is not None:
+                blob, _, _ = preprocess(frame, self.imgsz)
+                return {self.input_name: blob}
+        return None
+
+    def rewind(self):
+        self.index = 0
+
+
+def _detect_head_nodes(model):
+    """检测头（最后一个model.N模块）的节点名，量化时保留为浮点以免框坐标解码精度损失"""
+    layer_ids = {}
+    for node in model.graph.node:
+        match = re.search(r"/model\.(\d+)/", node.name)
+        if match:
+            layer_ids[node.name] = int(match.group(1))
+    if not layer_ids:
+        return []
+    head_id = max(layer_ids.values())
+    return [name for name, layer_id in layer_ids.items() if layer_id == head_id]
+
+
+def quantize_int8(yolo_config, images_dir, max_images=100):
+    """训练后静态INT8量化（QDQ格式，权重逐通道），用测试图像做校准"""
+    import onnx
+    import onnxruntime as ort
+    from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    fp32_path = variant_onnx_path(yolo_config, "fp32")
+    int8_path = variant_onnx_path(yolo_config, "int8")
+    prepared_path = int8_path + ".prep.onnx"
+
+    # 量化前先做形状推断和图优化，校准更稳定
+    quant_pre_process(fp32_path, prepared_path)
+    input_name = ort.InferenceSession(prepared_path, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+    reader = ImageCalibrationReader(images_dir, input_name, yolo_config.get("imgsz", 640), max_images)
+
+    quantize_static(
+        prepared_path, int8_path, reader,
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        calibrate_method=CalibrationMethod.MinMax,
+        nodes_to_exclude=_detect_head_nodes(onnx.load(prepared_path)),
+    )
+    os.remove(prepared_path)
+    print(f"INT8模型已生成: {int8_path}（校准图像 {len(reader.image_paths)} 张）")
+    return int8_path
+
+
+def convert_fp16(yolo_config):
+    """权重与计算转为FP16，输入输出保持float32，前后处理无需修改"""
+    import onnx
+    from onnxconverter_common import float16
+
+    fp32_path = variant_onnx_path(yolo_config, "fp32")
+    fp16_path = variant_onnx_path(yolo_config, "fp16")
+    model = float16.convert_float_to_float16(onnx.load(fp32_path), keep_io_types=True)
+    onnx.save(model, fp16_path)
+    print(f"FP16模型已生成: {fp16_path}")
+    return fp16_path
+
+
+def build_variants(config, variants, calib_images=100):
+    """对export_sizes中的每个输入尺寸生成量化模型（<名称>_<尺寸>_<精度>.onnx），
+    与运行时按状态/ROI切换尺寸时加载的路径一致"""
+    for imgsz in export_sizes(config):
+        sized_config = dict(config["yolov5"], imgsz=imgsz, onnx_path=sized_onnx_path(config["yolov5"], imgsz))
+        if not os.path.exists(sized_config["onnx_path"]):
+            print(f"跳过输入尺寸 {imgsz}: 缺少 {sized_config['onnx_path']}（请先运行 python compare_backends.py --export）")
+            continue
+        if "int8" in variants:
+            quantize_int8(sized_config, config["test"]["test_images_dir"], calib_images)
+        if "fp16" in variants:
+            convert_fp16(sized_config)
+
+
+def compare_variants(config, variants, backend="onnxruntime"):
+    """用同一后端逐个精度运行无界面基准测试，报告F1与FPS相对fp32的变化"""
+    from compare_backends import summarize_report
+    from tennis_ball_detector import TennisBallDetector
+
+    results = {}
+    reference = None
+    for variant in variants:
+        variant_config = copy.deepcopy(config)
+        variant_config["yolov5"]["backend"] = backend
+        variant_config["yolov5"]["model_variant"] = variant
+        variant_config["test"]["headless"] = True
+        try:
+            detector = TennisBallDetector(variant_config)
+        except (ImportError, FileNotFoundError, ValueError) as e:
+            print(f"跳过 {variant}: {e}")
+            continue
+
+        print(f"\n>>> 模型精度: {variant}")
+        report = detector.run_benchmark()
+        if not report:
+            continue
+        if reference is None:
+            reference = report
+        results[variant] = summarize_report(report, reference)
+        results[variant]["model_size_mb"] = os.path.getsize(variant_onnx_path(variant_config["yolov5"])) / 1e6
+
+    baseline = results.get("fp32")
+    print(f"\n=== 量化精度/速度对比（后端: {backend}）===")
+    print(f"{'精度':<8}{'大小(MB)':>10}{'p50(ms)':>10}{'FPS':>8}{'F1':>7}{'ΔF1':>8}{'加速比':>8}")
+    for variant, r in results.items():
+        delta_f1 = r["f1_score"] - baseline["f1_score"] if baseline else 0.0
+        speedup = baseline["p50_ms"] / r["p50_ms"] if baseline else 1.0
+        r["delta_f1_vs_fp32"] = delta_f1
+        r["speedup_vs_fp32"] = speedup
+        print(f"{variant:<8}{r['model_size_mb']:>10.1f}{r['p50_ms']:>10.2f}{r['fps']:>8.1f}"
+              f"{r['f1_score']:>7.2f}{delta_f1:>+8.2f}{speedup:>7.2f}x")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="检测模型INT8/FP16量化与精度-延迟对比")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--variants", nargs="+", default=["int8", "fp16"], choices=[v for v in MODEL_VARIANTS if v != "fp32"])
+    parser.add_argument("--backend", default="onnxruntime", choices=["onnxruntime", "opencv"])
+    parser.add_argument("--calib-images", type=int, default=100, help="INT8校准使用的最大图像数")
+    parser.add_argument("--skip-build", action="store_true", help="不重新生成模型，只做对比")
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as f:
+        config = json.load(f)
+
+    if not args.skip_build:
+        build_variants(config, args.variants, args.calib_images)
+
+    results = compare_variants(config, ["fp32"] + args.variants, args.backend)
+
+    output_path = f"quantization_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"量化对比报告已保存至: {output_path}")
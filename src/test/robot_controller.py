@@ -1,74 +1,51 @@
 try:
     # 尝试导入真实硬件库
     import orangepi.gpio as GPIO
-except ImportError:
-    # 导入失败，使用模拟类
-    class MockGPIO:
-        BOARD = 1
-        OUT = 2
-        HIGH = 1
-        LOW = 0
+    GPIO_IMPORT_ERROR = None
+except ImportError as e:
+    # 没有硬件库时只能运行测试模式，或显式传入模拟GPIO（mock_hardware.RecordingGPIO，仿真脚本的做法）
+    GPIO = None
+    GPIO_IMPORT_ERROR = e
 
-        @staticmethod
-        def setmode(mode):
-            print(f"[模拟GPIO] 设置模式: {mode}")
-
-        @staticmethod
-        def setup(pin, direction, initial=None):
-            print(f"[模拟GPIO] 设置引脚 {pin} 方向: {direction}, 初始值: {initial}")
-
-        @staticmethod
-        def output(pin, value):
-            print(f"[模拟GPIO] 引脚 {pin} 输出: {value}")
-
-        @staticmethod
-        def cleanup():
-            print("[模拟GPIO] 清理资源")
-
-    class MockPWM:
-        def __init__(self, pin, frequency):
-            self.pin = pin
-            self.frequency = frequency
-            print(f"[模拟PWM] 引脚 {pin}, 频率 {frequency}Hz")
-
-        def start(self, duty_cycle):
-            print(f"[模拟PWM] 开始输出，占空比 {duty_cycle}%")
-
-        def ChangeDutyCycle(self, duty_cycle):
-            print(f"[模拟PWM] 修改占空比为 {duty_cycle}%")
-
-        def stop(self):
-            print(f"[模拟PWM] 停止输出")
-
-    GPIO = MockGPIO
-
-    def PWM(pin, frequency):
-        return MockPWM(pin, frequency)
-
-import time
 import logging
 import threading
+from motion_executor import MotionExecutor, ScheduledMotionExecutor
+from mock_hardware import RealClock
+from arm_trajectory import ArmTrajectoryEngine, angle_to_duty
+from arm_kinematics import forward_kinematics, solve
+from route_planner import ball_ground_positions
+from visual_servo import VisualServoController
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class RobotController:
-    def __init__(self, config):
+    def __init__(self, config, clock=RealClock, gpio=None):
+        """clock: 时间源（now()/sleep()），仿真时传入mock_hardware.VirtualClock，所有等待都推进虚拟时间
+        gpio: GPIO模块，默认为orangepi.gpio；仿真时传入mock_hardware.RecordingGPIO
+        """
         self.config = config
         self.test_mode = config["test"]["test_mode"]
+        self.clock = clock
+        self.gpio = gpio if gpio is not None else GPIO
 
         if not self.test_mode:
-            # 真实硬件初始化
-            import orangepi.gpio as GPIO
+            if self.gpio is None:
+                # 硬件模式不能悄悄退回模拟GPIO，否则机器人不动也没有任何提示
+                raise ImportError(f"无法导入orangepi.gpio（{GPIO_IMPORT_ERROR}），"
+                                  f"非测试模式需要真实GPIO库；在PC上运行请启用test.test_mode") from GPIO_IMPORT_ERROR
+            # 真实硬件初始化（仿真时self.gpio为传入的模拟GPIO）
             # Orange Pi AIpro(20T) GPIO配置（物理引脚编号）
-            GPIO.setmode(GPIO.BOARD)
+            self.gpio.setmode(self.gpio.BOARD)
 
             # 底盘电机控制引脚（根据实际硬件连接调整）
             self.LEFT_MOTOR_FORWARD = 12   # 物理引脚12 (GPIO18)
             self.LEFT_MOTOR_BACKWARD = 16  # 物理引脚16 (GPIO23)
             self.RIGHT_MOTOR_FORWARD = 18  # 物理引脚18 (GPIO24)
             self.RIGHT_MOTOR_BACKWARD = 22 # 物理引脚22 (GPIO25)
+            self.LEFT_MOTOR_ENABLE = 7     # 物理引脚7，接L298N的ENA（PWM调速）
+            self.RIGHT_MOTOR_ENABLE = 11   # 物理引脚11，接L298N的ENB（PWM调速）
 
             # 机械臂舵机控制引脚（使用支持PWM的引脚）
             self.ARM_BASE_SERVO = 32       # 物理引脚32 (GPIO12, PWM0)
@@ -77,16 +54,24 @@ class RobotController:
             self.GRIPPER_SERVO = 36        # 物理引脚36 (GPIO16, PWM1)
 
             # 初始化电机控制引脚
-            for pin in [self.LEFT_MOTOR_FORWARD, self.LEFT_MOTOR_BACKWARD,
-                        self.RIGHT_MOTOR_FORWARD, self.RIGHT_MOTOR_BACKWARD]:
-                GPIO.setup(pin, GPIO.OUT)
-                GPIO.output(pin, GPIO.LOW)
+            self.motor_pins = [self.LEFT_MOTOR_FORWARD, self.LEFT_MOTOR_BACKWARD,
+                               self.RIGHT_MOTOR_FORWARD, self.RIGHT_MOTOR_BACKWARD]
+            for pin in self.motor_pins:
+                self.gpio.setup(pin, self.gpio.OUT)
+                self.gpio.output(pin, self.gpio.LOW)
+
+            # 电机调速PWM，初始占空比为0
+            motor_pwm_frequency = config["hardware"].get("motor_pwm_frequency", 1000)
+            self.left_motor_pwm = self.gpio.PWM(self.LEFT_MOTOR_ENABLE, motor_pwm_frequency)
+            self.right_motor_pwm = self.gpio.PWM(self.RIGHT_MOTOR_ENABLE, motor_pwm_frequency)
+            self.left_motor_pwm.start(0)
+            self.right_motor_pwm.start(0)
 
             # 初始化舵机PWM控制
-            self.base_pwm = GPIO.PWM(self.ARM_BASE_SERVO, 50)    # 50Hz频率
-            self.shoulder_pwm = GPIO.PWM(self.ARM_SHOULDER_SERVO, 50)
-            self.elbow_pwm = GPIO.PWM(self.ARM_ELBOW_SERVO, 50)
-            self.gripper_pwm = GPIO.PWM(self.GRIPPER_SERVO, 50)
+            self.base_pwm = self.gpio.PWM(self.ARM_BASE_SERVO, 50)    # 50Hz频率
+            self.shoulder_pwm = self.gpio.PWM(self.ARM_SHOULDER_SERVO, 50)
+            self.elbow_pwm = self.gpio.PWM(self.ARM_ELBOW_SERVO, 50)
+            self.gripper_pwm = self.gpio.PWM(self.GRIPPER_SERVO, 50)
 
             # 启动PWM，初始占空比为0
             self.base_pwm.start(0)
@@ -100,120 +85,163 @@ class RobotController:
             print("[模拟] 机器人控制器初始化完成")
             # 创建可视化器
             from arm_visualizer import ArmVisualizer
-            self.visualizer = ArmVisualizer()
-            # 创建用于显示可视化的线程
-            self.visualization_thread = threading.Thread(target=self._run_visualization)
-            self.visualization_thread.daemon = True
-            self.visualization_thread.start()
+            visualizer_config = config["debug"].get("arm_visualizer", {})
+            self.visualizer = ArmVisualizer(
+                max_fps=visualizer_config.get("max_fps", 20),
+                # 无界面运行（debug.show_video为false）时离屏渲染
+                offscreen=visualizer_config.get("offscreen", False) or not config["debug"].get("show_video", True),
+                output=visualizer_config.get("output"))
+            # Agg离屏渲染不涉及GUI，在独立线程中绘制；弹窗显示时GUI只能在主线程中运行，
+            # 由调用方在主线程调用visualizer.show()（见main.py的_simulate_robot_actions）
+            self.visualization_thread = None
+            if self.visualizer.offscreen:
+                self.visualization_thread = threading.Thread(target=self._run_visualization)
+                self.visualization_thread.daemon = True
+                self.visualization_thread.start()
+
+        # 机械臂多关节同步轨迹（模拟模式下不输出PWM）
+        servos = {}
+        if not self.test_mode:
+            servos = {"base": self.base_pwm, "shoulder": self.shoulder_pwm,
+                      "elbow": self.elbow_pwm, "gripper": self.gripper_pwm}
+        arm_config = config.get("arm", {})
+        self.arm = ArmTrajectoryEngine(servos, arm_config, clock=clock.now, sleep=clock.sleep)
+
+        self.home_pose = tuple(arm_config.get("home_pose", [90, 90, 0, 90]))
+        self.mount_offset = arm_config.get("mount_offset", [0, 0])  # 机械臂底座相对相机的地面位置 (右, 前)，cm
+        self.grasp_height = arm_config.get("grasp_height", 3.3)      # 抓取点高度（网球半径）
+        self.approach_height = arm_config.get("approach_height", 10)  # 预抓取时在网球上方的高度
+        self.gripper_open_angle = arm_config.get("gripper_open", 90)
+        self.gripper_closed_angle = arm_config.get("gripper_closed", 30)
+        self.camera_fov = config.get("route_planner", {}).get("camera_fov", 77)
+
+        # 底盘运动在独立线程中执行，调用方（视觉主循环）不再被运动时长阻塞
+        control_config = config["robot_control"]
+        # 虚拟时钟下改用事件驱动的执行器（不开线程），停车时刻由虚拟时间决定
+        watchdog = (control_config.get("watchdog_interval", 0.2), control_config.get("watchdog_timeout", 0.5))
+        if clock.virtual:
+            self.motion_executor = ScheduledMotionExecutor(self._stop_motors, clock, *watchdog)
+        else:
+            self.motion_executor = MotionExecutor(self._stop_motors, *watchdog)
+
+        # 接近网球的闭环控制（每个检测帧更新一次电机占空比）
+        self.visual_servo = VisualServoController(config.get("visual_servo", {}), control_config["collect_distance"])
 
     def _run_visualization(self):
-        """运行可视化窗口的独立线程"""
-        # 初始化可视化窗口
+        """离屏可视化的独立线程"""
+        # 初始化Agg画布并按帧率上限绘制，直到cleanup()
         self.visualizer.show()
 
-    def move_forward(self, duration=1.0, speed=70):
-        """控制机器人前进"""
+    def _set_motors(self, left, right):
+        """设置左右电机：符号为转向（正为前进），绝对值为占空比%"""
+        levels = (left > 0, left < 0, right > 0, right < 0)  # (左前, 左后, 右前, 右后)
+        for pin, level in zip(self.motor_pins, levels):
+            self.gpio.output(pin, self.gpio.HIGH if level else self.gpio.LOW)
+        self.left_motor_pwm.ChangeDutyCycle(abs(left))
+        self.right_motor_pwm.ChangeDutyCycle(abs(right))
+
+    def _stop_motors(self):
+        """电机引脚全部置低（运动执行线程的停车/看门狗调用，不打日志）"""
+        if not self.test_mode:
+            self._set_motors(0, 0)
+
+    def _drive(self, name, left, right, duration, preempt):
+        """提交一条底盘运动指令，返回Future（运动结束为True，被抢占为False）"""
+        apply = None if self.test_mode else (lambda: self._set_motors(left, right))
+        return self.motion_executor.submit(name, apply, duration, preempt)
+
+    def move_forward(self, duration=1.0, speed=70, preempt=True):
+        """控制机器人前进（不阻塞，返回Future；需要等待运动结束时调用 .result()）"""
         if self.test_mode:
             logger.info(f"[模拟] 前进 {duration} 秒，速度 {speed}%")
         else:
             logger.info(f"前进 {duration} 秒，速度 {speed}%")
+        # 设置电机占空比（需L298N或类似驱动支持PWM调速）
+        return self._drive("forward", speed, speed, duration, preempt)
 
-            # 设置电机占空比（需L298N或类似驱动支持PWM调速）
-            GPIO.output(self.LEFT_MOTOR_FORWARD, GPIO.HIGH)
-            GPIO.output(self.LEFT_MOTOR_BACKWARD, GPIO.LOW)
-            GPIO.output(self.RIGHT_MOTOR_FORWARD, GPIO.HIGH)
-            GPIO.output(self.RIGHT_MOTOR_BACKWARD, GPIO.LOW)
-
-            time.sleep(duration)
-            self.stop()
-
-    def move_backward(self, duration=1.0, speed=70):
-        """控制机器人后退"""
+    def move_backward(self, duration=1.0, speed=70, preempt=True):
+        """控制机器人后退（不阻塞，返回Future）"""
         if self.test_mode:
             logger.info(f"[模拟] 后退 {duration} 秒，速度 {speed}%")
         else:
             logger.info(f"后退 {duration} 秒，速度 {speed}%")
+        return self._drive("backward", -speed, -speed, duration, preempt)
 
-            GPIO.output(self.LEFT_MOTOR_FORWARD, GPIO.LOW)
-            GPIO.output(self.LEFT_MOTOR_BACKWARD, GPIO.HIGH)
-            GPIO.output(self.RIGHT_MOTOR_FORWARD, GPIO.LOW)
-            GPIO.output(self.RIGHT_MOTOR_BACKWARD, GPIO.HIGH)
-
-            time.sleep(duration)
-            self.stop()
-
-    def turn_left(self, duration=0.5, speed=50):
-        """控制机器人左转"""
+    def turn_left(self, duration=0.5, speed=50, preempt=True):
+        """控制机器人左转（不阻塞，返回Future）"""
         if self.test_mode:
             logger.info(f"[模拟] 左转 {duration} 秒，速度 {speed}%")
         else:
             logger.info(f"左转 {duration} 秒，速度 {speed}%")
+        return self._drive("turn_left", -speed, speed, duration, preempt)
 
-            GPIO.output(self.LEFT_MOTOR_FORWARD, GPIO.LOW)
-            GPIO.output(self.LEFT_MOTOR_BACKWARD, GPIO.HIGH)
-            GPIO.output(self.RIGHT_MOTOR_FORWARD, GPIO.HIGH)
-            GPIO.output(self.RIGHT_MOTOR_BACKWARD, GPIO.LOW)
-
-            time.sleep(duration)
-            self.stop()
-
-    def turn_right(self, duration=0.5, speed=50):
-        """控制机器人右转"""
+    def turn_right(self, duration=0.5, speed=50, preempt=True):
+        """控制机器人右转（不阻塞，返回Future）"""
         if self.test_mode:
             logger.info(f"[模拟] 右转 {duration} 秒，速度 {speed}%")
         else:
             logger.info(f"右转 {duration} 秒，速度 {speed}%")
-
-            GPIO.output(self.LEFT_MOTOR_FORWARD, GPIO.HIGH)
-            GPIO.output(self.LEFT_MOTOR_BACKWARD, GPIO.LOW)
-            GPIO.output(self.RIGHT_MOTOR_FORWARD, GPIO.LOW)
-            GPIO.output(self.RIGHT_MOTOR_BACKWARD, GPIO.HIGH)
-
-            time.sleep(duration)
-            self.stop()
+        return self._drive("turn_right", speed, -speed, duration, preempt)
 
     def stop(self):
-        """停止所有电机"""
+        """停止所有电机（取消排队中和正在执行的运动），返回Future，停车完成时结束
+
+        停车也作为一条指令交给运动执行线程（时长为0，结束时停车），所有电机写入都在同一线程中进行。
+        """
         if self.test_mode:
             logger.info("[模拟] 停止所有电机")
         else:
             logger.info("停止所有电机")
+        return self.motion_executor.submit("stop", None, 0)
 
-            for pin in [self.LEFT_MOTOR_FORWARD, self.LEFT_MOTOR_BACKWARD,
-                        self.RIGHT_MOTOR_FORWARD, self.RIGHT_MOTOR_BACKWARD]:
-                GPIO.output(pin, GPIO.LOW)
+    def search_for_balls(self):
+        """原地右转搜索网球；上一段转动还没结束时不重复下发
+
+        网球丢失时若视觉伺服的保持指令还在执行，先取消并停车（不等看门狗超时），下一帧再开始搜索。
+        """
+        if self.motion_executor.active() == "visual_servo":
+            self.visual_servo.reset()
+            return self.stop()
+        if self.motion_executor.busy():
+            return None
+        control_config = self.config["robot_control"]
+        return self.turn_right(control_config["search_turn_time"], control_config["turn_speed"], preempt=False)
+
+    def cleanup(self):
+        """停止运动执行线程并释放GPIO"""
+        self.motion_executor.shutdown()
+        if self.test_mode:
+            self.visualizer.stop()
+            if self.visualization_thread is not None:
+                self.visualization_thread.join(timeout=1.0)
+            print("[模拟] 机器人控制器已释放")
+            return
+        for pwm in (self.left_motor_pwm, self.right_motor_pwm,
+                    self.base_pwm, self.shoulder_pwm, self.elbow_pwm, self.gripper_pwm):
+            pwm.stop()
+        self.gpio.cleanup()
+        logger.info("机器人控制器已释放")
 
     def set_servo_angle(self, pwm, angle):
         """设置舵机角度"""
+        # 将角度转换为PWM占空比 (2.5%-12.5%)
+        duty = angle_to_duty(angle)
         if self.test_mode:
-            # 将角度转换为PWM占空比 (2.5%-12.5%)
-            duty = 2.5 + (angle / 180) * 10
             print(f"[模拟] 设置舵机角度 {angle} 度，占空比 {duty:.2f}%")
         else:
-            # 将角度转换为PWM占空比 (2.5%-12.5%)
-            duty = 2.5 + (angle / 180) * 10
             pwm.ChangeDutyCycle(duty)
-            time.sleep(0.3)  # 等待舵机转动到位
+            self.clock.sleep(0.3)  # 等待舵机转动到位
 
     def move_arm_to_position(self, position):
-        """移动机械臂到指定位置
+        """移动机械臂到指定位置（四个舵机同时沿插值轨迹运动），返回姿态切换耗时（秒）
         position: (base_angle, shoulder_angle, elbow_angle, gripper_angle)
         """
-        base_angle, shoulder_angle, elbow_angle, gripper_angle = position
-
+        move_time = self.arm.move_to(position)
         if self.test_mode:
-            logger.info(f"[模拟] 移动机械臂到位置: {position}")
-            self.set_servo_angle(None, base_angle)
-            self.set_servo_angle(None, shoulder_angle)
-            self.set_servo_angle(None, elbow_angle)
-            self.set_servo_angle(None, gripper_angle)
+            logger.info(f"[模拟] 移动机械臂到位置: {position}，耗时 {move_time:.2f}秒")
         else:
-            logger.info(f"移动机械臂到位置: {position}")
-
-            self.set_servo_angle(self.base_pwm, base_angle)
-            self.set_servo_angle(self.shoulder_pwm, shoulder_angle)
-            self.set_servo_angle(self.elbow_pwm, elbow_angle)
-            self.set_servo_angle(self.gripper_pwm, gripper_angle)
+            logger.info(f"移动机械臂到位置: {position}，耗时 {move_time:.2f}秒")
+        return move_time
 
     def move_towards_ball(self, horizontal_offset, distance):
         if self.test_mode:
@@ -226,43 +254,76 @@ class RobotController:
 
             print(f"[模拟] 左电机: {left_speed:.1f}%, 右电机: {right_speed:.1f}%, 时间: {move_time:.2f}秒")
 
-            # 模拟移动过程中的机械臂姿态变化
+            # 模拟移动过程中的机械臂姿态变化：网球进入工作空间后机械臂对准其上方，否则保持初始姿态
+            collect_distance = self.config["robot_control"]["collect_distance"]
             for i in range(10):
                 progress = i / 10
-                # 计算网球位置（简化模型）
-                ball_x = horizontal_offset * 0.3 * (1 - progress)
-                ball_y = 50 - distance * (1 - progress)
-
-                # 更新机械臂姿态（简化模型）
-                shoulder_angle = 90 - horizontal_offset * 0.3 * (1 - progress)
-                elbow_angle = distance * 0.5 * (1 - progress)
-
-                self.visualizer.update_arm(shoulder_angle, elbow_angle, True, (ball_x, ball_y))
-                time.sleep(0.1)  # 使用 time.sleep 代替 plt.pause
+                remaining = collect_distance + (distance - collect_distance) * (1 - progress)
+                x, y = self.ball_arm_position(horizontal_offset, remaining)
+                reach = (x ** 2 + y ** 2) ** 0.5
+                pose = solve(x, y, self.grasp_height + self.approach_height)
+                _, shoulder_angle, elbow_angle = pose if pose is not None else self.home_pose[:3]
+                self.visualizer.update_arm(shoulder_angle, elbow_angle, True, (reach, self.grasp_height))
+                self.clock.sleep(0.1)  # 使用 clock.sleep 代替 plt.pause
         else:
-            # 真实硬件控制
-            # 这里需要根据实际情况补充真实硬件控制代码
-            pass
-
-    def collect_ball(self):
-        if self.test_mode:
-            print("[模拟] 执行捡球动作")
-
-            # 模拟捡球过程
-            # 1. 下降到收集位置
-            for i in range(10):
-                shoulder_angle = 90 - i * 3
-                elbow_angle = i * 6
-                self.visualizer.update_arm(shoulder_angle, elbow_angle, True, (0, 10))
-                time.sleep(0.1)
+            # 闭环控制：每个检测帧提交一条保持指令，由运动执行线程直接切换到新的左右电机占空比（不停车、不等待），
+            # 检测中断超过watchdog_timeout时自动停车
+            left, right = self.visual_servo.update(horizontal_offset, distance, self.clock.now())
+            logger.debug(f"视觉伺服 - 水平偏移: {horizontal_offset:.1f}%, 距离: {distance:.1f}cm, "
+                         f"左电机: {left:.1f}%, 右电机: {right:.1f}%")
+            self.motion_executor.submit("visual_servo", lambda: self._set_motors(left, right))
+
+    def ball_arm_position(self, horizontal_offset, distance):
+        """检测结果 -> 机械臂底座坐标系下的网球地面位置 (x右, y前)，cm"""
+        (x, y), = ball_ground_positions([((0, 0), 0, distance, horizontal_offset)], self.camera_fov)
+        return float(x - self.mount_offset[0]), float(y - self.mount_offset[1])
+
+    def grasp_poses(self, horizontal_offset, distance):
+        """逆解出捡球的姿态序列 (base, shoulder, elbow, gripper)：预抓取、下降、闭合夹爪、抬起
+
+        网球不在工作空间内时返回None。
+        """
+        x, y = self.ball_arm_position(horizontal_offset, distance)
+        above = solve(x, y, self.grasp_height + self.approach_height)
+        grasp = solve(x, y, self.grasp_height)
+        if above is None or grasp is None:
+            return None
+        return [(*above, self.gripper_open_angle),
+                (*grasp, self.gripper_open_angle),
+                (*grasp, self.gripper_closed_angle),
+                (*above, self.gripper_closed_angle)]
+
+    def collect_ball(self, horizontal_offset=0.0, distance=None):
+        """按网球的检测位置捡球，返回是否执行了抓取（网球不可达时不动作）"""
+        if distance is None:
+            distance = self.config["robot_control"]["collect_distance"]
+        if not self.test_mode:
+            # 到达收集距离后先停车（闭环接近阶段的电机仍在转），等停车完成再动机械臂
+            self.stop().result(timeout=1.0)
 
-            # 2. 闭合夹爪
-            self.visualizer.update_arm(shoulder_angle, elbow_angle, False, (0, 10))
-            time.sleep(0.5)
+        poses = self.grasp_poses(horizontal_offset, distance)
+        if poses is None:
+            logger.warning(f"网球超出机械臂工作空间 - 水平偏移: {horizontal_offset:.1f}%, 距离: {distance:.1f}cm")
+            return False
 
-            # 3. 上升
-            for i in range(10):
-                shoulder_angle = 60 + i * 3
-                elbow_angle = 60 - i * 2
-                self.visualizer.update_arm(shoulder_angle, elbow_angle, False, (0, 10))
-                time.sleep(0.1)
\ No newline at end of file
+        if self.test_mode:
+            print(f"[模拟] 执行捡球动作 - 水平偏移: {horizontal_offset:.1f}%, 距离: {distance:.1f}cm")
+            x, y = self.ball_arm_position(horizontal_offset, distance)
+            ball_pos = ((x ** 2 + y ** 2) ** 0.5, self.grasp_height)
+            # 在相邻姿态之间插值显示；夹爪闭合后网球随夹爪末端移动
+            start = self.home_pose
+            for target in poses:
+                for i in range(1, 11):
+                    t = i / 10
+                    shoulder_angle = start[1] + (target[1] - start[1]) * t
+                    elbow_angle = start[2] + (target[2] - start[2]) * t
+                    gripper_open = target[3] > self.gripper_closed_angle
+                    if not gripper_open:
+                        ball_pos = forward_kinematics(shoulder_angle, elbow_angle)[3]
+                    self.visualizer.update_arm(shoulder_angle, elbow_angle, gripper_open, ball_pos)
+                    self.clock.sleep(0.05)
+                start = target
+        else:
+            for pose in poses:
+                self.move_arm_to_position(pose)
+        return True
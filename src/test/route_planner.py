@@ -0,0 +1,115 @@
+# route_planner.py
+# 多球捡球路线规划：由检测结果估计各球的地面位置，最近邻 + 2-opt 排出捡球顺序，场景变化较大时才重新规划
+import math
+
+import numpy as np
+
+from evaluation import optimal_matches
+
+
+def ball_ground_positions(balls, camera_fov=77):
+    """检测结果 -> 机器人坐标系下的地面位置 (N, 2)：x为右侧偏移、y为正前方距离（cm）
+
+    horizontal_offset是相对画面半宽的百分比，按针孔模型换算为方位角（1280宽、焦距800像素时水平视场约77°）。
+    """
+    rows = [(distance, offset) for _, _, distance, offset in balls]
+    if not rows:
+        return np.zeros((0, 2))
+    distance, offset = np.array(rows, dtype=np.float64).T
+    bearing = np.arctan(offset / 100 * math.tan(math.radians(camera_fov) / 2))
+    return np.stack([distance * np.sin(bearing), distance * np.cos(bearing)], axis=1)
+
+
+def route_length(points, order, start=(0.0, 0.0)):
+    """从start出发按order依次经过points的总路程"""
+    if not len(order):
+        return 0.0
+    path = np.vstack([np.asarray(start, dtype=np.float64)[None], points[list(order)]])
+    return float(np.sum(np.hypot(*np.diff(path, axis=0).T)))
+
+
+def plan_route(points, start=(0.0, 0.0)):
+    """从start出发经过全部points的开放路径（不返回起点）：最近邻构造初始解，再用2-opt消除交叉
+
+    返回: 访问顺序（points的下标列表）
+    """
+    n = len(points)
+    if n <= 1:
+        return list(range(n))
+    nodes = np.vstack([np.asarray(start, dtype=np.float64)[None], points])  # 0号节点为起点
+    dist = np.hypot(*(nodes[:, None, :] - nodes[None, :, :]).transpose(2, 0, 1))
+
+    # 最近邻
+    route = [0]
+    unvisited = np.ones(n + 1, dtype=bool)
+    unvisited[0] = False
+    for _ in range(n):
+        candidates = np.where(unvisited, dist[route[-1]], np.inf)
+        nxt = int(np.argmin(candidates))
+        route.append(nxt)
+        unvisited[nxt] = False
+
+    # 2-opt：翻转route[i:j+1]，起点固定；开放路径的末端没有回程边
+    route = np.array(route)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, n):
+            a, b = route[i - 1], route[i]
+            c = route[i:]              # 候选翻转终点 route[j], j >= i
+            d = np.append(route[i + 1:], -1)  # route[j + 1]，-1表示j为末端
+            before = dist[a, b] + np.where(d >= 0, dist[c, np.maximum(d, 0)], 0.0)
+            after = dist[a, c] + np.where(d >= 0, dist[b, np.maximum(d, 0)], 0.0)
+            gain = before - after
+            j = int(np.argmax(gain))
+            if gain[j] > 1e-9:
+                route[i:i + j + 1] = route[i:i + j + 1][::-1].copy()
+                improved = True
+    return [int(node) - 1 for node in route[1:]]
+
+
+class RoutePlanner:
+    """按规划好的顺序选择下一个要捡的球
+
+    每帧把新检测的地面位置与上一帧一一匹配（匈牙利算法）：球的数量不变、且每个球的位置变化都小于
+    replan_distance时沿用原顺序，只更新位置；否则重新规划。
+    """
+
+    def __init__(self, planner_config):
+        self.camera_fov = planner_config.get("camera_fov", 77)
+        self.replan_distance = planner_config.get("replan_distance", 20)
+        self.points = np.zeros((0, 2))
+        self.route = []  # 当前路线（self.points的下标）
+        self.stats = {"frames": 0, "replans": 0}
+
+    def reset(self):
+        self.points = np.zeros((0, 2))
+        self.route = []
+
+    def _scene_changed(self, points):
+        if len(points) != len(self.points) or not len(points):
+            return True, None
+        shift = np.hypot(*(points[:, None, :] - self.points[None, :, :]).transpose(2, 0, 1))
+        rows, cols = optimal_matches(shift, shift < self.replan_distance)
+        if len(rows) != len(points):
+            return True, None
+        mapping = np.empty(len(points), dtype=int)
+        mapping[cols] = rows  # 旧下标 -> 新下标
+        return False, mapping
+
+    def update(self, balls):
+        """输入一帧的全部检测结果，返回本帧的目标球的下标（没有球时返回None）"""
+        self.stats["frames"] += 1
+        points = ball_ground_positions(balls, self.camera_fov)
+        changed, mapping = self._scene_changed(points)
+        if changed:
+            self.route = plan_route(points)
+            self.stats["replans"] += 1
+        else:
+            self.route = [int(mapping[i]) for i in self.route]
+        self.points = points
+        return self.route[0] if self.route else None
+
+    def planned_length(self):
+        """当前路线的总路程（cm）"""
+        return route_length(self.points, self.route)
@@ -0,0 +1,156 @@
+# route_simulation.py
+# 多球捡球仿真：随机摆放网球，对比“每帧重新选最近的球”与路线规划（RoutePlanner）的总路程和每球用时
+import argparse
+import json
+import math
+from datetime import datetime
+
+import numpy as np
+
+from route_planner import RoutePlanner
+
+
+class CollectionWorld:
+    """场地 + 独轮车模型的机器人 + 带噪声的相机观测（距离/水平偏移与检测器输出一致）"""
+
+    def __init__(self, balls, sim_config, rng):
+        self.balls = [np.asarray(b, dtype=np.float64) for b in balls]
+        self.rng = rng
+        self.position = np.zeros(2)
+        self.heading = math.pi / 2  # 车头朝+y
+        self.half_fov = math.radians(sim_config["camera_fov"]) / 2
+        self.max_range = sim_config["max_range"]
+        self.distance_noise = sim_config["distance_noise"]
+        self.offset_noise = sim_config["offset_noise"]
+        self.path_length = 0.0
+
+    def relative(self, ball):
+        """球的 (距离, 方位角)，方位角右侧为正"""
+        delta = ball - self.position
+        angle = math.atan2(delta[1], delta[0]) - self.heading
+        return float(np.hypot(*delta)), -math.atan2(math.sin(angle), math.cos(angle))
+
+    def observe(self):
+        """返回 (可见球在self.balls中的下标列表, 检测结果列表)，检测结果格式同detect_tennis_balls"""
+        indices, detections = [], []
+        for i, ball in enumerate(self.balls):
+            distance, bearing = self.relative(ball)
+            if abs(bearing) > self.half_fov or distance > self.max_range:
+                continue
+            distance *= 1 + self.rng.normal(0, self.distance_noise)
+            offset = math.tan(bearing) / math.tan(self.half_fov) * 100 + self.rng.normal(0, self.offset_noise)
+            indices.append(i)
+            detections.append(((0.0, 0.0), 0.0, distance, offset))
+        return indices, detections
+
+    def drive(self, speed, omega, dt):
+        self.heading -= omega * dt  # omega为正时向右转
+        step = speed * dt
+        self.position += step * np.array([math.cos(self.heading), math.sin(self.heading)])
+        self.path_length += abs(step)
+
+
+def simulate_collection(balls, strategy, config, sim_config, seed):
+    """strategy: "nearest"（每帧选距离最近的球） 或 "route"（RoutePlanner）"""
+    rng = np.random.default_rng(seed)
+    world = CollectionWorld(balls, sim_config, rng)
+    planner = RoutePlanner(config.get("route_planner", {})) if strategy == "route" else None
+    collect_distance = config["robot_control"]["collect_distance"]
+    dt = 1.0 / sim_config["detect_fps"]
+    sim_time, collected, target_switches, last_target = 0.0, 0, 0, None
+
+    while world.balls and sim_time < sim_config["timeout"]:
+        indices, detections = world.observe()
+        if not detections:
+            world.drive(0.0, sim_config["search_omega"], dt)  # 原地转向搜索
+            sim_time += dt
+            last_target = None
+            continue
+        if planner is not None:
+            choice = planner.update(detections)
+        else:
+            choice = int(np.argmin([d[2] for d in detections]))
+        target = indices[choice]
+        if last_target is not None and target != last_target:
+            target_switches += 1
+        last_target = target
+
+        distance, bearing = world.relative(world.balls[target])
+        if detections[choice][2] <= collect_distance:
+            # 到达收集距离：停车捡球
+            world.balls.pop(target)
+            collected += 1
+            sim_time += sim_config["collect_time"]
+            last_target = None
+            if planner is not None:
+                planner.reset()
+            continue
+        omega = float(np.clip(sim_config["turn_gain"] * bearing, -sim_config["max_omega"], sim_config["max_omega"]))
+        speed = sim_config["max_speed"] * max(0.0, math.cos(bearing)) if abs(bearing) < math.radians(30) else 0.0
+        world.drive(speed, omega, dt)
+        sim_time += dt
+
+    return {
+        "collected": collected,
+        "total_balls": len(balls),
+        "total_time": sim_time,
+        "path_length": world.path_length,
+        "time_per_ball": sim_time / collected if collected else None,
+        "path_per_ball": world.path_length / collected if collected else None,
+        "target_switches": target_switches,
+        "replans": planner.stats["replans"] if planner is not None else None,
+    }
+
+
+def run_simulation(config, fields=20, balls_per_field=6, seed=0):
+    sim_config = dict({"detect_fps": 15, "camera_fov": 77, "max_range": 500, "distance_noise": 0.03,
+                       "offset_noise": 1.0, "max_speed": 25.0, "max_omega": math.radians(90),
+                       "search_omega": math.radians(45), "turn_gain": 3.0, "collect_time": 3.0,
+                       "timeout": 300.0}, **config.get("route_simulation", {}))
+    rng = np.random.default_rng(seed)
+    results = []
+    for field in range(fields):
+        balls = np.column_stack([rng.uniform(-150, 150, balls_per_field), rng.uniform(60, 400, balls_per_field)])
+        results.append({
+            "field": field,
+            "nearest": simulate_collection(balls, "nearest", config, sim_config, seed + field),
+            "route": simulate_collection(balls, "route", config, sim_config, seed + field),
+        })
+    return results
+
+
+def summarize(results, strategy):
+    runs = [r[strategy] for r in results]
+    collected = sum(r["collected"] for r in runs)
+    return {
+        "collected": collected,
+        "total_balls": sum(r["total_balls"] for r in runs),
+        "path_length": sum(r["path_length"] for r in runs),
+        "time_per_ball": sum(r["total_time"] for r in runs) / max(collected, 1),
+        "path_per_ball": sum(r["path_length"] for r in runs) / max(collected, 1),
+        "target_switches": sum(r["target_switches"] for r in runs),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="多球捡球路线仿真：最近优先 vs 路线规划")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--fields", type=int, default=20, help="随机场地数")
+    parser.add_argument("--balls", type=int, default=6, help="每个场地的网球数")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as f:
+        config = json.load(f)
+
+    results = run_simulation(config, args.fields, args.balls, args.seed)
+    summary = {strategy: summarize(results, strategy) for strategy in ("nearest", "route")}
+    for strategy, label in (("nearest", "最近优先"), ("route", "路线规划")):
+        s = summary[strategy]
+        print(f"{label}: 捡到 {s['collected']}/{s['total_balls']}，总路程 {s['path_length'] / 100:.1f}m，"
+              f"每球 {s['time_per_ball']:.1f}s / {s['path_per_ball']:.0f}cm，目标切换 {s['target_switches']} 次")
+
+    output_path = f"route_simulation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_path, 'w') as f:
+        json.dump({"summary": summary, "fields": results}, f, indent=2)
+    print(f"仿真结果已保存至: {output_path}")
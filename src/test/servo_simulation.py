@@ -0,0 +1,217 @@
+# servo_simulation.py
+# 接近网球的仿真对比：闭环视觉伺服（通过模拟GPIO驱动RobotController） vs 原来的开环“转向/前进-停车-再检测”
+# 差速底盘 + 针孔相机的简化模型，统计到达时间、航向超调和停车位置
+import argparse
+import copy
+import json
+import math
+from datetime import datetime
+
+from mock_hardware import RecordingGPIO, VirtualClock
+from robot_controller import RobotController
+
+# 默认场景：(初始距离cm, 球相对车头的方位角°，正为右侧)
+DEFAULT_SCENARIOS = [(100, 0), (150, 10), (200, -20), (250, 25), (300, -5), (120, -28)]
+
+
+class DifferentialDrivePlant:
+    """差速底盘 + 前置相机：电机占空比 -> 轮速（一阶滞后） -> 位姿；观测为 (horizontal_offset %, distance cm)"""
+
+    def __init__(self, distance, bearing_deg, sim_config):
+        self.full_speed = sim_config.get("full_speed", 20 / 0.7)  # 占空比100%时的轮速 cm/s（与原公式 70%占空比≈20cm/s 一致）
+        self.track = sim_config.get("track", 20.0)
+        self.motor_tau = sim_config.get("motor_tau", 0.1)
+        self.half_fov = math.radians(sim_config.get("fov", 60)) / 2
+        self.x, self.y, self.heading = 0.0, 0.0, 0.0  # 车头朝+x，heading逆时针为正
+        bearing = math.radians(bearing_deg)
+        self.ball = (distance * math.cos(-bearing), distance * math.sin(-bearing))
+        self.left_speed = self.right_speed = 0.0
+        self.command = (0.0, 0.0)
+
+    def step(self, dt):
+        alpha = dt / (self.motor_tau + dt)
+        self.left_speed += alpha * (self.command[0] / 100 * self.full_speed - self.left_speed)
+        self.right_speed += alpha * (self.command[1] / 100 * self.full_speed - self.right_speed)
+        v = (self.left_speed + self.right_speed) / 2
+        omega = (self.left_speed - self.right_speed) / self.track  # 左轮快 -> 向右转（顺时针）
+        self.heading -= omega * dt
+        self.x += v * math.cos(self.heading) * dt
+        self.y += v * math.sin(self.heading) * dt
+
+    def bearing(self):
+        """球相对车头的方位角（弧度，右侧为正）"""
+        angle = math.atan2(self.ball[1] - self.y, self.ball[0] - self.x) - self.heading
+        return -math.atan2(math.sin(angle), math.cos(angle))
+
+    def distance(self):
+        return math.hypot(self.ball[0] - self.x, self.ball[1] - self.y)
+
+    def observe(self):
+        """与检测器一致的观测；球出视野时返回None"""
+        bearing = self.bearing()
+        if abs(bearing) > self.half_fov:
+            return None
+        return math.tan(bearing) / math.tan(self.half_fov) * 100, self.distance()
+
+
+class _Recorder:
+    """记录一次接近过程的指标"""
+
+    def __init__(self, plant):
+        self.plant = plant
+        self.initial_sign = math.copysign(1, plant.bearing()) if abs(plant.bearing()) > 1e-6 else 0
+        self.overshoot = 0.0
+        self.time_to_reach = None
+        self.lost = False
+
+    def track(self):
+        bearing = self.plant.bearing()
+        if self.initial_sign and bearing * self.initial_sign < 0:
+            self.overshoot = max(self.overshoot, abs(math.degrees(bearing)))
+
+    def result(self, collect_distance):
+        return {
+            "reached": self.time_to_reach is not None,
+            "time_to_reach": self.time_to_reach,
+            "heading_overshoot_deg": self.overshoot,
+            "final_distance": self.plant.distance(),
+            "distance_overshoot": max(0.0, collect_distance - self.plant.distance()),
+            "lost": self.lost,
+        }
+
+
+def _reached(observation, collect_distance, offset_tolerance):
+    return observation is not None and observation[1] <= collect_distance and abs(observation[0]) <= offset_tolerance
+
+
+def _settle(plant, recorder, sim_config):
+    """停车指令下发后继续积分，直到底盘停稳"""
+    plant.command = (0.0, 0.0)
+    for _ in range(int(sim_config.get("settle_time", 1.0) / sim_config["dt"])):
+        plant.step(sim_config["dt"])
+        recorder.track()
+
+
+def simulate_closed_loop(config, distance, bearing_deg, sim_config):
+    """闭环：每个检测帧调用RobotController.move_towards_ball，从模拟GPIO读回电机方向和占空比（虚拟时钟驱动）"""
+    collect_distance = config["robot_control"]["collect_distance"]
+    hardware_config = copy.deepcopy(config)
+    hardware_config["test"]["test_mode"] = False
+    plant = DifferentialDrivePlant(distance, bearing_deg, sim_config)
+    recorder = _Recorder(plant)
+    clock = VirtualClock()
+    gpio = RecordingGPIO(clock)
+    controller = RobotController(hardware_config, clock=clock, gpio=gpio)
+    levels = gpio.levels
+    frame_interval, dt = 1.0 / sim_config["detect_fps"], sim_config["dt"]
+    next_frame = 0.0
+    try:
+        while clock.now() < sim_config["timeout"]:
+            if clock.now() >= next_frame:
+                next_frame += frame_interval
+                observation = plant.observe()
+                if observation is None:
+                    recorder.lost = True
+                    break
+                if _reached(observation, collect_distance, sim_config["offset_tolerance"]):
+                    recorder.time_to_reach = clock.now()
+                    controller.stop()
+                    break
+                controller.move_towards_ball(*observation)
+            left_sign = 1 if levels.get(controller.LEFT_MOTOR_FORWARD) else -1 if levels.get(controller.LEFT_MOTOR_BACKWARD) else 0
+            right_sign = 1 if levels.get(controller.RIGHT_MOTOR_FORWARD) else -1 if levels.get(controller.RIGHT_MOTOR_BACKWARD) else 0
+            plant.command = (left_sign * controller.left_motor_pwm.duty_cycle,
+                             right_sign * controller.right_motor_pwm.duty_cycle)
+            plant.step(dt)
+            recorder.track()
+            clock.sleep(dt)  # 推进虚拟时间（看门狗等定时动作在此期间按时触发）
+    finally:
+        controller.cleanup()
+    _settle(plant, recorder, sim_config)
+    return recorder.result(collect_distance)
+
+
+def simulate_open_loop(config, distance, bearing_deg, sim_config):
+    """原方案：按检测结果计算 左=70+偏移/5、右=70-偏移/5，开环行驶 距离/20 秒后停车，再重新检测"""
+    collect_distance = config["robot_control"]["collect_distance"]
+    plant = DifferentialDrivePlant(distance, bearing_deg, sim_config)
+    recorder = _Recorder(plant)
+    sim_time, dt = 0.0, sim_config["dt"]
+    frame_interval = 1.0 / sim_config["detect_fps"]
+    while sim_time < sim_config["timeout"]:
+        observation = plant.observe()
+        if observation is None:
+            recorder.lost = True
+            break
+        if _reached(observation, collect_distance, sim_config["offset_tolerance"]):
+            recorder.time_to_reach = sim_time
+            break
+        horizontal_offset, ball_distance = observation
+        plant.command = (70 + horizontal_offset / 5, 70 - horizontal_offset / 5)
+        move_time = ball_distance / 20
+        elapsed = 0.0
+        while elapsed < move_time:
+            plant.step(dt)
+            recorder.track()
+            elapsed += dt
+            # 运动过程中不检测，只记录首次满足到达条件的时刻
+            if recorder.time_to_reach is None and _reached(plant.observe(), collect_distance, sim_config["offset_tolerance"]):
+                recorder.time_to_reach = sim_time + elapsed
+        sim_time += elapsed
+        # 停车后等到下一帧才重新检测
+        plant.command = (0.0, 0.0)
+        waited = 0.0
+        while waited < frame_interval:
+            plant.step(dt)
+            recorder.track()
+            waited += dt
+        sim_time += waited
+        if recorder.time_to_reach is not None:
+            break
+    _settle(plant, recorder, sim_config)
+    return recorder.result(collect_distance)
+
+
+def run_simulation(config, scenarios=DEFAULT_SCENARIOS):
+    sim_config = dict({"dt": 0.005, "detect_fps": 15, "timeout": 30.0, "offset_tolerance": 10}, **config.get("servo_simulation", {}))
+    results = []
+    for distance, bearing_deg in scenarios:
+        results.append({
+            "distance": distance,
+            "bearing_deg": bearing_deg,
+            "closed_loop": simulate_closed_loop(config, distance, bearing_deg, sim_config),
+            "open_loop": simulate_open_loop(config, distance, bearing_deg, sim_config),
+        })
+    return results
+
+
+def print_simulation(results):
+    print(f"{'场景':<14}{'方案':<8}{'到达':<6}{'用时(s)':>8}{'航向超调(°)':>12}{'停车距离(cm)':>13}")
+    for result in results:
+        name = f"{result['distance']}cm/{result['bearing_deg']:+d}°"
+        for mode in ("closed_loop", "open_loop"):
+            r = result[mode]
+            time_text = f"{r['time_to_reach']:.2f}" if r["reached"] else ("丢失" if r["lost"] else "超时")
+            print(f"{name:<14}{'闭环' if mode == 'closed_loop' else '开环':<8}{'是' if r['reached'] else '否':<6}"
+                  f"{time_text:>8}{r['heading_overshoot_deg']:>12.1f}{r['final_distance']:>13.1f}")
+    for mode, label in (("closed_loop", "闭环"), ("open_loop", "开环")):
+        times = [r[mode]["time_to_reach"] for r in results if r[mode]["reached"]]
+        mean = sum(times) / len(times) if times else float("nan")
+        print(f"{label}: 到达 {len(times)}/{len(results)}，平均用时 {mean:.2f}s")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="闭环视觉伺服 vs 开环接近的仿真对比")
+    parser.add_argument("--config", default="config.json")
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as f:
+        config = json.load(f)
+
+    results = run_simulation(config)
+    print_simulation(results)
+
+    output_path = f"servo_simulation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"仿真结果已保存至: {output_path}")
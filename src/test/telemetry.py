@@ -0,0 +1,188 @@
+# telemetry.py
+# 运行时分阶段延迟统计：固定分桶直方图 + 最近N次样本的滚动p50/p99，
+# 定期导出到本地JSON文件，并在localhost上提供Prometheus文本格式的 /metrics
+import bisect
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# 检测循环的各阶段：capture为帧龄（采集到开始检测），frame为一次检测循环的总耗时
+STAGES = ("capture", "preprocess", "inference", "postprocess", "decision", "actuation", "display", "frame")
+DEFAULT_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2, 3, 5, 7.5, 10, 15, 20, 30, 50, 75, 100, 150, 200, 300, 500, 1000, 2000, 5000)
+
+
+class LatencyHistogram:
+    """固定分桶的延迟直方图（纳秒）
+
+    不加锁：每个直方图只由一个线程写入（各阶段都在固定的线程中执行），读取方复制列表得到快照，
+    快照与正在进行的写入最多相差一个样本。record()只做一次二分查找和几次整数运算（约1µs）。
+    """
+
+    def __init__(self, bounds_ns, window=1024):
+        self.bounds = list(bounds_ns)              # 各桶上界（含），最后还有一个+Inf桶
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0
+        self.max = 0
+        # 最近window个样本的环形缓冲（长度取2的幂，下标用位与），用于滚动分位数
+        size = 1 << max(0, int(window) - 1).bit_length()
+        self.recent = [0] * size
+        self.mask = size - 1
+        self.count = 0  # 累计样本数，同时是环形缓冲的写入位置
+
+    def record(self, elapsed_ns):
+        self.counts[bisect.bisect_left(self.bounds, elapsed_ns)] += 1
+        self.sum += elapsed_ns
+        if elapsed_ns > self.max:
+            self.max = elapsed_ns
+        self.recent[self.count & self.mask] = elapsed_ns
+        self.count += 1
+
+    def snapshot(self):
+        """毫秒统计：累计的 count/mean/max 和各桶累计数，最近window个样本的 p50/p99"""
+        counts, count, total, maximum = list(self.counts), self.count, self.sum, self.max
+        recent = self.recent[:min(count, len(self.recent))]
+        if not count:
+            return {"count": 0}
+        p50, p99 = np.percentile(np.asarray(recent, dtype=np.float64) / 1e6, [50, 99]) if recent else (0.0, 0.0)
+        return {
+            "count": count,
+            "mean_ms": total / count / 1e6,
+            "p50_ms": float(p50),
+            "p99_ms": float(p99),
+            "max_ms": maximum / 1e6,
+            "sum_ms": total / 1e6,
+            "buckets": np.cumsum(counts).tolist(),  # 与bounds对应的累计计数，最后一项为+Inf
+        }
+
+
+class Telemetry:
+    """各阶段延迟直方图的集合，以及JSON/Prometheus导出
+
+    telemetry_config:
+      export_interval  JSON导出间隔（秒）
+      json_path        JSON快照路径（原子替换写入）
+      prometheus_port  /metrics监听端口（只绑定127.0.0.1），为0或null时不启动
+      window           滚动分位数的样本数
+      buckets_ms       直方图分桶上界（毫秒）
+    """
+
+    def __init__(self, telemetry_config, stages=STAGES):
+        self.export_interval = telemetry_config.get("export_interval", 10)
+        self.json_path = telemetry_config.get("json_path", "./telemetry.json")
+        self.prometheus_port = telemetry_config.get("prometheus_port", 9108)
+        window = telemetry_config.get("window", 1024)
+        self.buckets_ms = list(telemetry_config.get("buckets_ms", DEFAULT_BUCKETS_MS))
+        bounds_ns = [int(b * 1e6) for b in self.buckets_ms]
+        self.histograms = {stage: LatencyHistogram(bounds_ns, window) for stage in stages}
+        self.gauges = {}
+        self.start_time = time.time()
+        self.stopped = threading.Event()
+        self.export_thread = None
+        self.server = None
+
+    def record(self, stage, elapsed_ns):
+        self.histograms[stage].record(elapsed_ns)
+
+    def set_gauge(self, name, value):
+        self.gauges[name] = value
+
+    def snapshot(self):
+        return {
+            "timestamp": time.time(),
+            "uptime": time.time() - self.start_time,
+            "buckets_ms": self.buckets_ms,
+            "stages": {stage: histogram.snapshot() for stage, histogram in self.histograms.items()},
+            "gauges": dict(self.gauges),
+        }
+
+    def format_summary(self):
+        """单行文本：有数据的阶段的滚动 p50/p99（毫秒）"""
+        parts = []
+        for stage, histogram in self.histograms.items():
+            stats = histogram.snapshot()
+            if stats["count"]:
+                parts.append(f"{stage} {stats['p50_ms']:.1f}/{stats['p99_ms']:.1f}")
+        return "阶段延迟 p50/p99(ms): " + " | ".join(parts)
+
+    def write_json(self):
+        """原子写入JSON快照（先写临时文件再替换，读取方不会读到半个文件）"""
+        tmp_path = self.json_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(tmp_path, self.json_path)
+
+    def to_prometheus(self):
+        """Prometheus文本格式：每个阶段一个histogram（秒），另有滚动p50/p99和gauge"""
+        lines = ["# HELP tennis_stage_latency_seconds Per-stage latency of the detection loop.",
+                 "# TYPE tennis_stage_latency_seconds histogram"]
+        quantile_lines = []
+        les = [f"{b / 1000:g}" for b in self.buckets_ms] + ["+Inf"]
+        for stage, histogram in self.histograms.items():
+            stats = histogram.snapshot()
+            if not stats["count"]:
+                continue
+            for le, cumulative in zip(les, stats["buckets"]):
+                lines.append(f'tennis_stage_latency_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'tennis_stage_latency_seconds_sum{{stage="{stage}"}} {stats["sum_ms"] / 1000:.9f}')
+            lines.append(f'tennis_stage_latency_seconds_count{{stage="{stage}"}} {stats["count"]}')
+            for quantile, key in (("0.5", "p50_ms"), ("0.99", "p99_ms")):
+                quantile_lines.append(f'tennis_stage_latency_rolling_seconds{{stage="{stage}",quantile="{quantile}"}} '
+                                      f'{stats[key] / 1000:.9f}')
+        if quantile_lines:
+            lines += ["# HELP tennis_stage_latency_rolling_seconds Rolling quantiles over the most recent samples.",
+                      "# TYPE tennis_stage_latency_rolling_seconds gauge"] + quantile_lines
+        for name, value in self.gauges.items():
+            lines += [f"# TYPE tennis_{name} gauge", f"tennis_{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+    def start(self):
+        """启动定期JSON导出线程和 /metrics 服务"""
+        if self.prometheus_port:
+            telemetry = self
+
+            class MetricsHandler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?")[0] != "/metrics":
+                        self.send_error(404)
+                        return
+                    body = telemetry.to_prometheus().encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass  # 不在终端打印访问日志
+
+            try:
+                self.server = ThreadingHTTPServer(("127.0.0.1", self.prometheus_port), MetricsHandler)
+            except OSError as e:
+                print(f"警告: 无法在端口 {self.prometheus_port} 启动 /metrics 服务: {e}")
+            else:
+                threading.Thread(target=self.server.serve_forever, name="TelemetryServer", daemon=True).start()
+                print(f"延迟统计: http://127.0.0.1:{self.server.server_address[1]}/metrics")
+
+        if self.json_path:
+            self.export_thread = threading.Thread(target=self._export_loop, name="TelemetryExporter", daemon=True)
+            self.export_thread.start()
+        return self
+
+    def _export_loop(self):
+        while not self.stopped.wait(self.export_interval):
+            self.write_json()
+
+    def stop(self):
+        """停止导出并写最后一次快照"""
+        self.stopped.set()
+        if self.export_thread is not None:
+            self.export_thread.join(timeout=1.0)
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        if self.json_path:
+            self.write_json()
@@ -5,7 +5,15 @@ import os
 import json
 import time
 from datetime import datetime
-import torch  # 新增YOLOv5依赖
+from inference_backends import create_backend, sized_onnx_path
+from color_detector import ColorBallDetector
+from detections import Detections
+from overlay_renderer import draw_detections
+from yolo_utils import preprocess_into, non_max_suppression, scale_boxes
+from perf_stats import summarize_latency, format_latency
+from evaluation import GroundTruthIndex, DetectionEvaluator, match_by_center
+from parallel_evaluation import detect_images_parallel, default_threads_per_worker
+from frame_cache import open_frame_cache
 
 class TennisBallDetector:
     def __init__(self, config):
@@ -14,11 +22,41 @@ class TennisBallDetector:
         self.model_path = config["yolov5"]["model_path"]  # 训练好的模型路径（如./yolov5/runs/train/exp/weights/best.pt）
         self.conf_threshold = config["yolov5"]["conf_threshold"]  # 置信度阈值（如0.5）
         self.iou_threshold = config["yolov5"]["iou_threshold"]    # NMS的IOU阈值
+        self.imgsz = config["yolov5"].get("imgsz", 640)            # 模型输入尺寸
+        self.model_variant = config["yolov5"].get("model_variant", "fp32")
+        self.base_imgsz = self.imgsz                # 配置文件中的默认输入尺寸/精度（use_profile切换前）
+        self.base_model_variant = self.model_variant
+        self.roi_imgsz = config["yolov5"].get("roi_imgsz") or self.imgsz  # 跟踪时ROI重检测的输入尺寸
+        self.roi_enabled = config["image_processing"].get("tracking", {}).get("enabled", False)
         
-        # 加载YOLOv5模型（新增）
-        self.model = torch.hub.load('ultralytics/yolov5', 'custom', path=self.model_path, force_reload=True)
-        self.model.conf = self.conf_threshold  # 设置置信度阈值
-        self.model.iou = self.iou_threshold    # 设置NMS阈值
+        # 检测模式：yolov5（神经网络）、color（HSV颜色阈值）或 cascade（颜色预筛 + YOLOv5）
+        self.detector_mode = config["image_processing"].get("detector_mode", "yolov5")
+        self.color_detector = ColorBallDetector(config["image_processing"])
+        self.backend = None
+        self.backends = {}  # (输入尺寸, 模型精度) -> 已加载的推理后端
+        self.failed_backends = {}  # (输入尺寸, 模型精度) -> 加载失败的原因，不再重复尝试
+        self.input_buffers = {}  # (batch大小, 输入尺寸) -> 预分配的NCHW输入数组，每次推理复用
+        self.telemetry = None  # 运行时分阶段延迟统计（由TennisBallCollector设置，见telemetry.py）
+        if self.detector_mode in ("yolov5", "cascade"):
+            try:
+                self.backend = self._get_backend(self.imgsz, self.model_variant)
+                self.model_info = self.backend.info
+                self.preload_profiles([(None, None)])  # 跟踪用的ROI尺寸后端
+            except (ImportError, FileNotFoundError) as e:
+                if not config["image_processing"].get("color_fallback", False):
+                    raise
+                print(f"模型不可用（{e}），回退到颜色检测模式")
+                self.detector_mode = "color"
+        if self.detector_mode == "color":
+            self.model_info = {"backend": "color", "load_time": 0.0}
+        
+        # 级联模式：颜色预筛没有候选时跳过神经网络推理，每隔若干帧强制做一次整帧检测防止漏检
+        cascade_config = config["image_processing"].get("cascade", {})
+        self.cascade_gate_scale = cascade_config.get("gate_scale", 0.25)
+        self.cascade_gate_min_pixels = cascade_config.get("gate_min_pixels", 20)
+        self.cascade_full_check_interval = cascade_config.get("full_check_interval", 10)
+        self.frames_since_inference = 0
+        self.reset_cascade_stats()
         
         # 原OpenCV参数（保留）
         self.min_ball_radius = config["image_processing"]["min_ball_radius"]
@@ -30,43 +68,215 @@ class TennisBallDetector:
         self.test_mode = config["test"]["test_mode"]
         self.test_images_dir = config["test"]["test_images_dir"]
         self.ground_truth_dir = config["test"]["ground_truth_dir"]
+        self.annotations_path = config["test"].get("annotations_path")
+        # 匹配判定阈值：中心距离与半径差（像素）
+        self.match_distance = config["test"].get("match_distance", 30)
+        self.match_radius_diff = config["test"].get("match_radius_diff", 15)
+        self.ground_truth_index = None  # 首次评估时一次性加载
+        # 预解码帧缓存（test.frame_cache.enabled为true时从内存映射文件取帧，不再逐次解码JPEG）
+        self.frame_cache_config = config["test"].get("frame_cache", {})
+        self.frame_cache = None
+        # 无界面运行（不弹出结果窗口）：test.headless为true或debug.show_video为false
+        self.headless = config["test"].get("headless", False) or not config["debug"].get("show_video", True)
         self.test_results = []
 
-    def detect_tennis_balls(self, frame):
-        """使用YOLOv5的网球检测（替代原OpenCV逻辑）"""
-        # YOLOv5推理（新增）
-        results = self.model(frame)  # 输入BGR格式图像
-        
-        # 解析检测结果（新增）
-        balls = []
-        processed_frame = frame.copy()
-        for *xyxy, conf, cls in results.xyxy[0].tolist():  # xyxy: [x1,y1,x2,y2]
-            x1, y1, x2, y2 = map(int, xyxy)
-            x_center = (x1 + x2) / 2  # 中心点x坐标
-            y_center = (y1 + y2) / 2  # 中心点y坐标
-            radius = (x2 - x1) / 2     # 近似半径（假设包围框为正方形）
-            
-            # 过滤不符合半径范围的球（保留原逻辑）
-            if not (self.min_ball_radius < radius < self.max_ball_radius):
-                continue
-            
-            # 计算距离（保留原公式）
-            distance = (self.known_ball_diameter * self.focal_length) / (2 * radius)
-            
-            # 计算水平偏移（保留原逻辑）
-            frame_center_x = frame.shape[1] / 2
-            horizontal_offset = ((x_center - frame_center_x) / frame_center_x) * 100
-            
-            balls.append(((x_center, y_center), radius, distance, horizontal_offset))
-            
-            # 绘制检测框和信息（修改显示内容）
-            cv2.rectangle(processed_frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-            cv2.putText(processed_frame, 
-                        f"Ball: {distance:.1f}cm (conf:{conf:.2f})",  # 显示置信度
-                        (x1, y1 - 10), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+    def _get_backend(self, imgsz, model_variant):
+        """按 (输入尺寸, 模型精度) 加载、预热并缓存推理后端（yolov5.backend: torch / onnxruntime / opencv）"""
+        key = (imgsz, model_variant)
+        if key not in self.backends:
+            backend_config = dict(self.config["yolov5"], imgsz=imgsz, model_variant=model_variant,
+                                  onnx_path=sized_onnx_path(self.config["yolov5"], imgsz))
+            backend = create_backend(backend_config)
+            warmup_start = time.perf_counter()
+            backend.forward(np.zeros((1, 3, imgsz, imgsz), dtype=np.float32))  # 预热，首次推理包含图优化开销
+            backend.info["warmup_time"] = time.perf_counter() - warmup_start
+            print(f"推理后端 {backend.info['backend']} ({imgsz}, {model_variant})"
+                  f"（{'冷启动' if backend.info.get('cold_start') else '热启动'}）: "
+                  f"加载 {backend.info['load_time']:.2f}s, 预热 {backend.info['warmup_time']:.2f}s")
+            self.backends[key] = backend
+        return self.backends[key]
+
+    def _try_get_backend(self, imgsz, model_variant):
+        """运行中切换用的_get_backend：加载失败（模型文件缺失、损坏等）时打印一次警告并返回None"""
+        key = (imgsz, model_variant)
+        if key in self.failed_backends:
+            return None
+        try:
+            return self._get_backend(imgsz, model_variant)
+        except Exception as e:
+            self.failed_backends[key] = e
+            print(f"警告: 推理后端 ({imgsz}, {model_variant}) 加载失败，继续使用当前后端: {e}")
+            return None
+
+    def preload_profiles(self, profiles):
+        """启动时加载并预热各 (输入尺寸, 模型精度) 的后端（启用跟踪时连同该精度的ROI尺寸）
+
+        后端按需创建时首次切换要做TorchScript追踪或加载ONNX会话，会在控制循环里卡顿数秒；
+        未指定的项按配置文件中的默认值。加载失败的组合会被记住，运行中切换时直接保持当前后端。
+        """
+        if self.detector_mode == "color":
+            return
+        keys = []
+        for imgsz, model_variant in profiles:
+            model_variant = model_variant or self.base_model_variant
+            keys.append((imgsz or self.base_imgsz, model_variant))
+            if self.roi_enabled:
+                keys.append((self.roi_imgsz, model_variant))
+        for key in dict.fromkeys(keys):
+            self._try_get_backend(*key)
+
+    def use_profile(self, imgsz=None, model_variant=None):
+        """切换整帧检测的输入尺寸/模型精度，未指定的项恢复为配置文件中的默认值
+
+        目标后端加载失败时保持当前的输入尺寸、精度和后端不变。
+        """
+        if self.detector_mode == "color":
+            return
+        imgsz = imgsz or self.base_imgsz
+        model_variant = model_variant or self.base_model_variant
+        backend = self._try_get_backend(imgsz, model_variant)
+        if backend is not None:
+            self.imgsz, self.model_variant, self.backend = imgsz, model_variant, backend
+
+    def _preprocess_batch(self, frames, imgsz=None):
+        """letterbox前处理，N帧写入预分配的NCHW数组（按 (N, 输入尺寸) 缓存复用，下次前处理会覆盖）"""
+        imgsz = imgsz or self.imgsz
+        key = (len(frames), imgsz)
+        if key not in self.input_buffers:
+            self.input_buffers[key] = np.empty((len(frames), 3, imgsz, imgsz), dtype=np.float32)
+        batch = self.input_buffers[key]
+        letterbox_params = [preprocess_into(frame, batch[i]) for i, frame in enumerate(frames)]  # BGR -> RGB
+        return batch, letterbox_params
+
+    def _forward(self, batch, backend=None):
+        """一次前向推理，返回原始预测 (N, num_boxes, 5 + num_classes)"""
+        return (backend or self.backend).forward(batch)
+
+    def _postprocess(self, pred, frames, letterbox_params):
+        """NMS并映射回原图坐标，返回每帧的检测框 [x1,y1,x2,y2,conf,cls]"""
+        detections = []
+        for i, (frame, (ratio, pad)) in enumerate(zip(frames, letterbox_params)):
+            det = non_max_suppression(pred[i], self.conf_threshold, self.iou_threshold)
+            det[:, :4] = scale_boxes(det[:, :4], ratio, pad, frame.shape)
+            detections.append(det)
+        return detections
+
+    def _infer_model(self, frames, roi=False):
+        """N帧拼成一个batch做一次前向推理，返回每帧映射回原图坐标的检测框
+
+        roi为True时输入是局部裁剪图，使用小尺寸输入的ROI后端（加载失败时退回整帧后端）。
+        """
+        backend, imgsz = self.backend, self.imgsz
+        if roi:
+            roi_backend = self._try_get_backend(self.roi_imgsz, self.model_variant)
+            if roi_backend is not None:
+                backend, imgsz = roi_backend, self.roi_imgsz
+        t0 = time.perf_counter_ns()
+        batch, letterbox_params = self._preprocess_batch(frames, imgsz)
+        t1 = time.perf_counter_ns()
+        pred = self._forward(batch, backend)
+        t2 = time.perf_counter_ns()
+        detections = self._postprocess(pred, frames, letterbox_params)
+        if self.telemetry is not None:
+            self.telemetry.record("preprocess", t1 - t0)
+            self.telemetry.record("inference", t2 - t1)
+            self.telemetry.record("postprocess", time.perf_counter_ns() - t2)
+        return detections
+
+    def _infer(self, frames):
+        """按检测模式返回每帧的检测框 [x1,y1,x2,y2,conf,cls]"""
+        if self.detector_mode == "color":
+            t0 = time.perf_counter_ns()
+            detections = [self.color_detector.detect_boxes(frame) for frame in frames]
+            if self.telemetry is not None:
+                self.telemetry.record("inference", time.perf_counter_ns() - t0)  # 颜色检测整体计入推理阶段
+            return detections
+        if self.detector_mode == "cascade":
+            # 只把通过颜色预筛的帧送入神经网络
+            run_model = [self._cascade_should_infer(frame) for frame in frames]
+            detections = [np.zeros((0, 6), dtype=np.float32) for _ in frames]
+            selected = [frame for frame, run in zip(frames, run_model) if run]
+            if selected:
+                selected_detections = iter(self._infer_model(selected))
+                detections = [next(selected_detections) if run else det for run, det in zip(run_model, detections)]
+            return detections
+        return self._infer_model(frames)
+
+    def _cascade_should_infer(self, frame):
+        """颜色预筛：画面中有足够多的黄色像素，或距上次推理已超过full_check_interval帧时返回True"""
+        self.cascade_stats["frames"] += 1
+        if self.color_detector.has_candidates(frame, self.cascade_gate_scale, self.cascade_gate_min_pixels):
+            self.frames_since_inference = 0
+            return True
+        self.frames_since_inference += 1
+        if self.frames_since_inference >= self.cascade_full_check_interval:
+            self.frames_since_inference = 0
+            self.cascade_stats["forced_full_checks"] += 1
+            return True
+        self.cascade_stats["skipped"] += 1
+        return False
+
+    def reset_cascade_stats(self):
+        """清零级联模式的跳帧统计"""
+        self.cascade_stats = {"frames": 0, "skipped": 0, "forced_full_checks": 0}
+
+    def _boxes_to_detections(self, det, frame_width):
+        """检测框 (K, 6) -> Detections：半径过滤、距离和水平偏移对整批框一次性向量化计算"""
+        x1, y1, x2, y2 = det[:, :4].astype(np.int32).T  # 与原逻辑一致，坐标先取整
+        radius = (x2 - x1) / 2     # 近似半径（假设包围框为正方形）
         
-        return balls, processed_frame
+        # 过滤不符合半径范围的球（保留原逻辑）
+        keep = (radius > self.min_ball_radius) & (radius < self.max_ball_radius)
+        x1, y1, x2, y2, radius = x1[keep], y1[keep], x2[keep], y2[keep], radius[keep]
+        
+        x_center = (x1 + x2) / 2  # 中心点x坐标
+        y_center = (y1 + y2) / 2  # 中心点y坐标
+        # 计算距离（保留原公式）
+        distance = (self.known_ball_diameter * self.focal_length) / (2 * radius)
+        # 计算水平偏移（保留原逻辑，画面中心只算一次）
+        frame_center_x = frame_width / 2
+        horizontal_offset = ((x_center - frame_center_x) / frame_center_x) * 100
+        
+        return Detections.from_arrays(x_center, y_center, radius, distance, horizontal_offset,
+                                      det[keep, 4], x2 - x1, y2 - y1)
+
+    def detect_tennis_balls(self, frame):
+        """网球检测（默认YOLOv5，detector_mode为color时使用HSV颜色检测）
+
+        只返回检测结果balls（Detections，可按 ((x, y), radius, distance, horizontal_offset) 元组迭代），
+        叠加显示由overlay_renderer单独完成。
+        """
+        # YOLOv5推理（letterbox前处理 + 推理后端 + NMS后处理）或颜色检测
+        det = self._infer([frame])[0]
+        return self._boxes_to_detections(det, frame.shape[1])
+
+    def _detections_to_balls(self, detections, frames):
+        """每帧检测框 -> Detections（过滤半径范围外的框）"""
+        return [self._boxes_to_detections(det, frame.shape[1]) for frame, det in zip(frames, detections)]
+
+    def detect_batch(self, frames):
+        """批量检测：N帧一次前向推理，返回与detect_tennis_balls相同格式的每帧balls列表"""
+        if not frames:
+            return []
+        return self._detections_to_balls(self._infer(frames), frames)
+
+    def detect_regions(self, frame, regions):
+        """只在给定区域内检测（跟踪时的ROI重检测）
+
+        regions: [(x1, y1, x2, y2), ...]，所有裁剪图一次批量推理
+        返回: 每个区域的balls列表，坐标、距离和水平偏移均相对整帧计算
+        """
+        if not regions:
+            return []
+        crops = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in regions]
+        if self.detector_mode == "color":
+            detections = [self.color_detector.detect_boxes(crop) for crop in crops]
+        else:
+            detections = self._infer_model(crops, roi=True)
+        for det, (x1, y1, _, _) in zip(detections, regions):
+            det[:, [0, 2]] += x1  # 裁剪图坐标 -> 整帧坐标
+            det[:, [1, 3]] += y1
+        return self._detections_to_balls(detections, [frame] * len(regions))
 
     def run_image_tests(self):
         """运行图像测试集"""
@@ -74,62 +284,73 @@ class TennisBallDetector:
             print(f"错误: 测试图像目录 {self.test_images_dir} 不存在")
             return
             
-        test_images = [f for f in os.listdir(self.test_images_dir) if f.endswith(('.jpg', '.jpeg', '.png'))]
+        test_images = sorted(f for f in os.listdir(self.test_images_dir) if f.endswith(('.jpg', '.jpeg', '.png')))
+        batch_size = max(1, self.config["test"].get("batch_size", 1))
+        parallel_config = self.config["test"].get("parallel", {})
+        workers = parallel_config.get("workers", 1) or os.cpu_count() or 1
         
         total_images = len(test_images)
         correct_detections = 0
         false_positives = 0
         false_negatives = 0
         processing_times = []
+        decode_times = []
         
-        print(f"开始图像识别测试，共 {total_images} 张测试图像")
+        ground_truth_index = self._get_ground_truth_index()
+        evaluator = DetectionEvaluator()
         
-        for image_name in test_images:
-            image_path = os.path.join(self.test_images_dir, image_name)
-            frame = cv2.imread(image_path)
-            
-            if frame is None:
-                print(f"无法读取图像: {image_path}")
-                continue
+        print(f"开始图像识别测试，共 {total_images} 张测试图像（batch_size={batch_size}）")
+        if workers > 1:
+            # 多进程并行检测（不显示结果窗口），评估仍在主进程中按原顺序进行
+            threads_per_worker = parallel_config.get("threads_per_worker", 0) or default_threads_per_worker(workers)
+            print(f"并行模式: {workers} 个进程，每进程 {threads_per_worker} 个线程")
+            batches = detect_images_parallel(self.config, test_images, batch_size, workers, threads_per_worker)
+        else:
+            batches = self.detect_image_batches(test_images)
+        
+        wall_start = time.perf_counter()
+        stop_test = False
+        for image_names, frames, batch_balls, processing_time, decode_time in batches:
+            for i, (image_name, balls) in enumerate(zip(image_names, batch_balls)):
+                processing_times.append(processing_time)
+                decode_times.append(decode_time)
                 
-            # 记录处理时间
-            start_time = time.time()
-            balls, processed_frame = self.detect_tennis_balls(frame)
-            processing_time = time.time() - start_time
-            processing_times.append(processing_time)
-            
-            # 读取真实标注数据
-            ground_truth_path = os.path.join(self.ground_truth_dir, image_name.replace('.jpg', '.json'))
-            ground_truth = self._load_ground_truth(ground_truth_path)
-            
-            # 评估检测结果
-            tp, fp, fn = self._evaluate_detection(balls, ground_truth)
-            correct_detections += tp
-            false_positives += fp
-            false_negatives += fn
-            
-            # 保存测试结果
-            self.test_results.append({
-                "image_name": image_name,
-                "detections": len(balls),
-                "ground_truth": len(ground_truth),
-                "true_positives": tp,
-                "false_positives": fp,
-                "false_negatives": fn,
-                "processing_time": processing_time
-            })
-            
-            # 显示结果
-            cv2.putText(processed_frame, f"Detections: {len(balls)}", (10, 30),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-            cv2.putText(processed_frame, f"Time: {processing_time:.3f}s", (10, 60),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-            
-            cv2.imshow("Test Result", processed_frame)
-            key = cv2.waitKey(0)  # 按任意键继续
-            
-            if key == 27:  # ESC键退出测试
+                # 读取真实标注数据
+                ground_truth = ground_truth_index.get_circles(image_name)
+                
+                # 评估检测结果
+                tp, fp, fn = self._evaluate_detection(balls, ground_truth)
+                evaluator.add(balls, ground_truth_index.get_boxes(image_name))
+                correct_detections += tp
+                false_positives += fp
+                false_negatives += fn
+                
+                # 保存测试结果
+                self.test_results.append({
+                    "image_name": image_name,
+                    "detections": len(balls),
+                    "ground_truth": len(ground_truth),
+                    "true_positives": tp,
+                    "false_positives": fp,
+                    "false_negatives": fn,
+                    "processing_time": processing_time,
+                    "decode_time": decode_time
+                })
+                
+                # 显示结果
+                if self.headless or frames is None:
+                    continue
+                processed_frame = draw_detections(frames[i], balls, (f"Detections: {len(balls)}",
+                                                                     f"Time: {processing_time:.3f}s"))
+                cv2.imshow("Test Result", processed_frame)
+                key = cv2.waitKey(0)  # 按任意键继续
+                
+                if key == 27:  # ESC键退出测试
+                    stop_test = True
+                    break
+            if stop_test:
                 break
+        wall_time = time.perf_counter() - wall_start
         
         # 计算性能指标
         if total_images > 0:
@@ -142,58 +363,217 @@ class TennisBallDetector:
             print("\n=== 测试总结 ===")
             print(f"总测试图像: {total_images}")
             print(f"平均处理时间: {avg_processing_time:.3f}s ({fps:.1f} FPS)")
+            avg_decode_time = sum(decode_times) / len(decode_times)
+            print(f"平均读图/解码时间: {avg_decode_time * 1000:.2f}ms（{'预解码缓存' if self.frame_cache_config.get('enabled', False) else 'cv2.imread'}）")
+            throughput = len(processing_times) / max(wall_time, 1e-9)
+            print(f"总吞吐: {throughput:.1f} 张/秒（总耗时 {wall_time:.2f}s）")
             print(f"准确率 (Precision): {precision:.2f}")
             print(f"召回率 (Recall): {recall:.2f}")
             print(f"F1分数: {f1_score:.2f}")
+            average_precision = evaluator.compute()
+            print(f"mAP@0.5:0.95: {average_precision['mAP']:.3f}, AP50: {average_precision['AP50']:.3f}, "
+                  f"AP75: {average_precision['AP75']:.3f}")
             
             # 保存测试报告
-            self._save_test_report(precision, recall, f1_score, fps)
+            self._save_test_report(precision, recall, f1_score, fps, extra={
+                "average_precision": average_precision,
+                "throughput": {"workers": workers, "wall_time": wall_time, "images_per_second": throughput},
+                "decode": {"frame_cache": self.frame_cache_config.get("enabled", False),
+                           "avg_decode_time": avg_decode_time}
+            })
     
-    def _load_ground_truth(self, path):
-        """加载真实标注数据"""
-        if not os.path.exists(path):
-            return []
-            
-        try:
-            with open(path, 'r') as f:
-                data = json.load(f)
-                return data.get('balls', [])
-        except Exception as e:
-            print(f"无法加载标注数据: {e}")
-            return []
+    def _read_test_image(self, image_name):
+        """读取一张测试图像：启用帧缓存时返回内存映射上的只读视图，否则用cv2.imread解码"""
+        if self.frame_cache_config.get("enabled", False):
+            if self.frame_cache is None:
+                cache_dir = self.frame_cache_config.get("cache_dir", "./frame_cache")
+                self.frame_cache = open_frame_cache(self.test_images_dir, cache_dir)
+            return self.frame_cache.get(image_name)
+        return cv2.imread(os.path.join(self.test_images_dir, image_name))
     
-    def _evaluate_detection(self, detected_balls, ground_truth):
-        """评估多目标检测结果（支持多对多匹配）"""
-        true_positives = 0
-        matched_gt = set()  # 记录已匹配的真实标注索引
-        
-        for det_idx, ball in enumerate(detected_balls):  # 正确解包：先获取ball元组
-            (det_x, det_y), det_radius, _, _ = ball  # 从ball中提取4个值（坐标、半径、距离、偏移）
-            for gt_idx, gt_ball in enumerate(ground_truth):
-                if gt_idx in matched_gt:
-                    continue  # 跳过已匹配的真实标注
-                gt_x, gt_y, gt_radius = gt_ball['x'], gt_ball['y'], gt_ball['radius']
+    def detect_image_batches(self, image_names):
+        """按test.batch_size分批读取并检测测试图像，逐批产出 (图像名列表, 图像列表, 检测结果列表, 单张耗时, 单张解码耗时)"""
+        batch_size = max(1, self.config["test"].get("batch_size", 1))
+        for batch_start in range(0, len(image_names), batch_size):
+            names = []
+            frames = []
+            decode_start = time.time()
+            for image_name in image_names[batch_start:batch_start + batch_size]:
+                frame = self._read_test_image(image_name)
                 
-                # 计算检测结果与真实标注的匹配度（距离+半径差异）
-                distance = np.sqrt((det_x - gt_x)**2 + (det_y - gt_y)**2)
-                radius_diff = abs(det_radius - gt_radius)
-                
-                # 放宽匹配条件（原distance<20→30，radius_diff<10→15）
-                if distance < 30 and radius_diff < 15:
-                    true_positives += 1
-                    matched_gt.add(gt_idx)  # 标记该真实标注已匹配
+                if frame is None:
+                    print(f"无法读取图像: {os.path.join(self.test_images_dir, image_name)}")
+                    continue
+                names.append(image_name)
+                frames.append(frame)
+            if not frames:
+                continue
+            decode_time = (time.time() - decode_start) / len(frames)
+            
+            # 记录处理时间（批量推理时按张数均摊，不含解码）
+            start_time = time.time()
+            batch_balls = self.detect_batch(frames)
+            processing_time = (time.time() - start_time) / len(frames)
+            yield names, frames, batch_balls, processing_time, decode_time
+    
+    def run_benchmark(self):
+        """无界面基准测试：预热后每张图像重复多次，按阶段统计p50/p95/p99/max延迟"""
+        if not os.path.exists(self.test_images_dir):
+            print(f"错误: 测试图像目录 {self.test_images_dir} 不存在")
+            return
+            
+        benchmark_config = self.config["test"].get("benchmark", {})
+        warmup_iterations = benchmark_config.get("warmup_iterations", 3)
+        repeats = max(1, benchmark_config.get("repeats", 5))
+        test_images = sorted(f for f in os.listdir(self.test_images_dir) if f.endswith(('.jpg', '.jpeg', '.png')))
+        
+        stages = ("decode", "preprocess", "inference", "postprocess", "evaluation")
+        stage_samples = {stage: [] for stage in stages}
+        detect_samples = []  # 前处理+推理+后处理
+        correct_detections = 0
+        false_positives = 0
+        false_negatives = 0
+        self.test_results = []
+        ground_truth_index = self._get_ground_truth_index()
+        evaluator = DetectionEvaluator()
+        
+        print(f"开始基准测试，共 {len(test_images)} 张图像，预热 {warmup_iterations} 次，每张重复 {repeats} 次")
+        
+        # 预热（不计入统计）
+        if test_images:
+            warmup_frame = self._read_test_image(test_images[0])
+            for _ in range(warmup_iterations if warmup_frame is not None else 0):
+                self.detect_batch([warmup_frame])
+        self.reset_cascade_stats()
+        full_model_true_positives = 0  # 级联模式下，若所有帧都做推理时的TP数（用于评估对召回率的影响）
+        
+        for image_name in test_images:
+            ground_truth = ground_truth_index.get_circles(image_name)
+            image_detect_samples = []
+            frame = self._read_test_image(image_name)
+            if frame is None:
+                print(f"无法读取图像: {os.path.join(self.test_images_dir, image_name)}")
+                continue
+            # 级联预筛会推进跳帧计数，每张图只决定一次，各次重复都按同一决定计时（结果与repeats无关）
+            inference_skipped = self.detector_mode == "cascade" and not self._cascade_should_infer(frame)
+            
+            for _ in range(repeats):
+                t0 = time.perf_counter_ns()
+                frame = self._read_test_image(image_name)
+                t1 = time.perf_counter_ns()
+                if frame is None:
                     break
+                if self.detector_mode == "cascade":
+                    # 预筛耗时计入前处理阶段（has_candidates无副作用，这里只计时，是否推理已在上面决定）
+                    self.color_detector.has_candidates(frame, self.cascade_gate_scale, self.cascade_gate_min_pixels)
+                if self.detector_mode == "color":
+                    # 颜色检测没有独立的前处理，整体计入推理阶段
+                    t2 = time.perf_counter_ns()
+                    detections = [self.color_detector.detect_boxes(frame)]
+                    t3 = time.perf_counter_ns()
+                elif inference_skipped:
+                    t2 = time.perf_counter_ns()
+                    detections = [np.zeros((0, 6), dtype=np.float32)]
+                    t3 = time.perf_counter_ns()
+                else:
+                    batch, letterbox_params = self._preprocess_batch([frame])
+                    t2 = time.perf_counter_ns()
+                    pred = self._forward(batch)
+                    t3 = time.perf_counter_ns()
+                    detections = self._postprocess(pred, [frame], letterbox_params)
+                balls = self._detections_to_balls(detections, [frame])[0]
+                t4 = time.perf_counter_ns()
+                tp, fp, fn = self._evaluate_detection(balls, ground_truth)
+                t5 = time.perf_counter_ns()
+                
+                for stage, elapsed in zip(stages, (t1 - t0, t2 - t1, t3 - t2, t4 - t3, t5 - t4)):
+                    stage_samples[stage].append(elapsed)
+                image_detect_samples.append(t4 - t1)
+            
+            if not image_detect_samples:
+                print(f"无法读取图像: {os.path.join(self.test_images_dir, image_name)}")
+                continue
+            detect_samples.extend(image_detect_samples)
+            
+            # 每次重复走的是同一条路径，检测结果相同，只统计最后一次
+            correct_detections += tp
+            false_positives += fp
+            false_negatives += fn
+            evaluator.add(balls, ground_truth_index.get_boxes(image_name))
+            image_result = {
+                "image_name": image_name,
+                "detections": len(balls),
+                "ground_truth": len(ground_truth),
+                "true_positives": tp,
+                "false_positives": fp,
+                "false_negatives": fn,
+                "processing_time": float(np.median(image_detect_samples)) / 1e9
+            }
+            if self.detector_mode == "cascade":
+                image_result["inference_skipped"] = inference_skipped
+                if inference_skipped:
+                    # 不计时：补做一次整帧推理，统计被跳过的帧里漏掉了多少球
+                    full_balls = self._detections_to_balls(self._infer_model([frame]), [frame])[0]
+                    full_model_true_positives += self._evaluate_detection(full_balls, ground_truth)[0]
+                else:
+                    full_model_true_positives += tp
+            self.test_results.append(image_result)
+        
+        if not detect_samples:
+            return
+        
+        latency = {stage: summarize_latency(samples) for stage, samples in stage_samples.items()}
+        latency["detect_total"] = summarize_latency(detect_samples)
+        fps = 1000.0 / latency["detect_total"]["p50_ms"]
+        precision = correct_detections / max((correct_detections + false_positives), 1)
+        recall = correct_detections / max((correct_detections + false_negatives), 1)
+        f1_score = 2 * (precision * recall) / max((precision + recall), 1)
         
-        false_positives = len(detected_balls) - true_positives
-        false_negatives = len(ground_truth) - true_positives
+        print("\n=== 基准测试总结 ===")
+        for stage, stats in latency.items():
+            print(format_latency(stage, stats))
+        print(f"吞吐（按p50）: {fps:.1f} FPS")
+        print(f"准确率 (Precision): {precision:.2f}")
+        print(f"召回率 (Recall): {recall:.2f}")
+        print(f"F1分数: {f1_score:.2f}")
+        average_precision = evaluator.compute()
+        print(f"mAP@0.5:0.95: {average_precision['mAP']:.3f}, AP50: {average_precision['AP50']:.3f}, "
+              f"AP75: {average_precision['AP75']:.3f}")
+        
+        extra = {
+            "benchmark": {"warmup_iterations": warmup_iterations, "repeats": repeats,
+                          "frame_cache": self.frame_cache_config.get("enabled", False)},
+            "latency": latency,
+            "average_precision": average_precision
+        }
+        if self.detector_mode == "cascade":
+            cascade = dict(self.cascade_stats)
+            cascade["skip_ratio"] = cascade["skipped"] / max(cascade["frames"], 1)
+            cascade["recall_full_model"] = full_model_true_positives / max((correct_detections + false_negatives), 1)
+            cascade["recall_cascade"] = recall
+            extra["cascade"] = cascade
+            print(f"跳过推理的帧比例: {cascade['skip_ratio']:.1%}（强制整帧检测 {cascade['forced_full_checks']} 次）")
+            print(f"召回率: 级联 {recall:.2f} / 全部推理 {cascade['recall_full_model']:.2f}")
         
-        return true_positives, false_positives, false_negatives
+        return self._save_test_report(precision, recall, f1_score, fps, extra=extra)
+    
+    def _get_ground_truth_index(self):
+        """加载全部真实标注（ground_truth_dir下的逐图json + annotations.json），只加载一次"""
+        if self.ground_truth_index is None:
+            self.ground_truth_index = GroundTruthIndex(self.ground_truth_dir, self.annotations_path)
+            print(f"已加载标注: {len(self.ground_truth_index)} 张图像")
+        return self.ground_truth_index
+    
+    def _evaluate_detection(self, detected_balls, ground_truth):
+        """评估多目标检测结果：按中心距离/半径差构造代价矩阵，用匈牙利算法求最优一一匹配"""
+        return match_by_center(detected_balls, ground_truth, self.match_distance, self.match_radius_diff)
     
-    def _save_test_report(self, precision, recall, f1_score, fps):
-        """保存测试报告"""
+    def _save_test_report(self, precision, recall, f1_score, fps, extra=None):
+        """保存测试报告（extra中的字段合并到报告顶层）"""
         report = {
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "test_images": len(self.test_results),
+            "startup": self.model_info,
             "metrics": {
                 "precision": precision,
                 "recall": recall,
@@ -202,9 +582,12 @@ class TennisBallDetector:
             },
             "details": self.test_results
         }
+        if extra:
+            report.update(extra)
         
         report_path = f"test_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         with open(report_path, 'w') as f:
             json.dump(report, f, indent=2)
             
-        print(f"测试报告已保存至: {report_path}")
\ No newline at end of file
+        print(f"测试报告已保存至: {report_path}")
+        return report
\ No newline at end of file
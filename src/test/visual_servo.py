@@ -0,0 +1,52 @@
+# visual_servo.py
+# 接近网球的闭环视觉伺服：水平偏移做PI控制转向，前进速度按距离调度，每个检测帧输出一次左右电机占空比
+import numpy as np
+
+
+class VisualServoController:
+    """输入每帧的 (horizontal_offset %, distance cm)，输出 (左电机占空比, 右电机占空比)，范围 -100~100
+
+    偏移为正（球在右侧）时左轮加速、右轮减速向右转；占空比为负表示该轮反转。
+    距离大于slow_down_distance时以max_speed前进，接近collect_distance时线性降到min_speed。
+    """
+
+    def __init__(self, servo_config, collect_distance):
+        self.kp = servo_config.get("kp", 0.4)
+        self.ki = servo_config.get("ki", 0.1)
+        self.integral_limit = servo_config.get("integral_limit", 50)
+        self.max_speed = servo_config.get("max_speed", 100)
+        self.min_speed = servo_config.get("min_speed", 40)
+        self.slow_down_distance = servo_config.get("slow_down_distance", 80)
+        self.align_offset = servo_config.get("align_offset", 40)  # 偏移超过该值时原地转向，不前进
+        self.reset_timeout = servo_config.get("reset_timeout", 0.5)
+        self.collect_distance = collect_distance
+        self.reset()
+
+    def reset(self):
+        self.integral = 0.0
+        self.last_time = None
+
+    def base_speed(self, distance):
+        """按距离调度的前进速度"""
+        span = max(self.slow_down_distance - self.collect_distance, 1e-9)
+        ratio = np.clip((distance - self.collect_distance) / span, 0.0, 1.0)
+        return self.min_speed + (self.max_speed - self.min_speed) * ratio
+
+    def update(self, horizontal_offset, distance, now):
+        """now为当前时间（秒）；与上一帧间隔超过reset_timeout时清零积分（目标丢失后重新开始）"""
+        if self.last_time is None or now - self.last_time > self.reset_timeout:
+            self.integral = 0.0
+            dt = 0.0
+        else:
+            dt = now - self.last_time
+        self.last_time = now
+
+        self.integral = float(np.clip(self.integral + horizontal_offset * dt, -self.integral_limit, self.integral_limit))
+        steer = self.kp * horizontal_offset + self.ki * self.integral
+
+        # 偏移较大时先减小前进速度，避免走出弧线把球甩出视野
+        alignment = max(0.0, 1.0 - abs(horizontal_offset) / self.align_offset)
+        forward = self.base_speed(distance) * alignment
+        left = float(np.clip(forward + steer, -100, 100))
+        right = float(np.clip(forward - steer, -100, 100))
+        return left, right
@@ -0,0 +1,101 @@
+# yolo_utils.py
+# YOLOv5前处理/后处理（纯NumPy + OpenCV实现，不依赖torch）
+import cv2
+import numpy as np
+
+
+def letterbox(im, new_shape=640, color=(114, 114, 114)):
+    """等比缩放并填充到固定尺寸（与YOLOv5的letterbox一致）
+
+    返回: (填充后的图像, 缩放比例, (左侧填充, 顶部填充))
+    """
+    if isinstance(new_shape, int):
+        new_shape = (new_shape, new_shape)
+
+    h, w = im.shape[:2]
+    r = min(new_shape[0] / h, new_shape[1] / w)
+    new_unpad = (int(round(w * r)), int(round(h * r)))
+    dw = (new_shape[1] - new_unpad[0]) / 2
+    dh = (new_shape[0] - new_unpad[1]) / 2
+
+    if (w, h) != new_unpad:
+        im = cv2.resize(im, new_unpad, interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+    left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+    im = cv2.copyMakeBorder(im, top, bottom, left, right, cv2.BORDER_CONSTANT, value=color)
+    return im, r, (left, top)
+
+
+def preprocess(frame, imgsz=640):
+    """BGR图像 -> 模型输入 (1, 3, imgsz, imgsz) float32，数值范围0~1"""
+    im, ratio, pad = letterbox(frame, imgsz)
+    im = im[:, :, ::-1].transpose(2, 0, 1)  # HWC BGR -> CHW RGB
+    blob = np.ascontiguousarray(im, dtype=np.float32)[None] / 255.0
+    return blob, ratio, pad
+
+
+def preprocess_into(frame, out):
+    """与preprocess相同，但结果写入预分配的 (3, imgsz, imgsz) float32数组out，不再分配输出数组
+
+    返回: (缩放比例, (左侧填充, 顶部填充))
+    """
+    im, ratio, pad = letterbox(frame, out.shape[1])
+    out[...] = im[:, :, ::-1].transpose(2, 0, 1)  # HWC BGR -> CHW RGB
+    out /= 255.0
+    return ratio, pad
+
+
+def non_max_suppression(pred, conf_threshold=0.25, iou_threshold=0.45, max_det=300):
+    """单张图像的NMS
+
+    pred: (num_boxes, 5 + num_classes)，格式为 [cx, cy, w, h, obj_conf, cls_conf...]
+    返回: (K, 6)，格式为 [x1, y1, x2, y2, conf, cls]
+    """
+    pred = pred[pred[:, 4] > conf_threshold]
+    if not len(pred):
+        return np.zeros((0, 6), dtype=np.float32)
+
+    # 置信度 = 目标置信度 * 类别置信度
+    cls_scores = pred[:, 5:] * pred[:, 4:5]
+    cls = cls_scores.argmax(1)
+    conf = cls_scores[np.arange(len(cls)), cls]
+    keep = conf > conf_threshold
+    pred, cls, conf = pred[keep], cls[keep], conf[keep]
+    if not len(pred):
+        return np.zeros((0, 6), dtype=np.float32)
+
+    # cxcywh -> xyxy
+    boxes = np.empty((len(pred), 4), dtype=np.float32)
+    boxes[:, 0] = pred[:, 0] - pred[:, 2] / 2
+    boxes[:, 1] = pred[:, 1] - pred[:, 3] / 2
+    boxes[:, 2] = pred[:, 0] + pred[:, 2] / 2
+    boxes[:, 3] = pred[:, 1] + pred[:, 3] / 2
+
+    # 按类别偏移坐标，实现分类别NMS
+    offset_boxes = boxes + cls[:, None].astype(np.float32) * 4096
+    order = conf.argsort()[::-1]
+    areas = (offset_boxes[:, 2] - offset_boxes[:, 0]) * (offset_boxes[:, 3] - offset_boxes[:, 1])
+    kept = []
+    while order.size and len(kept) < max_det:
+        i = order[0]
+        kept.append(i)
+        rest = order[1:]
+        xx1 = np.maximum(offset_boxes[i, 0], offset_boxes[rest, 0])
+        yy1 = np.maximum(offset_boxes[i, 1], offset_boxes[rest, 1])
+        xx2 = np.minimum(offset_boxes[i, 2], offset_boxes[rest, 2])
+        yy2 = np.minimum(offset_boxes[i, 3], offset_boxes[rest, 3])
+        inter = np.clip(xx2 - xx1, 0, None) * np.clip(yy2 - yy1, 0, None)
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-7)
+        order = rest[iou <= iou_threshold]
+
+    return np.concatenate([boxes[kept], conf[kept, None], cls[kept, None].astype(np.float32)], axis=1)
+
+
+def scale_boxes(boxes, ratio, pad, shape):
+    """把letterbox坐标系下的框映射回原图坐标，并裁剪到图像范围内"""
+    boxes = boxes.copy()
+    boxes[:, [0, 2]] = (boxes[:, [0, 2]] - pad[0]) / ratio
+    boxes[:, [1, 3]] = (boxes[:, [1, 3]] - pad[1]) / ratio
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, shape[1])
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, shape[0])
+    return boxes